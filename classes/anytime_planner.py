@@ -0,0 +1,440 @@
+# classes/anytime_planner.py
+from __future__ import annotations
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import List, Optional, Dict, Tuple, Callable
+from classes.models import TimeSlot, Student
+from classes.planner import Planner
+from classes.rebalancer import Rebalancer
+
+Cell = Tuple[str, int, int]  # (spé, créneau, groupe)
+
+# fréquence (en élèves) des vérifications d'arrêt pendant une passe complète
+STOP_CHECK_EVERY = 256
+# nombre max d'élèves non placés retentés par étape de réparation
+REPAIR_BATCH = 64
+# intervalle (secondes) entre deux vérifications de l'appelant qui attend
+POLL_INTERVAL = 0.1
+
+STEP_GREEDY = "passe gloutonne"
+STEP_REPAIR = "réparation"
+STEP_REORDER = "réordonnancement"
+STEP_REBALANCE = "équilibrage"
+
+
+@dataclass
+class PlanSnapshot:
+    """
+    État figé d'un planning à un instant de l'amélioration.
+
+    Les cases de chaque élève sont copiées : le snapshot reste valable
+    (affichage, export) pendant que le planner continue d'améliorer.
+    """
+    iteration: int
+    step: str                           # étape qui a produit ce planning
+    elapsed: float                      # secondes depuis le début de la planification
+    score: Tuple[float, ...]            # voir AnytimePlanner.score (plus petit = meilleur)
+    num_students: int
+    num_unplaced: int
+    overfull_cells: int
+    small_cells: int                    # cases sous min_per_group
+    fill_stddev: float
+    groups_per_specialty: Dict[str, int]
+    cells: List[Tuple[Cell, ...]]       # par élève (ordre de la liste), dans l'ordre des vœux
+    unplaced: List[Tuple[int, str, str]]    # (n° d'élève, spé en échec, raison)
+    students: List[Student] = field(repr=False, default_factory=list)
+
+    @property
+    def num_placed(self) -> int:
+        return self.num_students - self.num_unplaced
+
+    def summary(self) -> str:
+        text = (
+            f"{self.step} : {self.num_placed} / {self.num_students} élèves placés, "
+            f"écart-type des effectifs {self.fill_stddev:.2f}"
+        )
+        if self.small_cells:
+            text += f", {self.small_cells} groupe(s) sous le minimum"
+        return f"{text} (itération {self.iteration}, {self.elapsed:.1f} s)"
+
+    def materialize(
+        self,
+        time_slots: List[TimeSlot],
+        max_per_group: Optional[int] = None,
+    ) -> Tuple[List[Student], Planner]:
+        """
+        Copies des élèves et Planner dans l'état du snapshot, utilisables
+        avec les exports et les fenêtres de résultats habituels.
+        """
+        students = [Student(st.name, st.classe, list(st.choices)) for st in self.students]
+        planner = Planner(time_slots, self.groups_per_specialty, max_per_group)
+        _load_cells(planner, students, self.cells, self.unplaced)
+        return students, planner
+
+
+def _load_cells(
+    planner: Planner,
+    students: List[Student],
+    cells: List[Tuple[Cell, ...]],
+    unplaced: List[Tuple[int, str, str]],
+) -> None:
+    """Remet un planner (et ses élèves) dans l'état décrit par cells / unplaced."""
+    planner._group_counts = {}
+    planner.group_records = []
+    planner.unplaced_students = []
+    planner._records_by_slot = {}
+    planner._cell_members = {}
+    planner._total_count = 0
+    planner._total_sq = 0
+    planner._overfull_cells = 0
+    planner._num_cells = 0
+    planner._undo_stack.clear()
+    planner._redo_stack.clear()
+
+    # mêmes spé ouvertes, dans le même ordre, même sans élève placé
+    for spe in planner.groups_per_specialty:
+        planner._get_counts_for_specialty(spe)
+    for st, student_cells in zip(students, cells):
+        st.assignments = {}
+        for spe, slot_idx, group_idx in student_cells:
+            planner._add_to_cell(spe, slot_idx, group_idx, 1)
+        if student_cells:
+            planner._commit(st, list(student_cells))
+    for index, failed_specialty, reason in unplaced:
+        planner._reject(students[index], failed_specialty, reason)
+
+
+class AnytimePlanner(Planner):
+    """
+    Répartition « à tout moment » : la passe gloutonne donne tout de suite
+    un premier planning, que l'on améliore ensuite jusqu'à l'échéance
+    (time_budget) ou l'arrêt demandé (cancel), par étapes successives :
+    - réparation : pour chaque élève non placé, on libère une place dans
+      une case pleine de la spé bloquante en déplaçant un de ses élèves
+      vers une autre case de la même spé (Planner.check_move), puis on
+      retente l'élève ;
+    - réordonnancement : nouvelle passe gloutonne, les élèves non placés
+      d'abord, les autres dans un ordre pseudo-aléatoire ;
+    - équilibrage : voir classes.rebalancer (si min_per_group est fourni).
+    Une étape n'est gardée que si elle améliore le score (non placés,
+    cases en surcapacité, groupes sous le minimum, écart-type des effectifs) ;
+    sinon on revient au meilleur planning. Chaque amélioration publie un
+    PlanSnapshot (voir best et on_snapshot).
+
+    - time_budget: durée max (secondes) de l'amélioration ; None = pas de limite
+    - max_iterations: nombre max d'étapes (utilisé pour rejouer un run)
+    - max_stale: arrêt après ce nombre d'étapes consécutives sans amélioration
+    - on_snapshot: appelé avec le meilleur planning dès qu'il change (au
+      plus toutes les POLL_INTERVAL secondes), depuis le thread qui attend
+      (plan / wait), pas depuis le thread de calcul
+    - cancel_event: threading.Event partagé, pour demander l'arrêt de l'extérieur
+
+    Sans graine, l'ordre des réordonnancements dérive de la graine 0 :
+    avec time_budget=None et le même max_iterations, le résultat est
+    reproductible.
+    """
+
+    def __init__(
+        self,
+        time_slots: List[TimeSlot],
+        groups_per_specialty: Dict[str, int],
+        max_per_group: Optional[int] = None,
+        seed: Optional[int] = None,
+        min_per_group: Optional[int] = None,
+        time_budget: Optional[float] = 10.0,
+        max_iterations: Optional[int] = None,
+        max_stale: int = 30,
+        on_snapshot: Optional[Callable[[PlanSnapshot], None]] = None,
+        cancel_event: Optional[threading.Event] = None,
+    ) -> None:
+        super().__init__(time_slots, groups_per_specialty, max_per_group, seed)
+        self.min_per_group = min_per_group
+        self.time_budget = time_budget
+        self.max_iterations = max_iterations
+        self.max_stale = max_stale
+        self.on_snapshot = on_snapshot
+        self.cancel_event = cancel_event or threading.Event()
+
+        self.iterations = 0
+        self.improvements = 0
+        self._repair_offset = 0
+        self._students: List[Student] = []
+        self._index: Dict[int, int] = {}        # id(élève) -> n° dans _students
+        self._t0 = 0.0
+        self._deadline: Optional[float] = None
+        self._thread: Optional[threading.Thread] = None
+        self._error: Optional[BaseException] = None
+
+        self._lock = threading.Lock()
+        self._best: Optional[PlanSnapshot] = None
+        self._notified: Optional[PlanSnapshot] = None
+
+    def strategy_params(self) -> Dict[str, object]:
+        # comme JointPlanner : le nombre d'étapes effectuées suffit à rejouer le run
+        return {
+            "min_per_group": self.min_per_group,
+            "max_stale": self.max_stale,
+            "max_iterations": self.iterations,
+        }
+
+    # --- Score et snapshots -------------------------------------------------
+
+    def _small_cells(self) -> int:
+        if self.min_per_group is None:
+            return 0
+        return self.small_cells(self.min_per_group)
+
+    def score(self) -> Tuple[float, ...]:
+        """Critères du planning courant, par ordre d'importance (plus petit = meilleur)."""
+        return (
+            len(self.unplaced_students),
+            self.overfull_cells(),
+            self._small_cells(),
+            round(self.fill_stddev(), 9),
+        )
+
+    def _capture(self, step: str) -> PlanSnapshot:
+        score = self.score()
+        return PlanSnapshot(
+            iteration=self.iterations,
+            step=step,
+            elapsed=time.perf_counter() - self._t0,
+            score=score,
+            num_students=len(self._students),
+            num_unplaced=score[0],
+            overfull_cells=score[1],
+            small_cells=score[2],
+            fill_stddev=self.fill_stddev(),
+            groups_per_specialty=dict(self.groups_per_specialty),
+            cells=[
+                tuple((a.specialty, slot_idx, a.group_index) for slot_idx, a in st.assignments.items())
+                for st in self._students
+            ],
+            unplaced=[
+                (self._index[id(u.student)], u.failed_specialty, u.reason)
+                for u in self.unplaced_students
+            ],
+            students=self._students,
+        )
+
+    def _publish(self, snapshot: PlanSnapshot) -> None:
+        with self._lock:
+            self._best = snapshot
+
+    @property
+    def best(self) -> Optional[PlanSnapshot]:
+        """Meilleur planning publié jusqu'ici (lisible depuis n'importe quel thread)."""
+        with self._lock:
+            return self._best
+
+    def _notify(self) -> None:
+        best = self.best
+        if best is not self._notified:
+            self._notified = best
+            if self.on_snapshot is not None:
+                self.on_snapshot(best)
+
+    # --- Étapes d'amélioration ------------------------------------------------
+
+    def _should_stop(self) -> bool:
+        if self.cancel_event.is_set():
+            return True
+        return self._deadline is not None and time.perf_counter() >= self._deadline
+
+    def _restore(self, snapshot: PlanSnapshot) -> None:
+        _load_cells(self, self._students, snapshot.cells, snapshot.unplaced)
+
+    def _repair(self) -> bool:
+        """
+        Retente au plus REPAIR_BATCH élèves non placés, à la suite du lot
+        précédent (chaque étape reste courte) ; False si interrompue.
+        """
+        num_slots = len(self.time_slots)
+        pending = self.unplaced_students
+        start = self._repair_offset % len(pending)
+        batch = set(range(start, min(start + REPAIR_BATCH, len(pending))))
+        self._repair_offset = start + len(batch)
+        self.unplaced_students = []
+
+        for position, unplaced in enumerate(pending):
+            if position not in batch:
+                self.unplaced_students.append(unplaced)
+                continue
+            if self._should_stop():
+                return False
+            student = unplaced.student
+            spe = unplaced.failed_specialty
+            if len(student.choices) > num_slots or spe not in self._group_counts:
+                self.unplaced_students.append(unplaced)
+                continue
+            if self._place_student(student) or self._make_room(student, spe):
+                continue
+            # toujours pas de place : l'échec d'origine est conservé
+            self.unplaced_students.pop()
+            self.unplaced_students.append(unplaced)
+        return True
+
+    def _make_room(self, student: Student, spe: str) -> bool:
+        """
+        Essaie chaque déplacement d'un élève d'une case pleine de spe vers
+        une case libre de spe, et retente student après chacun. Le
+        déplacement est annulé s'il ne permet pas de placer student.
+        """
+        counts = self._group_counts[spe]
+        free = [
+            (slot_idx, group_idx)
+            for slot_idx, row in enumerate(counts)
+            for group_idx, count in enumerate(row)
+            if not self._is_full(count)
+        ]
+        if not free:
+            return False    # spé saturée : aucun déplacement ne libère de place
+
+        for slot_idx, row in enumerate(counts):
+            for group_idx, count in enumerate(row):
+                if not self._is_full(count):
+                    continue
+                for member in self.cell_members(spe, slot_idx, group_idx):
+                    if self._should_stop():
+                        return False
+                    for to_slot, to_group in free:
+                        if self.check_move(member, slot_idx, to_slot, to_group):
+                            continue
+                        self._apply_move(member, slot_idx, to_slot, to_group)
+                        self.unplaced_students.pop()
+                        if self._place_student(student):
+                            return True
+                        self._apply_move(member, to_slot, slot_idx, group_idx)
+        return False
+
+    def _reorder(self, rng: random.Random) -> bool:
+        """Nouvelle passe complète, non placés d'abord ; False si interrompue."""
+        hard = [u.student for u in self.unplaced_students]
+        hard_ids = {id(st) for st in hard}
+        others = [st for st in self._students if id(st) not in hard_ids]
+        rng.shuffle(hard)
+        rng.shuffle(others)
+
+        _load_cells(self, self._students, [()] * len(self._students), [])
+        for position, student in enumerate(hard + others):
+            if position % STOP_CHECK_EVERY == 0 and self._should_stop():
+                return False
+            self._place_student(student)
+        return True
+
+    def _rebalance(self) -> bool:
+        Rebalancer(self, self.min_per_group).run()
+        return True
+
+    def _steps(self) -> List[str]:
+        steps = []
+        if self.unplaced_students:
+            steps.append(STEP_REPAIR)
+        steps.append(STEP_REORDER)
+        if self.min_per_group is not None and self._small_cells():
+            steps.append(STEP_REBALANCE)
+        return steps
+
+    def _improve(self) -> None:
+        stale = 0
+        while stale < self.max_stale:
+            if self.max_iterations is not None and self.iterations >= self.max_iterations:
+                break
+            if self._should_stop():
+                break
+
+            best = self.best
+            steps = self._steps()
+            step = steps[self.iterations % len(steps)]
+            if step == STEP_REPAIR:
+                completed = self._repair()
+            elif step == STEP_REORDER:
+                rng = random.Random(f"{self.seed or 0}:{self.iterations}")
+                completed = self._reorder(rng)
+            else:
+                completed = self._rebalance()
+
+            if not completed:
+                # étape interrompue : non comptée, on revient au meilleur planning
+                self._restore(best)
+                break
+            self.iterations += 1
+
+            if self.score() < best.score:
+                self._publish(self._capture(step))
+                self.improvements += 1
+                stale = 0
+            else:
+                self._restore(best)
+                stale += 1
+
+    def _run(self) -> None:
+        try:
+            self._improve()
+        except BaseException as e:     # relancée dans le thread qui attend
+            self._error = e
+            self._restore(self.best)
+
+    # --- API principale -----------------------------------------------------
+
+    def start(self, students: List[Student]) -> PlanSnapshot:
+        """
+        Passe gloutonne (dans le thread appelant), puis amélioration en
+        arrière-plan. Retourne aussitôt le planning glouton.
+        """
+        self._students = list(students)
+        self._index = {id(st): i for i, st in enumerate(self._students)}
+        self._t0 = time.perf_counter()
+        self._deadline = None
+        if self.time_budget is not None:
+            self._deadline = self._t0 + self.time_budget
+
+        # toutes les spé ouvertes d'emblée, comme après _restore : les
+        # écarts-types restent comparables d'une étape à l'autre
+        for spe in self.groups_per_specialty:
+            self._get_counts_for_specialty(spe)
+        super().plan(students)
+        snapshot = self._capture(STEP_GREEDY)
+        self._publish(snapshot)
+
+        self._thread = threading.Thread(target=self._run, name="anytime-planner", daemon=True)
+        self._thread.start()
+        return snapshot
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def cancel(self) -> None:
+        """Demande l'arrêt : le planner garde le meilleur planning trouvé."""
+        self.cancel_event.set()
+
+    def wait(self) -> PlanSnapshot:
+        """
+        Attend la fin de l'amélioration, en appelant on_snapshot quand le
+        meilleur planning change. Ctrl+C (KeyboardInterrupt) pendant
+        l'attente arrête l'amélioration, comme cancel.
+
+        Au retour, l'état du planner (et des élèves) est celui de best.
+        """
+        self._notify()
+        if self._thread is not None:
+            try:
+                while self._thread.is_alive():
+                    self._thread.join(POLL_INTERVAL)
+                    self._notify()
+            except KeyboardInterrupt:
+                self.cancel()
+                self._thread.join()
+            self._thread = None
+        self._notify()
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+        return self.best
+
+    def plan(self, students: List[Student]) -> None:
+        self.start(students)
+        self.wait()
@@ -0,0 +1,79 @@
+# classes/flow_planner.py
+from __future__ import annotations
+from typing import List, Optional, Dict, Tuple
+from classes.models import Student
+from classes.planner import Planner
+
+
+class FlowPlanner(Planner):
+    """
+    Passe gloutonne où chaque élève est placé par un couplage maximum
+    (flot) entre ses vœux et les créneaux, au lieu de vœu en vœu.
+
+    Planner prend, pour chaque vœu, le créneau le moins rempli : un vœu
+    suivant peut alors ne plus trouver de place alors qu'une autre
+    répartition des créneaux l'aurait permis. Ici, chaque vœu est relié aux
+    créneaux où un groupe de la spé a encore de la place, et on cherche des
+    chemins augmentants (algorithme de Kuhn), en essayant d'abord les cases
+    les moins remplies : l'élève est placé dès qu'une affectation de tous ses
+    vœux sur des créneaux distincts existe.
+
+    Le problème global (tous les élèves, tout ou rien par élève) n'est pas un
+    problème de flot ; l'optimalité vaut élève par élève, dans l'ordre de
+    traitement.
+    """
+
+    def _free_cells(self, spe: str) -> List[Tuple[int, int, int]]:
+        """Meilleure case libre de spe sur chaque créneau : (effectif, créneau, groupe)."""
+        cells = []
+        for slot_idx, row in enumerate(self._get_counts_for_specialty(spe)):
+            best: Optional[Tuple[int, int, int]] = None
+            for group_idx, count in enumerate(row):
+                if self._is_full(count):
+                    continue
+                if best is None or count < best[0]:
+                    best = (count, slot_idx, group_idx)
+            if best is not None:
+                cells.append(best)
+        cells.sort()
+        return cells
+
+    def _place_student(self, student: Student) -> bool:
+        num_slots = len(self.time_slots)
+
+        if len(student.choices) > num_slots:
+            reason = f"A {len(student.choices)} vœux pour {num_slots} créneaux disponibles"
+            self._reject(student, "N/A", reason)
+            return False
+
+        options = [self._free_cells(spe) for spe in student.choices]
+        owner: Dict[int, int] = {}          # créneau -> n° du vœu qui l'occupe
+        group_of: Dict[int, int] = {}       # créneau -> groupe retenu pour ce vœu
+
+        def augment(choice: int, visited: set) -> bool:
+            for _, slot_idx, group_idx in options[choice]:
+                if slot_idx in visited:
+                    continue
+                visited.add(slot_idx)
+                if slot_idx not in owner or augment(owner[slot_idx], visited):
+                    owner[slot_idx] = choice
+                    group_of[slot_idx] = group_idx
+                    return True
+            return False
+
+        for choice, spe in enumerate(student.choices):
+            if not augment(choice, set()):
+                reason = "Aucune répartition des vœux sur des créneaux distincts n'a de place"
+                self._reject(student, spe, reason)
+                return False
+
+        slot_of = {choice: slot_idx for slot_idx, choice in owner.items()}
+        chosen: List[Tuple[str, int, int]] = []
+        for choice, spe in enumerate(student.choices):
+            slot_idx = slot_of[choice]
+            group_idx = group_of[slot_idx]
+            self._add_to_cell(spe, slot_idx, group_idx, 1)
+            chosen.append((spe, slot_idx, group_idx))
+
+        self._commit(student, chosen)
+        return True
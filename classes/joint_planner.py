@@ -0,0 +1,130 @@
+# classes/joint_planner.py
+from __future__ import annotations
+import time
+from collections import Counter
+from typing import List, Optional, Dict, Tuple
+from classes.models import TimeSlot, Student
+from classes.planner import Planner
+
+
+class JointPlanner(Planner):
+    """
+    Répartition avec réallocation du budget global de groupes.
+
+    Après une première passe gloutonne, on regarde quelles spé bloquent les
+    élèves non placés (pression) et on déplace des groupes depuis les spé
+    qui en ont trop : un groupe n'est fermé que si ses élèves peuvent être
+    répartis dans les autres groupes de la même spé, sur le même créneau.
+    Seuls les élèves non placés sont ensuite retentés : l'état du planner est
+    conservé d'une itération à l'autre.
+
+    - group_budget: nombre total de groupes autorisé (défaut : celui de
+      groups_per_specialty)
+    - max_groups_per_spe: plafond de groupes pour une même spé
+    - time_budget: durée max (secondes) des itérations ; None = pas de limite
+    - max_iterations: nombre max d'itérations (utilisé pour rejouer un run)
+    """
+
+    def __init__(
+        self,
+        time_slots: List[TimeSlot],
+        groups_per_specialty: Dict[str, int],
+        max_per_group: Optional[int] = None,
+        seed: Optional[int] = None,
+        group_budget: Optional[int] = None,
+        max_groups_per_spe: Optional[int] = None,
+        time_budget: Optional[float] = 2.0,
+        max_iterations: Optional[int] = None,
+    ) -> None:
+        super().__init__(time_slots, groups_per_specialty, max_per_group, seed)
+        if group_budget is None:
+            group_budget = sum(groups_per_specialty.values())
+        self.group_budget = group_budget
+        self.max_groups_per_spe = max_groups_per_spe
+        self.time_budget = time_budget
+        self.max_iterations = max_iterations
+
+        self.iterations = 0
+        # (spé donneuse ou None si budget libre, spé receveuse, élèves placés)
+        self.reallocations: List[Tuple[Optional[str], str, int]] = []
+
+    def strategy_params(self) -> Dict[str, object]:
+        # le nombre d'itérations effectuées suffit à rejouer le run à l'identique
+        return {
+            "group_budget": self.group_budget,
+            "max_groups_per_spe": self.max_groups_per_spe,
+            "max_iterations": self.iterations,
+        }
+
+    # --- internes -----------------------------------------------------------
+
+    def _num_groups(self) -> int:
+        return sum(len(counts[0]) for counts in self._group_counts.values())
+
+    def _pressure(self, exhausted: set) -> List[str]:
+        """Spé bloquantes, de la plus à la moins demandée."""
+        pressure = Counter(
+            u.failed_specialty for u in self.unplaced_students
+            if u.failed_specialty in self._group_counts
+            and u.failed_specialty not in exhausted
+        )
+        return [
+            spe for spe, _ in pressure.most_common()
+            if self.max_groups_per_spe is None
+            or len(self._group_counts[spe][0]) < self.max_groups_per_spe
+        ]
+
+    def _find_donor(self, target: str, blocking: set) -> Optional[Tuple[str, int]]:
+        """Groupe le moins rempli qu'on peut fermer sans bloquer personne."""
+        best = None
+        for spe, counts in self._group_counts.items():
+            if spe == target or spe in blocking:
+                continue
+            for group_idx in range(len(counts[0])):
+                total = sum(row[group_idx] for row in counts)
+                if best is not None and total >= best[0]:
+                    continue
+                if self.can_remove_group(spe, group_idx):
+                    best = (total, spe, group_idx)
+        if best is None:
+            return None
+        return best[1], best[2]
+
+    # --- API principale -----------------------------------------------------
+
+    def plan(self, students: List[Student]) -> None:
+        super().plan(students)
+
+        deadline = None
+        if self.time_budget is not None:
+            deadline = time.perf_counter() + self.time_budget
+
+        # spé pour lesquelles un groupe de plus n'a placé personne
+        exhausted: set = set()
+
+        while self.unplaced_students:
+            if self.max_iterations is not None and self.iterations >= self.max_iterations:
+                break
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+
+            candidates = self._pressure(exhausted)
+            if not candidates:
+                break
+            target = candidates[0]
+
+            donor = None
+            if self._num_groups() >= self.group_budget:
+                blocking = {u.failed_specialty for u in self.unplaced_students}
+                donor = self._find_donor(target, blocking)
+                if donor is None:
+                    break
+                self.remove_group(*donor)
+
+            self.add_group(target)
+            placed = self.retry_unplaced()
+            self.iterations += 1
+            self.reallocations.append((donor[0] if donor else None, target, placed))
+
+            if placed == 0:
+                exhausted.add(target)
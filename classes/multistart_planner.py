@@ -0,0 +1,65 @@
+# classes/multistart_planner.py
+from __future__ import annotations
+import random
+from typing import List, Optional, Dict, Tuple
+from classes.models import TimeSlot, Student
+from classes.planner import Planner
+
+
+class MultiStartPlanner(Planner):
+    """
+    Plusieurs passes gloutonnes sur des ordres de traitement différents ;
+    la meilleure est gardée.
+
+    La passe 0 suit l'ordre de Planner (fichier ou graine), les suivantes un
+    mélange reproductible de cet ordre (graine « seed:n° de passe »). Chaque
+    passe travaille sur des copies des élèves ; le meilleur ordre (le moins
+    de non placés, puis de cases en surcharge, puis l'écart-type des
+    effectifs le plus faible) est ensuite rejoué sur ce planner.
+
+    - starts: nombre de passes (au moins 1)
+    """
+
+    def __init__(
+        self,
+        time_slots: List[TimeSlot],
+        groups_per_specialty: Dict[str, int],
+        max_per_group: Optional[int] = None,
+        seed: Optional[int] = None,
+        starts: int = 8,
+    ) -> None:
+        super().__init__(time_slots, groups_per_specialty, max_per_group, seed)
+        if starts < 1:
+            raise ValueError("Le nombre de passes doit être au moins 1.")
+        self.starts = starts
+        self.best_start: Optional[int] = None
+        # (n° de passe, non placés, cases en surcharge, écart-type)
+        self.trials: List[Tuple[int, int, int, float]] = []
+
+    def strategy_params(self) -> Dict[str, object]:
+        # les passes sont reproductibles : starts suffit à rejouer le run
+        return {"starts": self.starts}
+
+    def _trial_order(self, ordered: List[Student], start: int) -> List[Student]:
+        if start == 0:
+            return ordered
+        shuffled = list(ordered)
+        random.Random(f"{self.seed or 0}:{start}").shuffle(shuffled)
+        return shuffled
+
+    def plan(self, students: List[Student]) -> None:
+        ordered = super()._processing_order(students)
+
+        best_order = ordered
+        best_score = None
+        for start in range(self.starts):
+            order = self._trial_order(ordered, start)
+            trial = Planner(self.time_slots, self.groups_per_specialty, self.max_per_group)
+            trial.plan([Student(st.name, st.classe, st.choices) for st in order])
+            score = (len(trial.unplaced_students), trial.overfull_cells(), round(trial.fill_stddev(), 9))
+            self.trials.append((start, *score))
+            if best_score is None or score < best_score:
+                best_score, best_order, self.best_start = score, order, start
+
+        for student in best_order:
+            self._place_student(student)
@@ -0,0 +1,34 @@
+# classes/ordered_planner.py
+from __future__ import annotations
+from collections import Counter
+from typing import List, Dict
+from classes.models import Student
+from classes.planner import Planner
+
+
+class OrderedPlanner(Planner):
+    """
+    Passe gloutonne, élèves les plus contraints d'abord : ceux qui ont le
+    plus de vœux, puis ceux dont une spé est la plus demandée au regard de
+    ses places (demande / groupes). Tri stable : à contrainte égale,
+    l'ordre de Planner (fichier ou graine) est conservé.
+    """
+
+    def _processing_order(self, students: List[Student]) -> List[Student]:
+        ordered = super()._processing_order(students)
+
+        if self.roster_index is not None:
+            self.roster_index.check(students, self.time_slots)
+            demand = self.roster_index.demand
+        else:
+            demand = Counter(spe for st in ordered for spe in st.choices)
+        pressure: Dict[str, float] = {
+            spe: count / self.groups_per_specialty.get(spe, 1)
+            for spe, count in demand.items()
+        }
+
+        def constraint(st: Student):
+            tightest = max((pressure[spe] for spe in st.choices), default=0.0)
+            return (-len(st.choices), -tightest)
+
+        return sorted(ordered, key=constraint)
@@ -1,7 +1,21 @@
 # classes/planner.py
 from __future__ import annotations
-from typing import List, Optional, Dict
+import random
+from dataclasses import dataclass
+from typing import List, Optional, Dict, Tuple, Set, Iterator
 from classes.models import TimeSlot, Student, Assignment, GroupRecord, UnplacedStudent
+from classes.roster_index import OccupancySnapshot, RosterIndex
+
+
+@dataclass
+class Move:
+    """Déplacement manuel d'une affectation (pour annuler / rétablir)."""
+    student: Student
+    specialty: str
+    from_slot: int
+    from_group: int
+    to_slot: int
+    to_group: int
 
 
 class Planner:
@@ -10,6 +24,10 @@ class Planner:
 
     - groups_per_specialty: dict "spe" -> nb de groupes (salles) pour cette spé
     - max_per_group: capacité max par groupe (ici 8)
+    - seed: si fourni, les élèves sont traités dans un ordre pseudo-aléatoire
+      reproductible, indépendant de l'ordre des lignes du fichier
+    - roster_index (attribut, optionnel) : précalculs de l'effectif réparti
+      (voir classes.roster_index), partagés entre répartitions successives
     """
 
     def __init__(
@@ -17,17 +35,45 @@ class Planner:
         time_slots: List[TimeSlot],
         groups_per_specialty: Dict[str, int],
         max_per_group: Optional[int] = None,
+        seed: Optional[int] = None,
     ) -> None:
         self.time_slots = time_slots
-        self.groups_per_specialty = groups_per_specialty
+        # copie : le nombre de groupes peut évoluer (add_group / remove_group)
+        self.groups_per_specialty = dict(groups_per_specialty)
         self.max_per_group = max_per_group
+        self.seed = seed
 
         # spe -> [ [count_group0, ..., groupN], ... par créneau ]
+        # (tuples tant qu'ils sont partagés avec un OccupancySnapshot)
         self._group_counts: Dict[str, List[List[int]]] = {}
 
+        self.roster_index: Optional[RosterIndex] = None
+        # choix par défaut (case libre la moins remplie) : pas besoin d'énumérer les cases
+        self._least_filled_choice = (
+            type(self)._best_candidate is Planner._best_candidate
+            and type(self)._is_full is Planner._is_full
+        )
+
         self.group_records: List[GroupRecord] = []
         self.unplaced_students: List[UnplacedStudent] = []
 
+        # (id(élève), créneau) -> enregistrement, pour les éditions en O(1)
+        self._records_by_slot: Dict[Tuple[int, int], GroupRecord] = {}
+        # (spe, créneau, groupe) -> {id(élève): élève}
+        self._cell_members: Dict[Tuple[str, int, int], Dict[int, Student]] = {}
+
+        # Suivi incrémental de la qualité du planning
+        self._total_count = 0       # somme des effectifs de toutes les cases
+        self._total_sq = 0          # somme des carrés des effectifs
+        self._overfull_cells = 0    # cases au-delà de max_per_group
+        self._num_cells = 0         # nombre de cases ouvertes
+
+        self._undo_stack: List[Move] = []
+        self._redo_stack: List[Move] = []
+
+        # rempli par rebalance()
+        self.rebalance_report = None
+
     # --- internes -----------------------------------------------------------
 
     def _get_counts_for_specialty(self, spe: str) -> List[List[int]]:
@@ -36,32 +82,76 @@ class Planner:
             self._group_counts[spe] = [
                 [0] * nb_groups for _ in range(len(self.time_slots))
             ]
+            self._num_cells += nb_groups * len(self.time_slots)
         return self._group_counts[spe]
 
-    # --- API principale -----------------------------------------------------
+    def _writable_counts(self, spe: str) -> List[List[int]]:
+        """Compteurs d'une spé, copiés s'ils sont encore partagés (copie à l'écriture)."""
+        counts = self._get_counts_for_specialty(spe)
+        if type(counts) is tuple:
+            counts = self._group_counts[spe] = [list(row) for row in counts]
+        return counts
 
-    def plan(self, students: List[Student]) -> None:
+    # raison enregistrée quand aucune case ne convient pour un vœu
+    NO_ROOM_REASON = "Tous les créneaux/groupes sont pleins ou incompatibles"
+
+    def _is_full(self, count: int) -> bool:
+        return self.max_per_group is not None and count >= self.max_per_group
+
+    def _cell_has_room(self, student: Student, spe: str, slot_idx: int, group_idx: int, count: int) -> bool:
+        """
+        La case (spé, créneau, groupe), d'effectif count, peut-elle recevoir
+        l'élève ? Point d'extension pour les stratégies qui ferment des
+        places (voir PriorityPlanner) ; ne peut que restreindre _is_full.
+        """
+        return not self._is_full(count)
+
+    def _after_edit(self, spe: str) -> None:
+        """
+        Appelé après une édition qui a pu libérer des places de spe
+        (déplacement, annulation, rétablissement, ouverture ou fermeture de
+        groupe). Point d'extension (voir PriorityPlanner, qui promeut
+        aussitôt sa liste d'attente).
+        """
+
+    def _add_to_cell(self, spe: str, slot_idx: int, group_idx: int, delta: int) -> None:
+        """Modifie l'effectif d'une case en tenant à jour les indicateurs."""
+        counts = self._writable_counts(spe)
+        old = counts[slot_idx][group_idx]
+        new = old + delta
+        counts[slot_idx][group_idx] = new
+
+        self._total_count += delta
+        self._total_sq += new * new - old * old
+        if self.max_per_group is not None:
+            was_over = old > self.max_per_group
+            is_over = new > self.max_per_group
+            self._overfull_cells += int(is_over) - int(was_over)
+
+    def _place_student(self, student: Student) -> bool:
+        """
+        Place toutes les spé d'un élève, ou aucune.
+
+        Les affectations ne sont validées qu'une fois toutes les spé placées :
+        en cas d'échec on annule uniquement les compteurs de cet élève.
+        """
         num_slots = len(self.time_slots)
 
-        for student in students:
-            if len(student.choices) > num_slots:
-                reason = f"A {len(student.choices)} vœux pour {num_slots} créneaux disponibles"
-                self.unplaced_students.append(
-                    UnplacedStudent(
-                        student=student,
-                        failed_specialty="N/A",
-                        reason=reason
-                    )
-                )
-                continue
+        if len(student.choices) > num_slots:
+            reason = f"A {len(student.choices)} vœux pour {num_slots} créneaux disponibles"
+            self._reject(student, "N/A", reason)
+            return False
 
-            used_slots = set()
-            placement_failed = False
+        used_slots = set()
+        chosen: List[Tuple[str, int, int]] = []
 
-            for spe in student.choices:
-                counts_for_spe = self._get_counts_for_specialty(spe)
-                nb_groups = len(counts_for_spe[0])
+        for spe in student.choices:
+            counts_for_spe = self._get_counts_for_specialty(spe)
 
+            if self._least_filled_choice:
+                best = self._least_filled(student, spe, counts_for_spe, used_slots)
+            else:
+                nb_groups = len(counts_for_spe[0])
                 candidates = []
                 for slot_idx in range(num_slots):
                     if slot_idx in used_slots:
@@ -69,61 +159,431 @@ class Planner:
 
                     for group_idx in range(nb_groups):
                         current_count = counts_for_spe[slot_idx][group_idx]
-                        if (
-                            self.max_per_group is not None
-                            and current_count >= self.max_per_group
-                        ):
+                        if not self._cell_has_room(student, spe, slot_idx, group_idx, current_count):
                             continue
 
                         candidates.append((current_count, slot_idx, group_idx))
 
-                if not candidates:
-                    reason = "Tous les créneaux/groupes sont pleins ou incompatibles"
-                    self.unplaced_students.append(
-                        UnplacedStudent(
-                            student=student,
-                            failed_specialty=spe,
-                            reason=reason
-                        )
-                    )
-                    placement_failed = True
-                    break
-
-                # on choisit la case la moins remplie
-                candidates.sort(key=lambda x: x[0])
-                _, chosen_slot_idx, chosen_group_idx = candidates[0]
-
-                counts_for_spe[chosen_slot_idx][chosen_group_idx] += 1
-                used_slots.add(chosen_slot_idx)
-
-                ts = self.time_slots[chosen_slot_idx]
-                assignment = Assignment(
+                best = self._best_candidate(student, spe, candidates) if candidates else None
+
+            if best is None:
+                self._reject(student, spe, self.NO_ROOM_REASON)
+                # Annuler les compteurs déjà pris pour cet élève
+                for c_spe, c_slot, c_group in chosen:
+                    self._add_to_cell(c_spe, c_slot, c_group, -1)
+                return False
+
+            _, chosen_slot_idx, chosen_group_idx = best
+
+            self._add_to_cell(spe, chosen_slot_idx, chosen_group_idx, 1)
+            used_slots.add(chosen_slot_idx)
+            chosen.append((spe, chosen_slot_idx, chosen_group_idx))
+
+        self._commit(student, chosen)
+        return True
+
+    def _least_filled(
+        self,
+        student: Student,
+        spe: str,
+        counts_for_spe: List[List[int]],
+        used_slots: Set[int],
+    ) -> Optional[Tuple[int, int, int]]:
+        """
+        Même case que _best_candidate parmi toutes les cases libres, sans les
+        énumérer : le minimum de chaque créneau (calculé par min, en C), puis
+        le créneau le moins rempli, le premier en cas d'égalité. Si
+        _cell_has_room refuse ce minimum, le créneau est parcouru case par case.
+        """
+        best = None
+        for slot_idx, row in enumerate(counts_for_spe):
+            if slot_idx in used_slots:
+                continue
+            count = min(row)
+            if self._is_full(count):
+                continue        # créneau plein
+            if best is not None and count >= best[0]:
+                continue
+            group_idx = row.index(count)
+            if self._cell_has_room(student, spe, slot_idx, group_idx, count):
+                best = (count, slot_idx, group_idx)
+                continue
+            for group_idx, count in enumerate(row):
+                if (best is None or count < best[0]) and self._cell_has_room(
+                    student, spe, slot_idx, group_idx, count
+                ):
+                    best = (count, slot_idx, group_idx)
+        return best
+
+    def _best_candidate(
+        self,
+        student: Student,
+        spe: str,
+        candidates: List[Tuple[int, int, int]],
+    ) -> Tuple[int, int, int]:
+        """
+        Choix parmi les cases libres (effectif, créneau, groupe) : la moins
+        remplie, la première en cas d'égalité. Point d'extension pour les
+        stratégies qui pondèrent autrement (voir RotationPlanner).
+        """
+        return min(candidates, key=lambda x: x[0])
+
+    def _reject(self, student: Student, failed_specialty: str, reason: str) -> None:
+        self.unplaced_students.append(
+            UnplacedStudent(
+                student=student,
+                failed_specialty=failed_specialty,
+                reason=reason
+            )
+        )
+
+    def _commit(self, student: Student, chosen: List[Tuple[str, int, int]]) -> None:
+        """Enregistre les cases (spé, créneau, groupe) retenues pour l'élève."""
+        for spe, slot_idx, group_idx in chosen:
+            ts = self.time_slots[slot_idx]
+            student.add_assignment(
+                Assignment(
                     specialty=spe,
                     timeslot=ts,
-                    group_index=chosen_group_idx,
+                    group_index=group_idx,
+                )
+            )
+            record = GroupRecord(
+                specialty=spe,
+                timeslot=ts,
+                group_index=group_idx,
+                student_name=student.name,
+                classe=student.classe,
+            )
+            self.group_records.append(record)
+            self._records_by_slot[(id(student), slot_idx)] = record
+            self._cell_members.setdefault((spe, slot_idx, group_idx), {})[id(student)] = student
+
+    # --- API principale -----------------------------------------------------
+
+    def _processing_order(self, students: List[Student]) -> List[Student]:
+        if self.seed is None:
+            return students
+        if self.roster_index is not None:
+            # même ordre, tri et tirage déjà faits pour cet effectif
+            self.roster_index.check(students, self.time_slots)
+            return [students[i] for i in self.roster_index.order(self.seed)]
+        # ordre canonique d'abord, pour ne plus dépendre de l'ordre du fichier
+        ordered = sorted(students, key=lambda st: (st.name, st.classe, st.choices))
+        random.Random(self.seed).shuffle(ordered)
+        return ordered
+
+    def plan(self, students: List[Student]) -> None:
+        for student in self._processing_order(students):
+            self._place_student(student)
+
+    def retry_unplaced(self) -> int:
+        """
+        Retente de placer les élèves non placés (dans le même ordre), par
+        exemple après l'ouverture d'un groupe. Retourne le nombre d'élèves
+        nouvellement placés.
+        """
+        pending = self.unplaced_students
+        self.unplaced_students = []
+        for unplaced in pending:
+            self._place_student(unplaced.student)
+        return len(pending) - len(self.unplaced_students)
+
+    def rebalance(self, min_per_group: int):
+        """
+        Passe d'équilibrage : complète ou fusionne les groupes de moins de
+        min_per_group élèves (voir classes.rebalancer). Retourne le rapport.
+        """
+        from classes.rebalancer import rebalance
+
+        self.rebalance_report = rebalance(self, min_per_group)
+        return self.rebalance_report
+
+    def cleanup(self) -> None:
+        """Libère les fichiers temporaires éventuels (aucun ici, voir StreamingPlanner)."""
+
+    def strategy_params(self) -> Dict[str, object]:
+        """Paramètres propres à la stratégie, enregistrés dans le manifeste."""
+        return {}
+
+    def occupancy_snapshot(self) -> OccupancySnapshot:
+        """Effectifs actuels des cases, figés (voir restore_occupancy)."""
+        return OccupancySnapshot(
+            counts={
+                spe: tuple(tuple(row) for row in counts)
+                for spe, counts in self._group_counts.items()
+            },
+            max_per_group=self.max_per_group,
+            total_count=self._total_count,
+            total_sq=self._total_sq,
+            overfull_cells=self._overfull_cells,
+            num_cells=self._num_cells,
+        )
+
+    def restore_occupancy(self, snapshot: OccupancySnapshot) -> None:
+        """
+        Repart des effectifs d'un instantané, sans le copier : les compteurs
+        d'une spé ne sont copiés qu'à leur première modification. Les
+        élèves et les enregistrements ne sont pas concernés.
+        """
+        self._group_counts = dict(snapshot.counts)
+        self.groups_per_specialty.update(
+            {spe: len(counts[0]) for spe, counts in snapshot.counts.items()}
+        )
+        self._total_count = snapshot.total_count
+        self._total_sq = snapshot.total_sq
+        self._overfull_cells = snapshot.overfull_cells
+        self._num_cells = snapshot.num_cells
+        if snapshot.max_per_group != self.max_per_group:
+            # autre capacité (simulation d'un remède) : surcharges recomptées
+            self._overfull_cells = 0 if self.max_per_group is None else sum(
+                1 for counts in snapshot.counts.values()
+                for row in counts for count in row if count > self.max_per_group
+            )
+
+    # --- Éditions manuelles -------------------------------------------------
+
+    def check_move(
+        self,
+        student: Student,
+        from_slot: int,
+        to_slot: int,
+        to_group: int,
+        allow_overfull: bool = False,
+    ) -> List[str]:
+        """
+        Vérifie un déplacement sans l'appliquer (O(1)).
+
+        Retourne la liste des contraintes violées (vide si le déplacement
+        est valide). Avec allow_overfull=True, la capacité n'est pas vérifiée.
+        """
+        assignment = student.assignments.get(from_slot)
+        if assignment is None:
+            return [f"{student.name} n'a pas d'affectation sur ce créneau"]
+
+        counts = self._get_counts_for_specialty(assignment.specialty)
+        problems = []
+
+        if not 0 <= to_slot < len(self.time_slots):
+            return [f"Créneau inconnu : {to_slot}"]
+        if not 0 <= to_group < len(counts[0]):
+            return [f"{assignment.specialty} n'a pas de groupe g{to_group + 1}"]
+
+        if to_slot != from_slot and to_slot in student.assignments:
+            other = student.assignments[to_slot]
+            problems.append(
+                f"{student.name} a déjà {other.specialty} sur le créneau "
+                f"{self.time_slots[to_slot].label}"
+            )
+
+        same_cell = to_slot == from_slot and to_group == assignment.group_index
+        count = counts[to_slot][to_group]
+        if not allow_overfull and not same_cell:
+            if self._is_full(count):
+                problems.append(
+                    f"{assignment.specialty} g{to_group + 1} est complet sur le créneau "
+                    f"{self.time_slots[to_slot].label} (max {self.max_per_group})"
                 )
-                student.add_assignment(assignment)
-
-                self.group_records.append(
-                    GroupRecord(
-                        specialty=spe,
-                        timeslot=ts,
-                        group_index=chosen_group_idx,
-                        student_name=student.name,
-                        classe=student.classe,
-                    )
+            elif not self._cell_has_room(student, assignment.specialty, to_slot, to_group, count):
+                problems.append(
+                    f"Les places libres de {assignment.specialty} g{to_group + 1} sur le créneau "
+                    f"{self.time_slots[to_slot].label} sont réservées"
                 )
-            
-            # Si le placement a échoué, annuler toutes les affectations de cet élève
-            if placement_failed:
-                # Retirer les enregistrements de groupe de cet élève
-                self.group_records = [
-                    gr for gr in self.group_records
-                    if gr.student_name != student.name
+
+        return problems
+
+    def _apply_move(self, student: Student, from_slot: int, to_slot: int, to_group: int) -> Move:
+        assignment = student.assignments.pop(from_slot)
+        move = Move(
+            student=student,
+            specialty=assignment.specialty,
+            from_slot=from_slot,
+            from_group=assignment.group_index,
+            to_slot=to_slot,
+            to_group=to_group,
+        )
+
+        self._add_to_cell(assignment.specialty, from_slot, assignment.group_index, -1)
+        self._add_to_cell(assignment.specialty, to_slot, to_group, 1)
+
+        ts = self.time_slots[to_slot]
+        assignment.timeslot = ts
+        assignment.group_index = to_group
+        student.add_assignment(assignment)
+
+        record = self._records_by_slot.pop((id(student), from_slot))
+        record.timeslot = ts
+        record.group_index = to_group
+        self._records_by_slot[(id(student), to_slot)] = record
+
+        del self._cell_members[(move.specialty, from_slot, move.from_group)][id(student)]
+        self._cell_members.setdefault(
+            (move.specialty, to_slot, to_group), {}
+        )[id(student)] = student
+
+        return move
+
+    def move_student(
+        self,
+        student: Student,
+        from_slot: int,
+        to_slot: int,
+        to_group: int,
+        allow_overfull: bool = False,
+    ) -> Move:
+        """
+        Déplace l'affectation d'un élève vers un autre créneau et/ou groupe
+        de la même spécialité.
+
+        Lève ValueError si le déplacement viole une contrainte (un dépassement
+        de capacité peut être forcé avec allow_overfull=True ; un double
+        créneau jamais).
+        """
+        problems = self.check_move(student, from_slot, to_slot, to_group, allow_overfull)
+        if problems:
+            raise ValueError("\n".join(problems))
+
+        move = self._apply_move(student, from_slot, to_slot, to_group)
+        self._undo_stack.append(move)
+        self._redo_stack.clear()
+        self._after_edit(move.specialty)
+        return move
+
+    def can_undo(self) -> bool:
+        return bool(self._undo_stack)
+
+    def can_redo(self) -> bool:
+        return bool(self._redo_stack)
+
+    def undo(self) -> Optional[Move]:
+        """Annule le dernier déplacement manuel."""
+        if not self._undo_stack:
+            return None
+        move = self._undo_stack.pop()
+        self._apply_move(move.student, move.to_slot, move.from_slot, move.from_group)
+        self._redo_stack.append(move)
+        self._after_edit(move.specialty)
+        return move
+
+    def redo(self) -> Optional[Move]:
+        """Rétablit le dernier déplacement annulé."""
+        if not self._redo_stack:
+            return None
+        move = self._redo_stack.pop()
+        self._apply_move(move.student, move.from_slot, move.to_slot, move.to_group)
+        self._undo_stack.append(move)
+        self._after_edit(move.specialty)
+        return move
+
+    # --- Structure des groupes ----------------------------------------------
+
+    def cell_members(self, spe: str, slot_idx: int, group_idx: int) -> List[Student]:
+        """Élèves affectés à une case (spé, créneau, groupe)."""
+        return list(self._cell_members.get((spe, slot_idx, group_idx), {}).values())
+
+    def add_group(self, spe: str) -> int:
+        """Ouvre un groupe supplémentaire pour une spé ; retourne son indice."""
+        counts = self._writable_counts(spe)
+        for row in counts:
+            row.append(0)
+        self.groups_per_specialty[spe] = len(counts[0])
+        self._num_cells += len(self.time_slots)
+        self._after_edit(spe)
+        return len(counts[0]) - 1
+
+    def can_remove_group(self, spe: str, group_idx: int) -> bool:
+        """
+        Vrai si les élèves du groupe peuvent être répartis dans les autres
+        groupes de la même spé, sur le même créneau (donc sans conflit).
+        """
+        counts = self._group_counts.get(spe)
+        if counts is None or len(counts[0]) <= 1:
+            return False
+        if self.max_per_group is None:
+            return True
+        for row in counts:
+            free = sum(
+                max(0, self.max_per_group - c)
+                for g, c in enumerate(row) if g != group_idx
+            )
+            if row[group_idx] > free:
+                return False
+        return True
+
+    def remove_group(self, spe: str, group_idx: int) -> None:
+        """
+        Ferme un groupe : ses élèves rejoignent les groupes les moins remplis
+        de la même spé sur le même créneau (en priorité ceux que
+        _cell_has_room accepte), puis les groupes suivants sont renumérotés.
+        """
+        if not self.can_remove_group(spe, group_idx):
+            raise ValueError(f"Impossible de fermer le groupe g{group_idx + 1} de {spe}")
+
+        counts = self._writable_counts(spe)
+        nb_groups = len(counts[0])
+
+        for slot_idx, row in enumerate(counts):
+            for student in self.cell_members(spe, slot_idx, group_idx):
+                others = [g for g in range(nb_groups) if g != group_idx and not self._is_full(row[g])]
+                admissible = [
+                    g for g in others
+                    if self._cell_has_room(student, spe, slot_idx, g, row[g])
                 ]
-                # Réinitialiser les compteurs pour cet élève
-                for assignment in student.assignments.values():
-                    counts = self._get_counts_for_specialty(assignment.specialty)
-                    counts[assignment.timeslot.index][assignment.group_index] -= 1
-                # Vider les affectations de l'élève
-                student.assignments.clear()
+                target = min(admissible or others, key=lambda g: row[g])
+                self._apply_move(student, slot_idx, slot_idx, target)
+
+        for slot_idx, row in enumerate(counts):
+            row.pop(group_idx)
+            self._cell_members.pop((spe, slot_idx, group_idx), None)
+            for g in range(group_idx + 1, nb_groups):
+                members = self._cell_members.pop((spe, slot_idx, g), None)
+                if not members:
+                    continue
+                self._cell_members[(spe, slot_idx, g - 1)] = members
+                for student in members.values():
+                    student.assignments[slot_idx].group_index = g - 1
+                    self._records_by_slot[(id(student), slot_idx)].group_index = g - 1
+
+        self.groups_per_specialty[spe] = nb_groups - 1
+        self._num_cells -= len(self.time_slots)
+        # les déplacements mémorisés font référence aux anciens numéros de groupe
+        self._undo_stack.clear()
+        self._redo_stack.clear()
+        self._after_edit(spe)
+
+    # --- Indicateurs --------------------------------------------------------
+
+    def iter_counts(self) -> Iterator[Tuple[str, Tuple[Tuple[int, ...], ...]]]:
+        """
+        (spé, effectifs) de chaque spé ayant des cases, dans l'ordre
+        d'ouverture ; effectifs en lecture seule, une ligne par créneau.
+        """
+        for spe, counts in self._group_counts.items():
+            yield spe, tuple(tuple(row) for row in counts)
+
+    def cell_count(self, spe: str, slot_idx: int, group_idx: int) -> int:
+        """Effectif d'une case (spé, créneau, groupe) ; 0 si la spé n'a pas de case."""
+        counts = self._group_counts.get(spe)
+        return 0 if counts is None else counts[slot_idx][group_idx]
+
+    def small_cells(self, min_per_group: int) -> int:
+        """Nombre de cases non vides de moins de min_per_group élèves."""
+        return sum(
+            1
+            for counts in self._group_counts.values()
+            for row in counts
+            for count in row
+            if 0 < count < min_per_group
+        )
+
+    def overfull_cells(self) -> int:
+        """Nombre de cases (spé, créneau, groupe) au-delà de max_per_group."""
+        return self._overfull_cells
+
+    def fill_stddev(self) -> float:
+        """Écart-type des effectifs sur toutes les cases ouvertes (O(1))."""
+        if self._num_cells == 0:
+            return 0.0
+        mean = self._total_count / self._num_cells
+        variance = max(0.0, self._total_sq / self._num_cells - mean * mean)
+        return variance ** 0.5
@@ -0,0 +1,389 @@
+# classes/priority_planner.py
+from __future__ import annotations
+import heapq
+import json
+from dataclasses import dataclass, field, asdict
+from typing import List, Optional, Dict, Tuple, Set
+from classes.models import TimeSlot, Student, UnplacedStudent
+from classes.planner import Planner
+
+
+def _norm(text: str) -> str:
+    """Casse et espaces ignorés (« tg2 » == « TG2 »)."""
+    return " ".join(text.casefold().split())
+
+
+@dataclass
+class PriorityTier:
+    """
+    Un niveau de priorité : les élèves des classes commençant par l'un des
+    préfixes de classes (ex. "T" pour les terminales), ou cités dans
+    students (nom, classe), ex. besoins particuliers.
+
+    reserved: places gardées dans chaque groupe (case spé / créneau /
+    groupe) pour ce niveau : les niveaux moins prioritaires ne peuvent pas
+    les prendre, même si ses élèves arrivent plus tard.
+    """
+    name: str
+    classes: List[str] = field(default_factory=list)
+    students: List[Tuple[str, str]] = field(default_factory=list)
+    reserved: int = 0
+
+
+@dataclass
+class PriorityPolicy:
+    """Niveaux du plus au moins prioritaire ; les autres élèves passent en dernier."""
+    tiers: List[PriorityTier] = field(default_factory=list)
+
+    def __post_init__(self) -> None:
+        self._by_student: Dict[Tuple[str, str], int] = {}
+        for tier_idx, tier in reversed(list(enumerate(self.tiers))):
+            for name, classe in tier.students:
+                self._by_student[(_norm(name), _norm(classe))] = tier_idx
+        self._prefixes = [
+            (_norm(prefix), tier_idx)
+            for tier_idx, tier in enumerate(self.tiers)
+            for prefix in tier.classes
+        ]
+
+    @property
+    def num_tiers(self) -> int:
+        """Nombre de niveaux, y compris celui des élèves sans priorité."""
+        return len(self.tiers) + 1
+
+    def tier_name(self, tier_idx: int) -> str:
+        return self.tiers[tier_idx].name if tier_idx < len(self.tiers) else "sans priorité"
+
+    def tier_of(self, student: Student) -> int:
+        """Niveau d'un élève (0 = le plus prioritaire)."""
+        classe = _norm(student.classe)
+        tier_idx = self._by_student.get((_norm(student.name), classe))
+        if tier_idx is not None:
+            return tier_idx
+        for prefix, tier_idx in self._prefixes:
+            if classe.startswith(prefix):
+                return tier_idx
+        return len(self.tiers)
+
+    def to_dict(self) -> Dict[str, object]:
+        return {"tiers": [asdict(tier) for tier in self.tiers]}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, object]) -> "PriorityPolicy":
+        tiers = []
+        for raw in data.get("tiers", []):
+            if "name" not in raw:
+                raise ValueError("Chaque niveau de priorité doit avoir un nom (« name »).")
+            reserved = int(raw.get("reserved", 0))
+            if reserved < 0:
+                raise ValueError(f"Places réservées négatives pour le niveau « {raw['name']} ».")
+            tiers.append(PriorityTier(
+                name=raw["name"],
+                classes=list(raw.get("classes", [])),
+                students=[tuple(pair) for pair in raw.get("students", [])],
+                reserved=reserved,
+            ))
+        return cls(tiers)
+
+
+def load_priorities(path: str) -> PriorityPolicy:
+    """
+    Lit un fichier de priorités (.json), par exemple :
+
+        {"tiers": [
+            {"name": "besoins particuliers", "students": [["Dupont Léa", "1G2"]], "reserved": 1},
+            {"name": "terminale", "classes": ["T"], "reserved": 2}
+        ]}
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        return PriorityPolicy.from_dict(json.load(f))
+
+
+class Waitlist:
+    """
+    Liste d'attente d'une spé : élèves par niveau puis ordre d'arrivée.
+
+    Tas + index par élève : ajout, retrait et tête de file en O(log n) ;
+    une entrée retirée est seulement marquée, puis ignorée au dépilage.
+    """
+
+    def __init__(self) -> None:
+        self._heap: List[list] = []
+        self._entries: Dict[int, list] = {}     # id(élève) -> [niveau, arrivée, élève, valide]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, student: Student) -> bool:
+        return id(student) in self._entries
+
+    def push(self, student: Student, tier: int, arrival: int) -> None:
+        self.discard(student)
+        entry = [tier, arrival, student, True]
+        self._entries[id(student)] = entry
+        heapq.heappush(self._heap, entry)
+
+    def discard(self, student: Student) -> bool:
+        entry = self._entries.pop(id(student), None)
+        if entry is None:
+            return False
+        entry[3] = False
+        return True
+
+    def pop(self) -> Optional[Student]:
+        """Retire et retourne la tête de file (None si vide)."""
+        while self._heap:
+            entry = heapq.heappop(self._heap)
+            if entry[3]:
+                del self._entries[id(entry[2])]
+                return entry[2]
+        return None
+
+    def students(self) -> List[Student]:
+        """Élèves en attente, dans l'ordre de promotion."""
+        return [entry[2] for entry in sorted(self._entries.values(), key=lambda e: (e[0], e[1]))]
+
+    def position(self, student: Student) -> Optional[int]:
+        """Rang (1 = prochain promu) ou None."""
+        entry = self._entries.get(id(student))
+        if entry is None:
+            return None
+        key = (entry[0], entry[1])
+        return 1 + sum(1 for e in self._entries.values() if (e[0], e[1]) < key)
+
+
+class PriorityPlanner(Planner):
+    """
+    Répartition par niveaux de priorité, avec places réservées et listes
+    d'attente.
+
+    Les élèves sont traités par niveau (voir PriorityPolicy), puis dans
+    l'ordre d'arrivée (ordre de Planner : fichier ou graine). Dans chaque
+    case, les places réservées aux niveaux plus prioritaires et non encore
+    occupées par eux sont fermées aux autres. Un élève non placé entre dans
+    la liste d'attente de la spé qui l'a bloqué ; dès qu'une place se libère
+    (withdraw_student, add_group, et toute édition manuelle : déplacement,
+    annulation, fermeture de groupe) ou qu'un élève arrive en cours de
+    route (add_student), les listes concernées sont promues immédiatement,
+    dans l'ordre niveau puis arrivée. Les déplacements manuels respectent
+    aussi les places réservées (check_move).
+
+    - priorities: PriorityPolicy ou son dict (to_dict), enregistré dans le manifeste
+    """
+
+    NO_ROOM_REASON = "Tous les créneaux/groupes sont pleins, réservés ou incompatibles"
+
+    def __init__(
+        self,
+        time_slots: List[TimeSlot],
+        groups_per_specialty: Dict[str, int],
+        max_per_group: Optional[int] = None,
+        seed: Optional[int] = None,
+        priorities: Optional[object] = None,
+    ) -> None:
+        super().__init__(time_slots, groups_per_specialty, max_per_group, seed)
+        if priorities is None:
+            priorities = PriorityPolicy()
+        elif isinstance(priorities, dict):
+            priorities = PriorityPolicy.from_dict(priorities)
+        self.policy: PriorityPolicy = priorities
+
+        reserved = [tier.reserved for tier in self.policy.tiers] + [0]
+        self._reserved = reserved
+        # places réservées aux niveaux plus prioritaires que chaque niveau
+        self._reserved_above = [sum(reserved[:t]) for t in range(len(reserved))]
+
+        self._tiers: Dict[int, int] = {}            # id(élève) -> niveau
+        self._arrival: Dict[int, int] = {}          # id(élève) -> ordre d'arrivée
+        self._next_arrival = 0
+
+        self.waitlists: Dict[str, Waitlist] = {}
+        self._waiting_on: Dict[int, str] = {}       # id(élève) -> spé attendue
+        self._unplaced_by_id: Dict[int, UnplacedStudent] = {}
+        # pendant une promotion de la spé : refus remis en file après coup
+        self._promoting: Optional[str] = None
+        self._deferred: List[Student] = []
+
+        # (élève, spé dont la liste l'a promu)
+        self.promotions: List[Tuple[Student, str]] = []
+
+    def strategy_params(self) -> Dict[str, object]:
+        return {"priorities": self.policy.to_dict()}
+
+    # --- internes -----------------------------------------------------------
+
+    def tier_of(self, student: Student) -> int:
+        tier = self._tiers.get(id(student))
+        if tier is None:
+            tier = self._tiers[id(student)] = self.policy.tier_of(student)
+        return tier
+
+    def _arrive(self, student: Student) -> None:
+        if id(student) not in self._arrival:
+            self._arrival[id(student)] = self._next_arrival
+            self._next_arrival += 1
+
+    def _held(self, tier: int, spe: str, slot_idx: int, group_idx: int) -> int:
+        """Places de la case encore réservées aux niveaux plus prioritaires que tier."""
+        members = self._cell_members.get((spe, slot_idx, group_idx), {})
+        present = [0] * len(self._reserved)
+        for student in members.values():
+            present[self.tier_of(student)] += 1
+        return sum(max(0, self._reserved[t] - present[t]) for t in range(tier))
+
+    def _has_room(self, tier: int, spe: str, slot_idx: int, group_idx: int, count: int) -> bool:
+        if self.max_per_group is None:
+            return True
+        if count >= self.max_per_group:
+            return False
+        # réservations vérifiées seulement près de la capacité
+        if count + self._reserved_above[tier] < self.max_per_group:
+            return True
+        return count + self._held(tier, spe, slot_idx, group_idx) < self.max_per_group
+
+    def _cell_has_room(self, student: Student, spe: str, slot_idx: int, group_idx: int, count: int) -> bool:
+        return self._has_room(self.tier_of(student), spe, slot_idx, group_idx, count)
+
+    def _place_student(self, student: Student) -> bool:
+        self._arrive(student)
+        return super()._place_student(student)
+
+    def _reject(self, student: Student, failed_specialty: str, reason: str) -> None:
+        super()._reject(student, failed_specialty, reason)
+        self._unplaced_by_id[id(student)] = self.unplaced_students[-1]
+        self._leave_waitlist(student)
+        if failed_specialty not in student.choices:
+            return      # trop de vœux : aucune place ne le débloquera
+        if failed_specialty == self._promoting:
+            self._deferred.append(student)
+            return
+        self._join_waitlist(student, failed_specialty)
+
+    def _commit(self, student: Student, chosen: List[Tuple[str, int, int]]) -> None:
+        super()._commit(student, chosen)
+        self._leave_waitlist(student)
+        self._unplaced_by_id.pop(id(student), None)
+
+    def _join_waitlist(self, student: Student, spe: str) -> None:
+        queue = self.waitlists.get(spe)
+        if queue is None:
+            queue = self.waitlists[spe] = Waitlist()
+        queue.push(student, self.tier_of(student), self._arrival[id(student)])
+        self._waiting_on[id(student)] = spe
+
+    def _leave_waitlist(self, student: Student) -> None:
+        spe = self._waiting_on.pop(id(student), None)
+        if spe is not None:
+            self.waitlists[spe].discard(student)
+
+    def _has_free_seat(self, spe: str) -> bool:
+        if self.max_per_group is None:
+            return True
+        return any(
+            count < self.max_per_group
+            for row in self._get_counts_for_specialty(spe) for count in row
+        )
+
+    def _drop_unplaced(self, superseded: Set[int]) -> None:
+        """Retire de unplaced_students les entrées remplacées (une passe)."""
+        if superseded:
+            self.unplaced_students = [u for u in self.unplaced_students if id(u) not in superseded]
+
+    # --- API principale -----------------------------------------------------
+
+    def _processing_order(self, students: List[Student]) -> List[Student]:
+        ordered = super()._processing_order(students)
+        for student in ordered:
+            self._arrive(student)
+        # tri stable : ordre d'arrivée conservé dans chaque niveau
+        return sorted(ordered, key=self.tier_of)
+
+    def promote(self, spe: str) -> List[Student]:
+        """
+        Place les élèves en attente pour spe, tant qu'il reste une place
+        dans la spé. Retourne les élèves promus.
+        """
+        queue = self.waitlists.get(spe)
+        promoted: List[Student] = []
+        superseded: Set[int] = set()
+        self._promoting, self._deferred = spe, []
+        try:
+            while queue and self._has_free_seat(spe):
+                student = queue.pop()
+                del self._waiting_on[id(student)]
+                superseded.add(id(self._unplaced_by_id[id(student)]))
+                if self._place_student(student):
+                    promoted.append(student)
+                    self.promotions.append((student, spe))
+        finally:
+            self._promoting = None
+            for student in self._deferred:
+                self._join_waitlist(student, spe)
+            self._deferred = []
+
+        self._drop_unplaced(superseded)
+        if promoted:
+            # un déplacement annulé pourrait reprendre la place d'un promu
+            self._undo_stack.clear()
+            self._redo_stack.clear()
+        return promoted
+
+    def add_student(self, student: Student) -> bool:
+        """Élève arrivé après la répartition : placé ou mis en attente. Vrai si placé."""
+        return self._place_student(student)
+
+    def withdraw_student(self, student: Student) -> List[Student]:
+        """
+        Retire un élève du planning (départ, changement de vœux) et promeut
+        aussitôt les listes d'attente des spé libérées. Retourne les promus.
+        """
+        if id(student) in self._unplaced_by_id:
+            self._leave_waitlist(student)
+            self._drop_unplaced({id(self._unplaced_by_id.pop(id(student)))})
+            return []
+
+        freed: List[str] = []
+        records = set()
+        for slot_idx, assignment in list(student.assignments.items()):
+            spe, group_idx = assignment.specialty, assignment.group_index
+            self._add_to_cell(spe, slot_idx, group_idx, -1)
+            records.add(id(self._records_by_slot.pop((id(student), slot_idx))))
+            del self._cell_members[(spe, slot_idx, group_idx)][id(student)]
+            freed.append(spe)
+        student.assignments.clear()
+        if records:
+            self.group_records = [r for r in self.group_records if id(r) not in records]
+        # les déplacements mémorisés peuvent concerner cet élève
+        self._undo_stack.clear()
+        self._redo_stack.clear()
+
+        promoted: List[Student] = []
+        for spe in freed:
+            promoted += self.promote(spe)
+        return promoted
+
+    def _after_edit(self, spe: str) -> None:
+        # déplacement, annulation, groupe ouvert ou fermé : places libérées
+        self.promote(spe)
+
+    def waitlist_position(self, student: Student) -> Optional[Tuple[str, int]]:
+        """(spé attendue, rang) d'un élève en attente, sinon None."""
+        spe = self._waiting_on.get(id(student))
+        if spe is None:
+            return None
+        return spe, self.waitlists[spe].position(student)
+
+    def waitlist_summary(self) -> str:
+        lines = []
+        for spe, queue in sorted(self.waitlists.items()):
+            if not queue:
+                continue
+            by_tier: Dict[int, int] = {}
+            for student in queue.students():
+                tier = self.tier_of(student)
+                by_tier[tier] = by_tier.get(tier, 0) + 1
+            detail = ", ".join(f"{n} {self.policy.tier_name(t)}" for t, n in sorted(by_tier.items()))
+            lines.append(f"- {spe} : {len(queue)} en attente ({detail})")
+        if self.promotions:
+            lines.append(f"{len(self.promotions)} élève(s) promu(s) depuis une liste d'attente.")
+        return "\n".join(lines) if lines else "Aucune liste d'attente."
@@ -0,0 +1,161 @@
+# classes/rebalancer.py
+from __future__ import annotations
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import List, Dict, Tuple
+from classes.models import Student
+from classes.planner import Planner
+
+Cell = Tuple[str, int, int]  # (spé, créneau, groupe)
+
+
+@dataclass
+class RebalanceReport:
+    min_per_group: int
+    moved: int = 0                 # nombre de déplacements effectués
+    merged_cells: int = 0          # cases vidées (élèves répartis ailleurs)
+    filled_cells: int = 0          # cases complétées jusqu'au minimum
+    remaining_small: List[Cell] = field(default_factory=list)
+    sizes_before: Dict[int, int] = field(default_factory=dict)  # effectif -> nb de cases
+    sizes_after: Dict[int, int] = field(default_factory=dict)
+
+    def summary(self) -> str:
+        def fmt(sizes: Dict[int, int]) -> str:
+            return ", ".join(f"{size}: {n}" for size, n in sorted(sizes.items())) or "-"
+
+        return (
+            f"{self.moved} déplacement(s), {self.filled_cells} groupe(s) complété(s), "
+            f"{self.merged_cells} groupe(s) fusionné(s), "
+            f"{len(self.remaining_small)} groupe(s) encore sous {self.min_per_group} élèves\n"
+            f"Effectifs avant (taille: nb de groupes) : {fmt(self.sizes_before)}\n"
+            f"Effectifs après (taille: nb de groupes) : {fmt(self.sizes_after)}"
+        )
+
+
+def size_distribution(planner: Planner) -> Dict[int, int]:
+    """Effectif -> nombre de cases (spé, créneau, groupe) non vides."""
+    sizes = Counter()
+    for counts in planner._group_counts.values():
+        for row in counts:
+            for count in row:
+                if count > 0:
+                    sizes[count] += 1
+    return dict(sizes)
+
+
+class Rebalancer:
+    """
+    Passe d'équilibrage après la répartition : aucune case
+    (spé, créneau, groupe) ne doit garder moins de min_per_group élèves.
+
+    Pour chaque case trop petite, on essaie d'abord de la compléter avec des
+    élèves pris dans les cases plus remplies de la même spé (même créneau en
+    priorité, sinon un autre créneau libre pour l'élève), puis, à défaut, de
+    la fusionner : tous ses élèves rejoignent d'autres cases de la spé.
+    Chaque déplacement passe par Planner.check_move (capacité, conflits de
+    créneau) ; les effectifs sont lus directement dans les compteurs du
+    planner, sans reparcourir les élèves.
+    """
+
+    def __init__(self, planner: Planner, min_per_group: int) -> None:
+        self.planner = planner
+        self.min_per_group = min_per_group
+
+    # --- internes -----------------------------------------------------------
+
+    def _count(self, cell: Cell) -> int:
+        spe, slot_idx, group_idx = cell
+        return self.planner._group_counts[spe][slot_idx][group_idx]
+
+    def _cells_of(self, spe: str, same_slot_first: int) -> List[Cell]:
+        counts = self.planner._group_counts[spe]
+        cells = [
+            (spe, slot_idx, group_idx)
+            for slot_idx in range(len(counts))
+            for group_idx in range(len(counts[slot_idx]))
+        ]
+        # même créneau d'abord : déplacement sans risque de conflit
+        cells.sort(key=lambda c: c[1] != same_slot_first)
+        return cells
+
+    def _move(self, student: Student, source: Cell, target: Cell) -> bool:
+        _, from_slot, _ = source
+        _, to_slot, to_group = target
+        if self.planner.check_move(student, from_slot, to_slot, to_group):
+            return False
+        self.planner._apply_move(student, from_slot, to_slot, to_group)
+        return True
+
+    def _fill(self, cell: Cell, report: RebalanceReport) -> None:
+        """Complète la case avec des élèves de cases au-dessus du minimum."""
+        spe, slot_idx, _ = cell
+        for donor in self._cells_of(spe, slot_idx):
+            if donor == cell:
+                continue
+            for student in self.planner.cell_members(*donor):
+                if self._count(cell) >= self.min_per_group:
+                    return
+                if self._count(donor) <= self.min_per_group:
+                    break
+                if self._move(student, donor, cell):
+                    report.moved += 1
+
+    def _merge(self, cell: Cell, report: RebalanceReport) -> bool:
+        """
+        Répartit tous les élèves de la case dans d'autres cases non vides de
+        la spé. Tout ou rien : si un élève ne peut pas être déplacé, on annule.
+        """
+        spe, slot_idx, group_idx = cell
+        done: List[Tuple[Student, Cell]] = []
+
+        for student in self.planner.cell_members(*cell):
+            for target in self._cells_of(spe, slot_idx):
+                if target == cell or self._count(target) == 0:
+                    continue
+                if self._move(student, cell, target):
+                    done.append((student, target))
+                    break
+            else:
+                # annulation des déplacements déjà faits
+                for moved_student, target in reversed(done):
+                    self.planner._apply_move(moved_student, target[1], slot_idx, group_idx)
+                return False
+
+        report.moved += len(done)
+        return True
+
+    # --- API principale -----------------------------------------------------
+
+    def run(self) -> RebalanceReport:
+        report = RebalanceReport(min_per_group=self.min_per_group)
+        report.sizes_before = size_distribution(self.planner)
+
+        small = [
+            (spe, slot_idx, group_idx)
+            for spe, counts in self.planner._group_counts.items()
+            for slot_idx, row in enumerate(counts)
+            for group_idx, count in enumerate(row)
+            if 0 < count < self.min_per_group
+        ]
+        # les plus petites d'abord : ce sont les plus faciles à fusionner
+        small.sort(key=self._count)
+
+        for cell in small:
+            if not 0 < self._count(cell) < self.min_per_group:
+                continue  # déjà réglée par un déplacement précédent
+            self._fill(cell, report)
+            if self._count(cell) >= self.min_per_group:
+                report.filled_cells += 1
+                continue
+            if self._merge(cell, report):
+                report.merged_cells += 1
+
+        report.remaining_small = [
+            cell for cell in small if 0 < self._count(cell) < self.min_per_group
+        ]
+        report.sizes_after = size_distribution(self.planner)
+        return report
+
+
+def rebalance(planner: Planner, min_per_group: int) -> RebalanceReport:
+    return Rebalancer(planner, min_per_group).run()
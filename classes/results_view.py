@@ -0,0 +1,226 @@
+# classes/results_view.py
+from __future__ import annotations
+from collections import defaultdict, OrderedDict
+from typing import List, Dict, Optional, Tuple, Sequence
+from classes.models import TimeSlot, Student, GroupRecord, UnplacedStudent
+
+
+# Vues disponibles dans le navigateur de résultats
+VIEW_STUDENTS = "students"
+VIEW_GROUPS = "groups"
+VIEW_UNPLACED = "unplaced"
+
+# Filtres résolus gardés en cache (les plus récemment utilisés)
+MAX_CACHED_FILTERS = 64
+
+
+class ResultsIndex:
+    """
+    Lignes pré-calculées + index de filtrage pour le navigateur de résultats.
+
+    Chaque vue est une liste de tuples (une ligne du Treeview) et, pour chaque
+    dimension filtrable (spécialité, créneau, classe), un dict
+    valeur -> liste triée d'indices de lignes. Un filtre se résout donc par
+    intersection de listes d'indices, sans reparcourir les élèves.
+    """
+
+    def __init__(
+        self,
+        students: List[Student],
+        group_records: List[GroupRecord],
+        unplaced_students: List[UnplacedStudent],
+        time_slots: List[TimeSlot],
+    ) -> None:
+        self.time_slots = time_slots
+
+        self.columns: Dict[str, List[str]] = {
+            VIEW_STUDENTS: ["Nom", "Classe"] + [ts.label for ts in time_slots],
+            VIEW_GROUPS: ["Spécialité", "Groupe", "Créneau", "Nom", "Classe"],
+            VIEW_UNPLACED: [
+                "Nom", "Classe", "Spécialités demandées",
+                "Spécialité problématique", "Raison",
+            ],
+        }
+        self.rows: Dict[str, List[Tuple[str, ...]]] = {}
+
+        # vue -> dimension -> valeur -> [indices de lignes]
+        self._index: Dict[str, Dict[str, Dict[object, List[int]]]] = {}
+        # cache des filtres déjà résolus (LRU, MAX_CACHED_FILTERS au plus)
+        self._cache: "OrderedDict[Tuple, Sequence[int]]" = OrderedDict()
+
+        self._students = students
+        self._group_records = group_records
+        self._unplaced_students = unplaced_students
+        self._build()
+
+    def _build(self) -> None:
+        self._build_students(self._students)
+        self._build_groups(self._group_records)
+        self._build_unplaced(self._unplaced_students)
+
+    def rebuild(self) -> None:
+        """
+        Recalcule lignes et index après une modification du planning
+        (déplacements manuels) ; les filtres en cache sont oubliés.
+        """
+        self._cache.clear()
+        self._build()
+
+    # --- construction -------------------------------------------------------
+
+    def _build_students(self, students: List[Student]) -> None:
+        rows = []
+        by_spe = defaultdict(list)
+        by_slot = defaultdict(list)
+        by_spe_slot = defaultdict(list)
+        by_class = defaultdict(list)
+
+        for row_id, st in enumerate(students):
+            row = [st.name, st.classe]
+            for ts in self.time_slots:
+                assignment = st.assignments.get(ts.index)
+                if assignment is None:
+                    row.append("")
+                    continue
+                row.append(f"{assignment.specialty} (g{assignment.group_index + 1})")
+                by_spe[assignment.specialty].append(row_id)
+                by_slot[ts.index].append(row_id)
+                by_spe_slot[(assignment.specialty, ts.index)].append(row_id)
+            by_class[st.classe].append(row_id)
+            rows.append(tuple(row))
+
+        self.rows[VIEW_STUDENTS] = rows
+        self._index[VIEW_STUDENTS] = {
+            "specialty": by_spe,
+            "slot": by_slot,
+            "specialty_slot": by_spe_slot,
+            "classe": by_class,
+        }
+
+    def _build_groups(self, group_records: List[GroupRecord]) -> None:
+        # Tri spé / groupe / créneau pour une lecture naturelle
+        ordered = sorted(
+            group_records,
+            key=lambda r: (r.specialty, r.group_index, r.timeslot.index),
+        )
+        rows = []
+        by_spe = defaultdict(list)
+        by_slot = defaultdict(list)
+        by_spe_slot = defaultdict(list)
+        by_class = defaultdict(list)
+
+        for row_id, r in enumerate(ordered):
+            rows.append((
+                r.specialty,
+                f"g{r.group_index + 1}",
+                r.timeslot.label,
+                r.student_name,
+                r.classe,
+            ))
+            by_spe[r.specialty].append(row_id)
+            by_slot[r.timeslot.index].append(row_id)
+            by_spe_slot[(r.specialty, r.timeslot.index)].append(row_id)
+            by_class[r.classe].append(row_id)
+
+        self.rows[VIEW_GROUPS] = rows
+        self._index[VIEW_GROUPS] = {
+            "specialty": by_spe,
+            "slot": by_slot,
+            "specialty_slot": by_spe_slot,
+            "classe": by_class,
+        }
+
+    def _build_unplaced(self, unplaced_students: List[UnplacedStudent]) -> None:
+        rows = []
+        by_spe = defaultdict(list)
+        by_class = defaultdict(list)
+
+        for row_id, u in enumerate(unplaced_students):
+            choices_str = ", ".join(u.student.choices) if u.student.choices else "Aucune"
+            rows.append((
+                u.student.name,
+                u.student.classe,
+                choices_str,
+                u.failed_specialty,
+                u.reason,
+            ))
+            # un élève non placé est retrouvable par chacune de ses spé demandées
+            for spe in dict.fromkeys(u.student.choices):
+                by_spe[spe].append(row_id)
+            by_class[u.student.classe].append(row_id)
+
+        self.rows[VIEW_UNPLACED] = rows
+        # pas d'index de créneau : un élève non placé n'a aucun créneau
+        self._index[VIEW_UNPLACED] = {
+            "specialty": by_spe,
+            "classe": by_class,
+        }
+
+    # --- valeurs des filtres -----------------------------------------------
+
+    def specialties(self) -> List[str]:
+        spes = set(self._index[VIEW_STUDENTS]["specialty"])
+        spes.update(self._index[VIEW_UNPLACED]["specialty"])
+        return sorted(spes)
+
+    def classes(self) -> List[str]:
+        classes = set(self._index[VIEW_STUDENTS]["classe"])
+        classes.update(self._index[VIEW_UNPLACED]["classe"])
+        return sorted(classes)
+
+    # --- filtrage -----------------------------------------------------------
+
+    def filter(
+        self,
+        view: str,
+        specialty: Optional[str] = None,
+        slot: Optional[int] = None,
+        classe: Optional[str] = None,
+    ) -> Sequence[int]:
+        """
+        Retourne les indices (triés) des lignes de `view` correspondant aux
+        filtres. None = pas de filtre sur cette dimension.
+        """
+        key = (view, specialty, slot, classe)
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            return cached
+
+        index = self._index[view]
+        lists: List[List[int]] = []
+
+        if specialty is not None and slot is not None and "specialty_slot" in index:
+            lists.append(index["specialty_slot"].get((specialty, slot), []))
+        else:
+            if specialty is not None:
+                lists.append(index["specialty"].get(specialty, []))
+            if slot is not None:
+                if "slot" not in index:
+                    lists.append([])
+                else:
+                    lists.append(index["slot"].get(slot, []))
+        if classe is not None:
+            lists.append(index["classe"].get(classe, []))
+
+        if not lists:
+            result: Sequence[int] = range(len(self.rows[view]))
+        else:
+            # on part de la plus petite liste (les autres servent de filtre)
+            lists.sort(key=len)
+            result = lists[0]
+            for other in lists[1:]:
+                keep = set(other)
+                result = [i for i in result if i in keep]
+            # les listes d'index peuvent contenir des doublons (élève, spé)
+            result = sorted(set(result))
+
+        self._cache[key] = result
+        while len(self._cache) > MAX_CACHED_FILTERS:
+            self._cache.popitem(last=False)
+        return result
+
+    def get_rows(self, view: str, row_ids: Sequence[int], start: int, stop: int) -> List[Tuple[str, ...]]:
+        """Matérialise uniquement la fenêtre [start, stop) d'un résultat de filtre."""
+        rows = self.rows[view]
+        return [rows[i] for i in row_ids[start:stop]]
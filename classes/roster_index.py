@@ -0,0 +1,188 @@
+# classes/roster_index.py
+"""
+Précalculs partagés entre les répartitions d'un même effectif.
+
+Les comparatifs de stratégies, les réglages successifs dans l'interface ou
+le service partagé répartissent plusieurs fois les mêmes élèves sur les
+mêmes créneaux. Un RosterIndex rassemble ce qui ne dépend que de
+l'effectif et des créneaux : demande par spé (OrderedPlanner), ordre
+canonique des élèves et ordres tirés pour chaque graine
+(Planner._processing_order). Il est calculé une fois, puis retrouvé dans
+un cache borné (RosterCache, éviction du moins récemment utilisé).
+
+Un OccupancySnapshot fige les effectifs des cases d'un planner ; plusieurs
+planners peuvent repartir du même instantané sans le copier : les lignes
+d'une spé ne sont copiées qu'à la première modification (voir
+Planner.restore_occupancy), comme pour les simulations de remèdes (triage).
+"""
+from __future__ import annotations
+import random
+import threading
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+from typing import List, Dict, Tuple, Optional, Sequence
+from classes.models import Student, TimeSlot
+
+# ordres tirés gardés par index (une entrée par graine)
+MAX_SEEDED_ORDERS = 8
+# bornes du cache par défaut : nombre d'effectifs et d'élèves au total
+MAX_CACHED_ROSTERS = 8
+MAX_CACHED_STUDENTS = 500_000
+
+# effectifs par case d'une spé, une ligne par créneau (non modifiables)
+FrozenCounts = Tuple[Tuple[int, ...], ...]
+
+
+@dataclass(frozen=True)
+class OccupancySnapshot:
+    """Effectifs des cases d'un planner et indicateurs associés, figés."""
+    counts: Dict[str, FrozenCounts]
+    max_per_group: Optional[int]        # capacité qui a servi à compter les surcharges
+    total_count: int
+    total_sq: int
+    overfull_cells: int
+    num_cells: int
+
+
+def roster_key(students: Sequence[Student], time_slots: Sequence[TimeSlot]) -> Tuple[int, int]:
+    """Empreinte d'un effectif (nom, classe, vœux dans l'ordre) et de ses créneaux."""
+    return len(students), hash((
+        tuple(ts.index for ts in time_slots),
+        tuple((st.name, st.classe, tuple(st.choices)) for st in students),
+    ))
+
+
+class RosterIndex:
+    """
+    Précalculs d'un effectif pour un jeu de créneaux.
+
+    Les positions renvoyées (ordres) sont celles des élèves dans la liste
+    d'origine : l'index vaut pour toute liste des mêmes élèves dans le même
+    ordre (par exemple rechargée depuis le même fichier), ce que vérifie
+    check avec l'empreinte key (roster_key).
+
+    L'index ne contient pas de tables de cases : le choix d'une case dépend
+    des effectifs courants, propres à chaque répartition.
+    """
+
+    def __init__(
+        self,
+        students: Sequence[Student],
+        time_slots: Sequence[TimeSlot],
+        key: Optional[Tuple[int, int]] = None,
+    ) -> None:
+        self.size = len(students)
+        self.num_slots = len(time_slots)
+        # key : empreinte déjà calculée (par RosterCache), sinon calculée ici
+        self.key = key if key is not None else roster_key(students, time_slots)
+
+        # élèves par spé, dans l'ordre de première apparition
+        self.demand: Dict[str, int] = dict(Counter(spe for st in students for spe in st.choices))
+
+        # clés de l'ordre canonique (nom, classe, vœux), triées au premier tirage
+        self._sort_keys: Optional[List[Tuple[str, str, List[str]]]] = [
+            (st.name, st.classe, st.choices) for st in students
+        ]
+        self._canonical: Optional[List[int]] = None
+        self._orders: "OrderedDict[int, List[int]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def canonical(self) -> List[int]:
+        """Positions des élèves triées par (nom, classe, vœux), tri stable."""
+        with self._lock:
+            if self._canonical is None:
+                keys = self._sort_keys
+                self._canonical = sorted(range(self.size), key=keys.__getitem__)
+                self._sort_keys = None
+            return self._canonical
+
+    def order(self, seed: int) -> List[int]:
+        """
+        Positions des élèves dans l'ordre de Planner pour cette graine
+        (ordre canonique mélangé), mémorisées pour les dernières graines.
+        """
+        with self._lock:
+            order = self._orders.get(seed)
+            if order is not None:
+                self._orders.move_to_end(seed)
+                return order
+        order = list(self.canonical)
+        random.Random(seed).shuffle(order)
+        with self._lock:
+            self._orders[seed] = order
+            while len(self._orders) > MAX_SEEDED_ORDERS:
+                self._orders.popitem(last=False)
+        return order
+
+    def check(self, students: Sequence[Student], time_slots: Sequence[TimeSlot]) -> None:
+        """Lève ValueError si la liste ou les créneaux ne sont pas ceux de l'index."""
+        if len(students) != self.size:
+            raise ValueError(
+                f"L'index de l'effectif porte sur {self.size} élèves, pas {len(students)}."
+            )
+        if roster_key(students, time_slots) != self.key:
+            raise ValueError(
+                "L'index de l'effectif porte sur d'autres élèves, un autre ordre ou d'autres créneaux."
+            )
+
+
+class RosterCache:
+    """
+    Index des derniers effectifs répartis, du plus ancien au plus récent.
+    Au-delà de max_rosters index ou de max_students élèves au total, les
+    moins récemment utilisés sont oubliés.
+    """
+
+    def __init__(self, max_rosters: int = MAX_CACHED_ROSTERS, max_students: int = MAX_CACHED_STUDENTS) -> None:
+        self.max_rosters = max_rosters
+        self.max_students = max_students
+        self._entries: "OrderedDict[Tuple[int, int], RosterIndex]" = OrderedDict()
+        self._students = 0
+        # interface et service : plusieurs répartitions peuvent tourner à la fois
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, students: Sequence[Student], time_slots: Sequence[TimeSlot]) -> RosterIndex:
+        key = roster_key(students, time_slots)
+        with self._lock:
+            index = self._entries.get(key)
+            if index is not None:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return index
+            self.misses += 1
+
+        index = RosterIndex(students, time_slots, key)
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = index
+                self._students += index.size
+            # le dernier index ajouté est toujours gardé
+            while len(self._entries) > 1 and (
+                len(self._entries) > self.max_rosters or self._students > self.max_students
+            ):
+                _, evicted = self._entries.popitem(last=False)
+                self._students -= evicted.size
+        return index
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._students = 0
+
+
+_default_cache = RosterCache()
+
+
+def roster_index(
+    students: Sequence[Student],
+    time_slots: Sequence[TimeSlot],
+    cache: Optional[RosterCache] = None,
+) -> RosterIndex:
+    """Index de l'effectif, calculé ou retrouvé dans le cache (par défaut, celui du module)."""
+    return (cache if cache is not None else _default_cache).get(students, time_slots)
@@ -0,0 +1,279 @@
+# classes/rotation.py
+from __future__ import annotations
+import json
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import List, Optional, Dict, Tuple, Set
+from classes.models import TimeSlot, Student
+from classes.planner import Planner
+
+HISTORY_VERSION = 1
+
+StudentKey = Tuple[str, str]    # (nom, classe)
+
+
+def _key(student: Student) -> StudentKey:
+    return (student.name, student.classe)
+
+
+class RoundHistory:
+    """
+    Historique de plusieurs séances (rounds) de spécialités.
+
+    Sur disque : la liste des élèves (nom, classe) et, pour chaque séance,
+    les cases (spé, créneau, groupe) de chaque élève + les non placés.
+    En mémoire, des index compacts par numéro d'élève :
+    - créneaux et groupes déjà vus pour chaque (élève, spé), en masques de bits ;
+    - anciens camarades de groupe (ensembles de numéros) ;
+    - nombre de séances où l'élève n'a pas été placé.
+    """
+
+    def __init__(self) -> None:
+        self.students: List[StudentKey] = []
+        self.rounds: List[Dict[str, object]] = []
+
+        self._ids: Dict[StudentKey, int] = {}
+        self._slot_masks: Dict[Tuple[int, str], int] = {}
+        self._group_masks: Dict[Tuple[int, str], int] = {}
+        self._mates: Dict[int, Set[int]] = defaultdict(set)
+        self._unplaced_rounds: Dict[int, int] = defaultdict(int)
+
+    # --- index --------------------------------------------------------------
+
+    def student_id(self, student: Student, create: bool = False) -> Optional[int]:
+        key = _key(student)
+        sid = self._ids.get(key)
+        if sid is None and create:
+            sid = self._ids[key] = len(self.students)
+            self.students.append(key)
+        return sid
+
+    def _index_round(self, round_data: Dict[str, object]) -> None:
+        cells: Dict[Tuple[str, int, int], List[int]] = defaultdict(list)
+        for sid_str, assignments in round_data["cells"].items():
+            sid = int(sid_str)
+            for spe, slot_idx, group_idx in assignments:
+                self._slot_masks[(sid, spe)] = self._slot_masks.get((sid, spe), 0) | (1 << slot_idx)
+                self._group_masks[(sid, spe)] = self._group_masks.get((sid, spe), 0) | (1 << group_idx)
+                cells[(spe, slot_idx, group_idx)].append(sid)
+
+        for members in cells.values():
+            member_set = set(members)
+            for sid in members:
+                self._mates[sid] |= member_set
+                self._mates[sid].discard(sid)
+
+        for sid in round_data["unplaced"]:
+            self._unplaced_rounds[sid] += 1
+
+    # --- consultation ---------------------------------------------------------
+
+    @property
+    def num_rounds(self) -> int:
+        return len(self.rounds)
+
+    def seen_slots(self, sid: int, spe: str) -> int:
+        return self._slot_masks.get((sid, spe), 0)
+
+    def seen_groups(self, sid: int, spe: str) -> int:
+        return self._group_masks.get((sid, spe), 0)
+
+    def mates(self, sid: int) -> Set[int]:
+        return self._mates.get(sid, set())
+
+    def unplaced_rounds(self, sid: int) -> int:
+        return self._unplaced_rounds.get(sid, 0)
+
+    # --- mise à jour ----------------------------------------------------------
+
+    def record(self, planner: Planner, students: List[Student], label: str = "") -> None:
+        """Ajoute une séance répartie à l'historique."""
+        cells: Dict[str, List[List[object]]] = {}
+        for st in students:
+            sid = self.student_id(st, create=True)
+            if st.assignments:
+                cells[str(sid)] = [
+                    [a.specialty, slot_idx, a.group_index]
+                    for slot_idx, a in sorted(st.assignments.items())
+                ]
+        unplaced = [self.student_id(u.student, create=True) for u in planner.unplaced_students]
+
+        round_data = {
+            "label": label or f"Séance {self.num_rounds + 1}",
+            "cells": cells,
+            "unplaced": unplaced,
+        }
+        self.rounds.append(round_data)
+        self._index_round(round_data)
+
+    def truncated(self, num_rounds: int) -> "RoundHistory":
+        """Historique limité aux num_rounds premières séances (rejeu)."""
+        history = RoundHistory()
+        history.students = list(self.students)
+        history._ids = dict(self._ids)
+        for round_data in self.rounds[:num_rounds]:
+            history.rounds.append(round_data)
+            history._index_round(round_data)
+        return history
+
+
+def save_history(path: str, history: RoundHistory) -> None:
+    data = {
+        "version": HISTORY_VERSION,
+        "students": [list(key) for key in history.students],
+        "rounds": history.rounds,
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+
+
+def load_history(path: str) -> RoundHistory:
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    if data.get("version") != HISTORY_VERSION:
+        raise ValueError(f"Version d'historique non prise en charge : {data.get('version')}")
+
+    history = RoundHistory()
+    history.students = [tuple(key) for key in data["students"]]
+    history._ids = {key: sid for sid, key in enumerate(history.students)}
+    for round_data in data["rounds"]:
+        history.rounds.append(round_data)
+        history._index_round(round_data)
+    return history
+
+
+class RotationPlanner(Planner):
+    """
+    Répartition d'une nouvelle séance en tenant compte des précédentes.
+
+    Même glouton que Planner, mais le choix de la case ne se fait plus sur
+    le seul effectif : on y ajoute un coût
+    - rotation_weight par reprise d'un créneau ou d'un groupe déjà suivi
+      dans cette spé (les élèves changent d'horaire et de salle) ;
+    - diversity_weight par ancien camarade déjà présent dans la case.
+    Les élèves non placés lors des séances précédentes passent en premier.
+    Sans historique, le résultat est celui de Planner.
+
+    history_path (facultatif) : fichier d'où vient history, enregistré dans
+    le manifeste pour pouvoir rejouer le run.
+    """
+
+    def __init__(
+        self,
+        time_slots: List[TimeSlot],
+        groups_per_specialty: Dict[str, int],
+        max_per_group: Optional[int] = None,
+        seed: Optional[int] = None,
+        history: Optional[RoundHistory] = None,
+        rotation_weight: float = 2.0,
+        diversity_weight: float = 1.0,
+        history_path: Optional[str] = None,
+    ) -> None:
+        super().__init__(time_slots, groups_per_specialty, max_per_group, seed)
+        self.history = history or RoundHistory()
+        self.history_path = history_path
+        self.rotation_weight = rotation_weight
+        self.diversity_weight = diversity_weight
+
+        # (spé, créneau, groupe) -> numéros d'historique des élèves présents
+        self._cell_sids: Dict[Tuple[str, int, int], Set[int]] = defaultdict(set)
+
+    def strategy_params(self) -> Dict[str, object]:
+        return {
+            "rounds_before": self.history.num_rounds,
+            "rotation_weight": self.rotation_weight,
+            "diversity_weight": self.diversity_weight,
+            "history_path": self.history_path,
+        }
+
+    def _processing_order(self, students: List[Student]) -> List[Student]:
+        ordered = super()._processing_order(students)
+
+        def priority(st: Student) -> int:
+            sid = self.history.student_id(st)
+            return 0 if sid is None else -self.history.unplaced_rounds(sid)
+
+        # tri stable : l'ordre d'origine est conservé à priorité égale
+        return sorted(ordered, key=priority)
+
+    def _best_candidate(
+        self,
+        student: Student,
+        spe: str,
+        candidates: List[Tuple[int, int, int]],
+    ) -> Tuple[int, int, int]:
+        sid = self.history.student_id(student)
+        if sid is None:
+            return super()._best_candidate(student, spe, candidates)
+
+        seen_slots = self.history.seen_slots(sid, spe)
+        seen_groups = self.history.seen_groups(sid, spe)
+        mates = self.history.mates(sid)
+
+        # coût sans les camarades d'abord : il minore le coût complet, ce qui
+        # évite de compter les camarades des cases de toute façon trop chères
+        scored = []
+        for position, (count, slot_idx, group_idx) in enumerate(candidates):
+            repeats = ((seen_slots >> slot_idx) & 1) + ((seen_groups >> group_idx) & 1)
+            scored.append((count + self.rotation_weight * repeats, position))
+        scored.sort()
+
+        best_cost, best_position = None, None
+        for base, position in scored:
+            if best_cost is not None and base > best_cost:
+                break
+            cost = base
+            if mates:
+                _, slot_idx, group_idx = candidates[position]
+                cost += self.diversity_weight * len(mates & self._cell_sids[(spe, slot_idx, group_idx)])
+            # à coût égal, la première case (comme Planner)
+            if best_cost is None or (cost, position) < (best_cost, best_position):
+                best_cost, best_position = cost, position
+
+        return candidates[best_position]
+
+    def _commit(self, student: Student, chosen: List[Tuple[str, int, int]]) -> None:
+        super()._commit(student, chosen)
+        sid = self.history.student_id(student)
+        if sid is not None:
+            for cell in chosen:
+                self._cell_sids[cell].add(sid)
+
+
+@dataclass
+class RotationSummary:
+    placed: int = 0
+    repeated_slots: int = 0     # (élève, spé) au même créneau qu'une séance précédente
+    repeated_groups: int = 0    # (élève, spé) dans le même groupe qu'auparavant
+    repeated_mates: int = 0     # paires d'anciens camarades à nouveau ensemble
+
+    def summary(self) -> str:
+        return (
+            f"{self.repeated_slots} spé au même créneau qu'avant, "
+            f"{self.repeated_groups} dans le même groupe, "
+            f"{self.repeated_mates} paire(s) d'anciens camarades réunie(s)"
+        )
+
+
+def rotation_summary(history: RoundHistory, students: List[Student]) -> RotationSummary:
+    """Reprises d'une séance répartie par rapport à l'historique (avant record)."""
+    result = RotationSummary()
+    cells: Dict[Tuple[str, int, int], List[int]] = defaultdict(list)
+
+    for st in students:
+        if st.assignments:
+            result.placed += 1
+        sid = history.student_id(st)
+        if sid is None:
+            continue
+        for slot_idx, a in st.assignments.items():
+            result.repeated_slots += (history.seen_slots(sid, a.specialty) >> slot_idx) & 1
+            result.repeated_groups += (history.seen_groups(sid, a.specialty) >> a.group_index) & 1
+            cells[(a.specialty, slot_idx, a.group_index)].append(sid)
+
+    for members in cells.values():
+        member_set = set(members)
+        for sid in members:
+            result.repeated_mates += len(history.mates(sid) & member_set)
+    result.repeated_mates //= 2
+    return result
@@ -0,0 +1,175 @@
+# classes/sharded_planner.py
+from __future__ import annotations
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Dict, Tuple
+from classes.models import TimeSlot, Student
+from classes.planner import Planner
+
+# En dessous, le coût des processus dépasse le gain : on reste séquentiel.
+MIN_PARALLEL_STUDENTS = 5000
+
+# (nom, classe, vœux) : ce qu'on envoie aux processus
+StudentRow = Tuple[str, str, List[str]]
+# ("ok", [(spé, créneau, groupe), ...]) ou ("ko", spé bloquante, raison)
+Outcome = Tuple
+
+
+def specialty_components(students: List[Student]) -> List[List[int]]:
+    """
+    Composantes connexes du graphe des co-choix : deux spé sont liées si un
+    élève les a demandées ensemble. Retourne, pour chaque composante, les
+    indices des élèves concernés (dans l'ordre de la liste).
+    """
+    parent: Dict[str, str] = {}
+
+    def find(spe: str) -> str:
+        root = spe
+        while parent[root] != root:
+            root = parent[root]
+        while parent[spe] != root:   # compression de chemin
+            parent[spe], spe = root, parent[spe]
+        return root
+
+    for st in students:
+        for spe in st.choices:
+            parent.setdefault(spe, spe)
+        for spe in st.choices[1:]:
+            a, b = find(st.choices[0]), find(spe)
+            if a != b:
+                parent[b] = a
+
+    components: Dict[Optional[str], List[int]] = {}
+    for i, st in enumerate(students):
+        root = find(st.choices[0]) if st.choices else None
+        components.setdefault(root, []).append(i)
+    return list(components.values())
+
+
+def _plan_batch(
+    time_slots: List[TimeSlot],
+    groups_per_specialty: Dict[str, int],
+    max_per_group: Optional[int],
+    rows: List[StudentRow],
+) -> Tuple[List[Outcome], Dict[str, List[List[int]]]]:
+    """
+    Répartit un lot de composantes (dans un processus du pool). Retourne le
+    résultat de chaque élève et les compteurs des spé du lot.
+    """
+    planner = Planner(time_slots, groups_per_specialty, max_per_group)
+    students = [Student(name=name, classe=classe, choices=choices) for name, classe, choices in rows]
+    planner.plan(students)
+
+    failures = {id(u.student): (u.failed_specialty, u.reason) for u in planner.unplaced_students}
+    outcomes: List[Outcome] = []
+    for st in students:
+        failure = failures.get(id(st))
+        if failure is not None:
+            outcomes.append(("ko", *failure))
+        else:
+            outcomes.append(("ok", [
+                (a.specialty, slot_idx, a.group_index)
+                for slot_idx, a in st.assignments.items()
+            ]))
+    return outcomes, planner._group_counts
+
+
+class ShardedPlanner(Planner):
+    """
+    Répartition parallèle par composantes indépendantes de spécialités.
+
+    Deux élèves sans spé commune (même indirectement) ne partagent aucun
+    compteur : leurs placements ne dépendent pas l'un de l'autre. Les
+    composantes sont regroupées en autant de lots que de processus
+    (--workers), chaque lot est réparti dans un processus, puis les
+    résultats sont rejoués dans l'ordre d'origine sur ce planner. Le résultat
+    (affectations, group_records, non placés) est identique à celui de
+    Planner, y compris avec une graine.
+
+    - workers: nombre de processus (défaut : nombre de cœurs)
+    - min_parallel_students: effectif en dessous duquel on reste séquentiel
+    """
+
+    def __init__(
+        self,
+        time_slots: List[TimeSlot],
+        groups_per_specialty: Dict[str, int],
+        max_per_group: Optional[int] = None,
+        seed: Optional[int] = None,
+        workers: Optional[int] = None,
+        min_parallel_students: int = MIN_PARALLEL_STUDENTS,
+    ) -> None:
+        super().__init__(time_slots, groups_per_specialty, max_per_group, seed)
+        self.workers = workers or os.cpu_count() or 1
+        self.min_parallel_students = min_parallel_students
+        # tailles des composantes trouvées (nombre d'élèves)
+        self.shard_sizes: List[int] = []
+
+    def strategy_params(self) -> Dict[str, object]:
+        return {"workers": self.workers}
+
+    def _batches(self, components: List[List[int]]) -> List[List[int]]:
+        """Regroupe les composantes en lots équilibrés (plus grosses d'abord)."""
+        batches: List[List[int]] = [[] for _ in range(min(self.workers, len(components)))]
+        for component in sorted(components, key=len, reverse=True):
+            min(batches, key=len).extend(component)
+        # chaque lot garde l'ordre de traitement d'origine
+        return [sorted(batch) for batch in batches if batch]
+
+    def _adopt_counts(self, group_counts: Dict[str, List[List[int]]]) -> None:
+        """Reprend les compteurs d'un lot (spé disjointes des autres lots)."""
+        for spe, counts in group_counts.items():
+            self._group_counts[spe] = counts
+            self._num_cells += len(counts) * len(counts[0])
+            for row in counts:
+                for count in row:
+                    self._total_count += count
+                    self._total_sq += count * count
+                    if self.max_per_group is not None and count > self.max_per_group:
+                        self._overfull_cells += 1
+
+    def plan(self, students: List[Student]) -> None:
+        ordered = self._processing_order(students)
+        components = specialty_components(ordered)
+        self.shard_sizes = sorted((len(c) for c in components), reverse=True)
+
+        if self.workers <= 1 or len(components) <= 1 or len(ordered) < self.min_parallel_students:
+            for student in ordered:
+                self._place_student(student)
+            return
+
+        batches = self._batches(components)
+        outcomes: List[Optional[Outcome]] = [None] * len(ordered)
+        with ProcessPoolExecutor(max_workers=len(batches)) as executor:
+            futures = [
+                executor.submit(
+                    _plan_batch,
+                    self.time_slots,
+                    self.groups_per_specialty,
+                    self.max_per_group,
+                    [(ordered[i].name, ordered[i].classe, ordered[i].choices) for i in batch],
+                )
+                for batch in batches
+            ]
+            for batch, future in zip(batches, futures):
+                batch_outcomes, group_counts = future.result()
+                self._adopt_counts(group_counts)
+                for i, outcome in zip(batch, batch_outcomes):
+                    outcomes[i] = outcome
+
+        # fusion dans l'ordre d'origine : mêmes enregistrements et non placés
+        first_seen: Dict[str, None] = {}
+        for student, outcome in zip(ordered, outcomes):
+            if outcome[0] == "ko":
+                self._reject(student, outcome[1], outcome[2])
+                failed = outcome[1]
+                tried = []
+                if failed in student.choices:
+                    tried = student.choices[:student.choices.index(failed) + 1]
+            else:
+                self._commit(student, outcome[1])
+                tried = student.choices
+            first_seen.update(dict.fromkeys(tried))
+
+        # même ordre des spé qu'en séquentiel (ordre de première tentative)
+        self._group_counts = {spe: self._group_counts[spe] for spe in first_seen}
@@ -0,0 +1,242 @@
+# classes/strategies.py
+"""
+Registre des stratégies de répartition.
+
+Chaque stratégie (Strategy) construit un Planner à partir d'un contexte
+commun (PlanningContext : créneaux, groupes par spé, capacités, graine) et
+de ses paramètres propres. Toutes partagent donc la même entrée (la liste
+des élèves passée à plan) et la même sortie (affectations, group_records,
+unplaced_students, strategy_params pour le manifeste) : run_planning, la
+CLI, l'interface, le serveur et le comparatif (utils.benchmark) passent
+tous par ce registre.
+
+Les classes des planners sont importées à la construction seulement.
+"""
+from __future__ import annotations
+import os
+import threading
+from dataclasses import dataclass, field
+from typing import List, Optional, Dict, Callable, Tuple
+from classes.models import TimeSlot
+from classes.planner import Planner
+from classes.roster_index import RosterIndex
+
+
+@dataclass
+class PlanningContext:
+    """Paramètres communs à toutes les stratégies (voir run_planning)."""
+    time_slots: List[TimeSlot]
+    groups_per_specialty: Dict[str, int]
+    max_per_group: Optional[int]
+    seed: Optional[int] = None
+    min_per_group: int = 1
+    max_groups_per_spe: Optional[int] = None
+    on_step: Optional[Callable[[str], None]] = None
+    # stratégie "anytime" : meilleurs plannings intermédiaires, arrêt anticipé
+    on_snapshot: Optional[Callable[[object], None]] = None
+    cancel_event: Optional[threading.Event] = None
+    # précalculs de l'effectif, partagés par les répartitions successives
+    roster_index: Optional[RosterIndex] = None
+
+    def base_args(self) -> Dict[str, object]:
+        return {
+            "time_slots": self.time_slots,
+            "groups_per_specialty": self.groups_per_specialty,
+            "max_per_group": self.max_per_group,
+            "seed": self.seed,
+        }
+
+
+@dataclass(frozen=True)
+class Strategy:
+    """
+    Une stratégie de répartition.
+
+    - factory(ctx, params) -> Planner
+    - options: réglages communs (time_budget, workers, history_path, starts,
+      priorities_path) que la stratégie accepte depuis la CLI ou l'interface
+    - requires: options obligatoires (sinon la stratégie n'est pas proposée
+      dans l'interface ni sur le serveur)
+    - replay_params: paramètres forcés au rejeu (ex. pas de limite de temps)
+    """
+    name: str
+    label: str
+    factory: Callable[[PlanningContext, Dict[str, object]], Planner]
+    description: str = ""
+    options: Tuple[str, ...] = ()
+    requires: Tuple[str, ...] = ()
+    replay_params: Dict[str, object] = field(default_factory=dict)
+
+    def create(self, ctx: PlanningContext, params: Optional[Dict[str, object]] = None) -> Planner:
+        planner = self.factory(ctx, dict(params or {}))
+        planner.roster_index = ctx.roster_index
+        return planner
+
+    def params_from_options(self, options: Dict[str, object]) -> Dict[str, object]:
+        """
+        Paramètres de la stratégie parmi les réglages communs fournis (les
+        valeurs None sont ignorées). Lève ValueError si un réglage requis
+        manque.
+        """
+        params = {
+            key: value for key, value in options.items()
+            if key in self.options and value is not None
+        }
+        missing = [key for key in self.requires if key not in params]
+        if missing:
+            raise ValueError(
+                f"La stratégie « {self.name} » demande : {', '.join(missing)}"
+            )
+        return params
+
+
+STRATEGIES: Dict[str, Strategy] = {}
+
+
+def register_strategy(strategy: Strategy) -> Strategy:
+    """Ajoute (ou remplace) une stratégie dans le registre."""
+    STRATEGIES[strategy.name] = strategy
+    return strategy
+
+
+def get_strategy(name: str) -> Strategy:
+    try:
+        return STRATEGIES[name]
+    except KeyError:
+        raise ValueError(f"Stratégie inconnue : {name}") from None
+
+
+def strategy_names(interactive: bool = False) -> List[str]:
+    """Noms des stratégies ; interactive : sans celles qui ont des options requises."""
+    return [
+        name for name, strategy in STRATEGIES.items()
+        if not (interactive and strategy.requires)
+    ]
+
+
+def create_planner(
+    name: str,
+    ctx: PlanningContext,
+    params: Optional[Dict[str, object]] = None,
+) -> Planner:
+    return get_strategy(name).create(ctx, params)
+
+
+# --- Stratégies fournies ----------------------------------------------------
+
+def _greedy(ctx: PlanningContext, params: Dict[str, object]) -> Planner:
+    return Planner(**ctx.base_args(), **params)
+
+
+def _ordered(ctx: PlanningContext, params: Dict[str, object]) -> Planner:
+    from classes.ordered_planner import OrderedPlanner
+    return OrderedPlanner(**ctx.base_args(), **params)
+
+
+def _flow(ctx: PlanningContext, params: Dict[str, object]) -> Planner:
+    from classes.flow_planner import FlowPlanner
+    return FlowPlanner(**ctx.base_args(), **params)
+
+
+def _multistart(ctx: PlanningContext, params: Dict[str, object]) -> Planner:
+    from classes.multistart_planner import MultiStartPlanner
+    return MultiStartPlanner(**ctx.base_args(), **params)
+
+
+def _joint(ctx: PlanningContext, params: Dict[str, object]) -> Planner:
+    from classes.joint_planner import JointPlanner
+    params = {"max_groups_per_spe": ctx.max_groups_per_spe, **params}
+    return JointPlanner(**ctx.base_args(), **params)
+
+
+def _sharded(ctx: PlanningContext, params: Dict[str, object]) -> Planner:
+    from classes.sharded_planner import ShardedPlanner
+    return ShardedPlanner(**ctx.base_args(), **params)
+
+
+def _rotation(ctx: PlanningContext, params: Dict[str, object]) -> Planner:
+    from classes.rotation import RotationPlanner, RoundHistory, load_history
+    history_path = params.pop("history_path", None)
+    rounds_before = params.pop("rounds_before", None)
+    history = RoundHistory()
+    if history_path and os.path.exists(history_path):
+        history = load_history(history_path)
+    if rounds_before is not None:
+        # rejeu : l'historique a pu s'allonger depuis
+        history = history.truncated(rounds_before)
+    return RotationPlanner(**ctx.base_args(), history=history, history_path=history_path, **params)
+
+
+def _priority(ctx: PlanningContext, params: Dict[str, object]) -> Planner:
+    from classes.priority_planner import PriorityPlanner, load_priorities
+    priorities_path = params.pop("priorities_path", None)
+    if priorities_path is not None:
+        # le manifeste garde les niveaux eux-mêmes : le rejeu ne dépend plus du fichier
+        params["priorities"] = load_priorities(priorities_path)
+    return PriorityPlanner(**ctx.base_args(), **params)
+
+
+def _anytime(ctx: PlanningContext, params: Dict[str, object]) -> Planner:
+    from classes.anytime_planner import AnytimePlanner
+    params = {"min_per_group": ctx.min_per_group, **params}
+
+    def on_improved(snapshot) -> None:
+        if ctx.on_step is not None:
+            ctx.on_step(snapshot.summary())
+        if ctx.on_snapshot is not None:
+            ctx.on_snapshot(snapshot)
+
+    return AnytimePlanner(
+        **ctx.base_args(),
+        on_snapshot=on_improved,
+        cancel_event=ctx.cancel_event,
+        **params,
+    )
+
+
+register_strategy(Strategy(
+    "greedy", "Glouton", _greedy,
+    "passe gloutonne dans l'ordre du fichier (ou de la graine)",
+))
+register_strategy(Strategy(
+    "ordered", "Glouton, élèves contraints d'abord", _ordered,
+    "passe gloutonne, élèves aux vœux les plus nombreux et les plus demandés d'abord",
+))
+register_strategy(Strategy(
+    "flow", "Glouton avec couplage des créneaux", _flow,
+    "chaque élève est placé par un couplage maximum vœux / créneaux",
+))
+register_strategy(Strategy(
+    "multistart", "Multi-départ", _multistart,
+    "plusieurs passes gloutonnes sur des ordres mélangés, la meilleure est gardée",
+    options=("starts",),
+))
+register_strategy(Strategy(
+    "joint", "Réallocation des groupes entre spé", _joint,
+    "passe gloutonne puis déplacement de groupes vers les spé bloquantes",
+    options=("time_budget",),
+    replay_params={"time_budget": None},
+))
+register_strategy(Strategy(
+    "sharded", "Parallèle par composantes", _sharded,
+    "même résultat que le glouton, calculé en parallèle",
+    options=("workers",),
+))
+register_strategy(Strategy(
+    "rotation", "Rotation d'après l'historique", _rotation,
+    "séance suivante : rotation des créneaux, groupes et camarades",
+    options=("history_path",),
+    requires=("history_path",),
+))
+register_strategy(Strategy(
+    "priority", "Niveaux de priorité et listes d'attente", _priority,
+    "élèves par niveau de priorité, places réservées, listes d'attente promues",
+    options=("priorities_path",),
+    requires=("priorities_path",),
+))
+register_strategy(Strategy(
+    "anytime", "Amélioration continue", _anytime,
+    "passe gloutonne améliorée jusqu'à la fin du budget de temps",
+    options=("time_budget",),
+    replay_params={"time_budget": None},
+))
@@ -0,0 +1,185 @@
+# classes/streaming_planner.py
+from __future__ import annotations
+import csv
+import os
+import shutil
+import tempfile
+from array import array
+from typing import List, Optional, Dict, Tuple, Iterable, Iterator
+from classes.models import TimeSlot, Student, Assignment, GroupRecord, UnplacedStudent
+from classes.planner import Planner
+
+NO_CELL = -1
+
+
+class StreamingPlanner(Planner):
+    """
+    Répartition en flux, pour les très gros fichiers (consolidation régionale).
+
+    Même algorithme que Planner (mêmes affectations, dans l'ordre du
+    fichier), mais sans garder les élèves en mémoire :
+    - les élèves sont lus un par un (voir utils.formats.iter_students) ;
+    - seuls restent en mémoire les compteurs par case et, pour chaque élève,
+      un code de case par créneau (tableau compact, 4 octets par créneau) ;
+    - les enregistrements par groupe sont ajoutés à un journal sur disque
+      (un fichier par spé), les non placés à un autre journal.
+
+    Les exports relisent ces journaux (iter_group_records_by_specialty,
+    iter_unplaced) et le fichier d'entrée (iter_planned_students).
+    Pas de graine, d'édition manuelle ni d'équilibrage dans ce mode.
+    """
+
+    def __init__(
+        self,
+        time_slots: List[TimeSlot],
+        groups_per_specialty: Dict[str, int],
+        max_per_group: Optional[int] = None,
+        workdir: Optional[str] = None,
+    ) -> None:
+        super().__init__(time_slots, groups_per_specialty, max_per_group)
+        self._own_workdir = workdir is None
+        self.workdir = workdir or tempfile.mkdtemp(prefix="planification_flux_")
+        os.makedirs(self.workdir, exist_ok=True)
+
+        self.num_students = 0
+        self.num_unplaced = 0
+
+        # code de case -> (spé, groupe) ; le créneau est la position dans la ligne
+        self._cells: List[Tuple[str, int]] = []
+        self._cell_codes: Dict[Tuple[str, int], int] = {}
+        # len(time_slots) codes par élève, dans l'ordre de lecture
+        self._codes = array("i")
+        self._empty_row = array("i", [NO_CELL] * len(time_slots))
+
+        self._spe_files: Dict[str, str] = {}     # spé -> chemin du journal
+        self._record_logs: Dict[str, object] = {}
+        self._unplaced_path = os.path.join(self.workdir, "non_places.csv")
+        self._unplaced_log = None
+
+    # --- journaux -----------------------------------------------------------
+
+    def _record_writer(self, spe: str):
+        log = self._record_logs.get(spe)
+        if log is None:
+            path = os.path.join(self.workdir, f"groupes_{len(self._spe_files)}.csv")
+            self._spe_files[spe] = path
+            f = open(path, "w", encoding="utf-8", newline="")
+            log = self._record_logs[spe] = (f, csv.writer(f))
+        return log[1]
+
+    def _unplaced_writer(self):
+        if self._unplaced_log is None:
+            f = open(self._unplaced_path, "w", encoding="utf-8", newline="")
+            self._unplaced_log = (f, csv.writer(f))
+        return self._unplaced_log[1]
+
+    def _close_logs(self) -> None:
+        for f, _ in self._record_logs.values():
+            f.close()
+        self._record_logs = {}
+        if self._unplaced_log is not None:
+            self._unplaced_log[0].close()
+            self._unplaced_log = None
+
+    def _cell_code(self, spe: str, group_idx: int) -> int:
+        code = self._cell_codes.get((spe, group_idx))
+        if code is None:
+            code = self._cell_codes[(spe, group_idx)] = len(self._cells)
+            self._cells.append((spe, group_idx))
+        return code
+
+    # --- surcharges de Planner ------------------------------------------------
+
+    def _reject(self, student: Student, failed_specialty: str, reason: str) -> None:
+        self.num_unplaced += 1
+        self._unplaced_writer().writerow(
+            [student.name, student.classe, failed_specialty, reason, *student.choices]
+        )
+
+    def _commit(self, student: Student, chosen: List[Tuple[str, int, int]]) -> None:
+        base = self.num_students * len(self.time_slots)
+        for spe, slot_idx, group_idx in chosen:
+            self._codes[base + slot_idx] = self._cell_code(spe, group_idx)
+            self._record_writer(spe).writerow(
+                [group_idx, slot_idx, student.name, student.classe]
+            )
+
+    def plan(self, students: Iterable[Student]) -> None:
+        try:
+            for student in students:
+                self._codes.extend(self._empty_row)
+                self._place_student(student)
+                self.num_students += 1
+        finally:
+            self._close_logs()
+
+    # --- relecture ------------------------------------------------------------
+
+    @property
+    def cells(self) -> List[Tuple[str, int]]:
+        """Code de case -> (spé, groupe)."""
+        return self._cells
+
+    def iter_coded_students(self, students: Iterable[Student]) -> Iterator[Tuple[Student, array]]:
+        """
+        Relit les élèves (même source, même ordre que pour plan) avec leur
+        ligne de codes de case (un par créneau, NO_CELL si vide).
+        """
+        num_slots = len(self.time_slots)
+        count = 0
+        for count, student in enumerate(students, start=1):
+            if count > self.num_students:
+                break
+            base = (count - 1) * num_slots
+            yield student, self._codes[base:base + num_slots]
+        if count != self.num_students:
+            raise ValueError(
+                "Le fichier d'élèves a changé depuis la répartition "
+                f"({count} élèves relus pour {self.num_students} répartis)."
+            )
+
+    def iter_planned_students(self, students: Iterable[Student]) -> Iterator[Student]:
+        """Comme iter_coded_students, en ajoutant aux élèves leurs affectations."""
+        for student, row in self.iter_coded_students(students):
+            for slot_idx, code in enumerate(row):
+                if code != NO_CELL:
+                    spe, group_idx = self._cells[code]
+                    student.add_assignment(Assignment(spe, self.time_slots[slot_idx], group_idx))
+            yield student
+
+    def iter_group_records_by_specialty(self) -> Iterator[Tuple[str, List[GroupRecord]]]:
+        """(spé, enregistrements) par ordre alphabétique, une spé à la fois."""
+        for spe in sorted(self._spe_files):
+            with open(self._spe_files[spe], encoding="utf-8", newline="") as f:
+                records = [
+                    GroupRecord(
+                        specialty=spe,
+                        timeslot=self.time_slots[int(slot_idx)],
+                        group_index=int(group_idx),
+                        student_name=name,
+                        classe=classe,
+                    )
+                    for group_idx, slot_idx, name, classe in csv.reader(f)
+                ]
+            yield spe, records
+
+    def iter_unplaced(self) -> Iterator[UnplacedStudent]:
+        if not self.num_unplaced:
+            return
+        with open(self._unplaced_path, encoding="utf-8", newline="") as f:
+            for name, classe, failed_specialty, reason, *choices in csv.reader(f):
+                yield UnplacedStudent(
+                    student=Student(name=name, classe=classe, choices=choices),
+                    failed_specialty=failed_specialty,
+                    reason=reason,
+                )
+
+    def cleanup(self) -> None:
+        """Supprime les journaux (et le dossier s'il a été créé ici)."""
+        self._close_logs()
+        if self._own_workdir:
+            shutil.rmtree(self.workdir, ignore_errors=True)
+        else:
+            for path in [*self._spe_files.values(), self._unplaced_path]:
+                if os.path.exists(path):
+                    os.remove(path)
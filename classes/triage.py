@@ -0,0 +1,134 @@
+# classes/triage.py
+from __future__ import annotations
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import List, Optional
+from classes.models import Student
+from classes.planner import Planner
+from classes.roster_index import OccupancySnapshot
+
+# Hausse de la capacité des groupes testée (élèves de plus par groupe)
+CAPACITY_STEPS = (1, 2)
+# Nombre max de spé testées pour l'ouverture d'un groupe (les plus bloquantes)
+MAX_GROUP_CANDIDATES = 8
+
+REMEDY_GROUP = "groupe"
+REMEDY_CAPACITY = "capacité"
+
+
+@dataclass
+class BlockingSpecialty:
+    specialty: str
+    unplaced: int               # élèves bloqués sur cette spé
+    full: int                   # ... parce que tous ses groupes sont pleins
+    slot_conflicts: int         # ... parce que les places libres tombent sur leurs autres créneaux
+
+
+@dataclass
+class Remedy:
+    kind: str                   # REMEDY_GROUP ou REMEDY_CAPACITY
+    label: str
+    unblocked: int              # élèves non placés qui seraient placés
+    specialty: Optional[str] = None
+    delta: int = 1
+
+
+@dataclass
+class TriageReport:
+    num_unplaced: int = 0
+    too_many_choices: int = 0   # plus de vœux que de créneaux : aucun remède possible
+    blocking: List[BlockingSpecialty] = field(default_factory=list)
+    remedies: List[Remedy] = field(default_factory=list)   # du plus au moins efficace
+
+
+def _blocking_specialties(planner: Planner, report: TriageReport) -> None:
+    """Regroupe les non placés par spé bloquante, d'après l'état final des compteurs."""
+    unplaced = Counter()
+    full = Counter()
+
+    for u in planner.unplaced_students:
+        spe = u.failed_specialty
+        if spe not in planner._group_counts:
+            report.too_many_choices += 1
+            continue
+        unplaced[spe] += 1
+        counts = planner._group_counts[spe]
+        if all(planner._is_full(count) for row in counts for count in row):
+            full[spe] += 1
+
+    report.blocking = [
+        BlockingSpecialty(spe, n, full[spe], n - full[spe])
+        for spe, n in unplaced.most_common()
+    ]
+
+
+def simulate(
+    planner: Planner,
+    max_per_group: Optional[int],
+    extra_group: Optional[str] = None,
+    snapshot: Optional[OccupancySnapshot] = None,
+) -> int:
+    """
+    Nombre d'élèves non placés qui le seraient avec ce remède : on rejoue le
+    placement glouton des seuls non placés à partir des compteurs du planner
+    (snapshot : instantané déjà pris, partagé entre les remèdes), sans
+    toucher aux élèves déjà placés ni au planner.
+    """
+    sim = Planner(planner.time_slots, planner.groups_per_specialty, max_per_group)
+    sim.restore_occupancy(snapshot or planner.occupancy_snapshot())
+    if extra_group is not None:
+        sim.add_group(extra_group)
+
+    placed = 0
+    for u in planner.unplaced_students:
+        st = u.student
+        if sim._place_student(Student(name=st.name, classe=st.classe, choices=st.choices)):
+            placed += 1
+    return placed
+
+
+def triage(planner: Planner, max_groups_per_spe: Optional[int] = None) -> TriageReport:
+    """
+    Analyse des non placés et classement des remèdes par efficacité mesurée.
+
+    max_groups_per_spe: si fourni, signale les spé dont un groupe de plus
+    demanderait de relever ce paramètre.
+    """
+    report = TriageReport(num_unplaced=len(planner.unplaced_students))
+    if not planner.unplaced_students:
+        return report
+
+    _blocking_specialties(planner, report)
+    # chaque simulation ne copie que les compteurs des spé qu'elle modifie
+    snapshot = planner.occupancy_snapshot()
+
+    for blocking in report.blocking[:MAX_GROUP_CANDIDATES]:
+        spe = blocking.specialty
+        nb_groups = len(planner._group_counts[spe][0])
+        label = f"Ouvrir un groupe de plus en {spe} ({nb_groups} → {nb_groups + 1})"
+        if max_groups_per_spe is not None and nb_groups >= max_groups_per_spe:
+            label += f", max. groupes par spécialité à {nb_groups + 1}"
+        report.remedies.append(
+            Remedy(
+                kind=REMEDY_GROUP,
+                label=label,
+                unblocked=simulate(planner, planner.max_per_group, extra_group=spe, snapshot=snapshot),
+                specialty=spe,
+            )
+        )
+
+    if planner.max_per_group is not None:
+        for step in CAPACITY_STEPS:
+            new_max = planner.max_per_group + step
+            report.remedies.append(
+                Remedy(
+                    kind=REMEDY_CAPACITY,
+                    label=f"Augmenter le max. élèves par groupe à {new_max}",
+                    unblocked=simulate(planner, new_max, snapshot=snapshot),
+                    delta=step,
+                )
+            )
+
+    # à efficacité égale, on préfère ouvrir un groupe (effectifs raisonnables)
+    report.remedies.sort(key=lambda r: (-r.unblocked, r.kind != REMEDY_GROUP, r.delta))
+    return report
@@ -1,17 +1,33 @@
 # gui_main.py
-import tkinter as tk
-from tkinter import ttk, filedialog, messagebox, scrolledtext
-import webbrowser
+import time
+
+_STARTUP_T0 = time.perf_counter()
 
-from classes.models import TimeSlot
-from classes.planner import Planner
-from utils.utils import (
-    load_students_from_csv,
-    save_planning_per_student,
-    save_planning_per_group_formatted,
-    compute_groups_per_specialty,
-    save_unplaced_students,
-)
+import sys
+import tkinter as tk
+from tkinter import ttk, filedialog, messagebox, scrolledtext, simpledialog
+
+_IMPORTS_DONE = time.perf_counter()
+
+# Les modules de calcul et d'export (classes.*, utils.*, webbrowser, openpyxl...)
+# sont importés à la première utilisation pour afficher la fenêtre au plus vite.
+# Voir LAZY_MODULES et l'option --startup-time.
+LAZY_MODULES = [
+    "webbrowser",
+    "classes.models",
+    "classes.planner",
+    "classes.results_view",
+    "utils.utils",
+    "utils.formats",
+    "utils.manifest",
+    "utils.stats",
+    "utils.profiles",
+    "utils.validation",
+    "classes.strategies",
+    "utils.export_all",
+    "classes.triage",
+    "openpyxl",
+]
 
 
 class ContactWindow(tk.Toplevel):
@@ -148,14 +164,17 @@ class ContactWindow(tk.Toplevel):
         """Ouvrir le client email par défaut"""
         email = "kerdanety@gmail.com"
         subject = "Planification des Spécialités - Contact"
+        import webbrowser
         webbrowser.open(f"mailto:{email}?subject={subject}")
     
     def open_github(self):
         """Ouvrir le profil GitHub"""
+        import webbrowser
         webbrowser.open("https://github.com/KerdanetYvan")
     
     def open_repo(self):
         """Ouvrir le repository GitHub du projet"""
+        import webbrowser
         webbrowser.open("https://github.com/KerdanetYvan/planification_spe")
 
 
@@ -217,6 +236,7 @@ IMPORTANT :
 • Les colonnes de spécialités peuvent avoir n'importe quel nom (ex: "Spé 1", "Choix 1", etc.)
 • Chaque élève doit avoir au moins une spécialité renseignée
 • Le séparateur peut être une virgule (,) ou un point-virgule (;)
+• Les fichiers Excel (.xlsx) et JSON / NDJSON sont également acceptés, avec les mêmes colonnes
 
 
 3. ÉTAPES D'UTILISATION
@@ -238,6 +258,7 @@ IMPORTANT :
    • Planning par élève : Liste de tous les élèves avec leurs créneaux attribués
    • Planning par groupe : Liste des élèves pour chaque groupe de spécialité
    • Élèves non placés : Si certains élèves n'ont pas pu être placés
+   Le format (CSV, Excel, JSON, NDJSON) dépend de l'extension choisie.
 
 
 4. EXEMPLES DE PARAMÈTRES
@@ -289,24 +310,914 @@ Pour toute question ou assistance, contactez l'auteur à cette adresse : kerdane
         ).pack(side="right")
 
 
+class BrowserWindow(tk.Toplevel):
+    """
+    Navigateur de résultats (élèves, groupes, non placés).
+
+    Le Treeview est virtualisé : seules les lignes visibles sont insérées dans
+    Tk, la barre de défilement pilote un décalage dans la liste filtrée.
+    """
+
+    VISIBLE_ROWS = 25
+    ALL_LABEL = "(Tous)"
+
+    def __init__(self, parent, students, planner, time_slots):
+        from classes.results_view import ResultsIndex, VIEW_STUDENTS
+
+        super().__init__(parent)
+
+        self.title("Parcourir les résultats")
+        self.geometry("900x600")
+        self.resizable(True, True)
+        self.transient(parent)
+
+        self.time_slots = time_slots
+        self.index = ResultsIndex(
+            students,
+            planner.group_records,
+            planner.unplaced_students,
+            time_slots,
+        )
+
+        self.view_var = tk.StringVar(value=VIEW_STUDENTS)
+        self.specialty_var = tk.StringVar(value=self.ALL_LABEL)
+        self.slot_var = tk.StringVar(value=self.ALL_LABEL)
+        self.classe_var = tk.StringVar(value=self.ALL_LABEL)
+        self.count_var = tk.StringVar()
+
+        self._row_ids = range(0)
+        self._offset = 0
+        self._visible = self.VISIBLE_ROWS
+
+        self._build_ui()
+        self._apply_filters()
+
+    def refresh(self):
+        """Relit le planning après des déplacements manuels (voir EditWindow)."""
+        offset = self._offset
+        self.index.rebuild()
+        self._apply_filters()
+        self._scroll_to(offset)
+
+    def _build_ui(self):
+        from classes.results_view import VIEW_STUDENTS, VIEW_GROUPS, VIEW_UNPLACED
+
+        padding = {"padx": 5, "pady": 5}
+
+        # Barre de filtres
+        filter_frame = ttk.Frame(self)
+        filter_frame.pack(fill="x", padx=10, pady=(10, 5))
+
+        views = [
+            ("Élèves", VIEW_STUDENTS),
+            ("Groupes", VIEW_GROUPS),
+            ("Non placés", VIEW_UNPLACED),
+        ]
+        for text, value in views:
+            ttk.Radiobutton(
+                filter_frame,
+                text=text,
+                value=value,
+                variable=self.view_var,
+                command=self._on_view_changed,
+            ).pack(side="left", **padding)
+
+        ttk.Separator(filter_frame, orient="vertical").pack(side="left", fill="y", padx=5)
+
+        ttk.Label(filter_frame, text="Spécialité :").pack(side="left")
+        spe_box = ttk.Combobox(
+            filter_frame,
+            textvariable=self.specialty_var,
+            values=[self.ALL_LABEL] + self.index.specialties(),
+            state="readonly",
+            width=15,
+        )
+        spe_box.pack(side="left", **padding)
+
+        ttk.Label(filter_frame, text="Créneau :").pack(side="left")
+        self.slot_box = ttk.Combobox(
+            filter_frame,
+            textvariable=self.slot_var,
+            values=[self.ALL_LABEL] + [ts.label for ts in self.time_slots],
+            state="readonly",
+            width=12,
+        )
+        self.slot_box.pack(side="left", **padding)
+
+        ttk.Label(filter_frame, text="Classe :").pack(side="left")
+        classe_box = ttk.Combobox(
+            filter_frame,
+            textvariable=self.classe_var,
+            values=[self.ALL_LABEL] + self.index.classes(),
+            state="readonly",
+            width=10,
+        )
+        classe_box.pack(side="left", **padding)
+
+        for box in (spe_box, self.slot_box, classe_box):
+            box.bind("<<ComboboxSelected>>", lambda e: self._apply_filters())
+
+        # Tableau virtualisé
+        table_frame = ttk.Frame(self)
+        table_frame.pack(fill="both", expand=True, padx=10, pady=5)
+
+        self.tree = ttk.Treeview(
+            table_frame,
+            show="headings",
+            height=self.VISIBLE_ROWS,
+            selectmode="browse",
+        )
+        self.tree.pack(side="left", fill="both", expand=True)
+
+        self.scrollbar = ttk.Scrollbar(
+            table_frame,
+            orient="vertical",
+            command=self._on_scrollbar,
+        )
+        self.scrollbar.pack(side="right", fill="y")
+
+        self.tree.bind("<MouseWheel>", self._on_mousewheel)
+        self.tree.bind("<Button-4>", lambda e: self._scroll_to(self._offset - 3))
+        self.tree.bind("<Button-5>", lambda e: self._scroll_to(self._offset + 3))
+        self.tree.bind("<Configure>", self._on_resize)
+
+        # Bas de fenêtre
+        bottom_frame = ttk.Frame(self)
+        bottom_frame.pack(fill="x", padx=10, pady=(0, 10))
+
+        ttk.Label(bottom_frame, textvariable=self.count_var).pack(side="left")
+        ttk.Button(
+            bottom_frame,
+            text="Fermer",
+            command=self.destroy
+        ).pack(side="right")
+
+    # --- filtres --------------------------------------------------------
+
+    def _on_view_changed(self):
+        from classes.results_view import VIEW_UNPLACED
+
+        # Pas de créneau pour les élèves non placés
+        if self.view_var.get() == VIEW_UNPLACED:
+            self.slot_var.set(self.ALL_LABEL)
+            self.slot_box.config(state="disabled")
+        else:
+            self.slot_box.config(state="readonly")
+        self._apply_filters()
+
+    def _selected(self, var):
+        value = var.get()
+        return None if value == self.ALL_LABEL else value
+
+    def _apply_filters(self):
+        view = self.view_var.get()
+
+        slot = None
+        slot_label = self._selected(self.slot_var)
+        if slot_label is not None:
+            slot = next(ts.index for ts in self.time_slots if ts.label == slot_label)
+
+        self._row_ids = self.index.filter(
+            view,
+            specialty=self._selected(self.specialty_var),
+            slot=slot,
+            classe=self._selected(self.classe_var),
+        )
+
+        columns = self.index.columns[view]
+        if tuple(self.tree["columns"]) != tuple(columns):
+            self.tree.config(columns=columns)
+            for col in columns:
+                self.tree.heading(col, text=col)
+                self.tree.column(col, width=120, stretch=True)
+
+        self.count_var.set(f"{len(self._row_ids)} ligne(s)")
+        self._offset = 0
+        self._refresh()
+
+    # --- défilement virtuel ---------------------------------------------
+
+    def _max_offset(self):
+        return max(0, len(self._row_ids) - self._visible)
+
+    def _scroll_to(self, offset):
+        offset = max(0, min(int(offset), self._max_offset()))
+        if offset != self._offset:
+            self._offset = offset
+            self._refresh()
+
+    def _on_scrollbar(self, action, *args):
+        if action == "moveto":
+            self._scroll_to(float(args[0]) * len(self._row_ids))
+        elif action == "scroll":
+            step = int(args[0])
+            if args[1] == "pages":
+                step *= self._visible
+            self._scroll_to(self._offset + step)
+
+    def _on_mousewheel(self, event):
+        self._scroll_to(self._offset - int(event.delta / 120) * 3)
+
+    def _on_resize(self, event):
+        # Adapter le nombre de lignes matérialisées à la hauteur disponible
+        row_height = 20
+        visible = max(1, event.height // row_height - 1)
+        if visible != self._visible:
+            self._visible = visible
+            self._offset = min(self._offset, self._max_offset())
+            self._refresh()
+
+    def _refresh(self):
+        view = self.view_var.get()
+        rows = self.index.get_rows(
+            view, self._row_ids, self._offset, self._offset + self._visible
+        )
+
+        self.tree.delete(*self.tree.get_children())
+        for row in rows:
+            self.tree.insert("", "end", values=row)
+
+        total = len(self._row_ids)
+        if total == 0:
+            self.scrollbar.set(0.0, 1.0)
+        else:
+            first = self._offset / total
+            last = min(1.0, (self._offset + self._visible) / total)
+            self.scrollbar.set(first, last)
+
+
+class EditWindow(tk.Toplevel):
+    """
+    Ajustements manuels par glisser-déposer.
+
+    Chaque déplacement passe par Planner.move_student, qui vérifie la capacité
+    et les doubles créneaux et met à jour les indicateurs en temps constant.
+    Les exports utilisent ensuite directement le planning modifié ;
+    on_change() est appelé après chaque déplacement (navigateurs ouverts).
+    """
+
+    def __init__(self, parent, students, planner, time_slots, on_change=None):
+        super().__init__(parent)
+
+        self.title("Ajustements manuels")
+        self.geometry("700x600")
+        self.resizable(True, True)
+        self.transient(parent)
+
+        self.planner = planner
+        self.time_slots = time_slots
+        self.on_change = on_change
+        self.health_var = tk.StringVar()
+
+        # élèves et effectifs des cases : lus dans le planner (cell_members,
+        # cell_count), toujours à jour après un déplacement, une annulation...
+        self._cell_nodes = {}     # (spe, créneau, groupe) -> iid
+        self._node_cells = {}     # iid -> (spe, créneau, groupe)
+        self._student_nodes = {}  # iid -> (élève, créneau)
+        self._loaded = set()      # cases dont les élèves sont insérés
+        self._drag_node = None
+
+        self._build_ui()
+        self._refresh_health()
+
+    def _build_ui(self):
+        ttk.Label(
+            self,
+            text="Glissez un élève sur un autre groupe ou créneau de la même spécialité.",
+            foreground="gray"
+        ).pack(anchor="w", padx=10, pady=(10, 0))
+
+        table_frame = ttk.Frame(self)
+        table_frame.pack(fill="both", expand=True, padx=10, pady=5)
+
+        self.tree = ttk.Treeview(table_frame, show="tree", selectmode="browse")
+        self.tree.pack(side="left", fill="both", expand=True)
+
+        scrollbar = ttk.Scrollbar(table_frame, orient="vertical", command=self.tree.yview)
+        scrollbar.pack(side="right", fill="y")
+        self.tree.config(yscrollcommand=scrollbar.set)
+
+        for spe, counts in sorted(self.planner.iter_counts()):
+            spe_node = self.tree.insert("", "end", text=spe)
+            for slot_idx, ts in enumerate(self.time_slots):
+                for group_idx in range(len(counts[slot_idx])):
+                    cell = (spe, slot_idx, group_idx)
+                    node = self.tree.insert(spe_node, "end", text=self._cell_label(cell))
+                    self._cell_nodes[cell] = node
+                    self._node_cells[node] = cell
+                    if self.planner.cell_count(*cell):
+                        # élément factice pour afficher le triangle d'ouverture
+                        self.tree.insert(node, "end", text="…")
+
+        self.tree.bind("<<TreeviewOpen>>", self._on_open)
+        self.tree.bind("<ButtonPress-1>", self._on_press)
+        self.tree.bind("<B1-Motion>", self._on_drag)
+        self.tree.bind("<ButtonRelease-1>", self._on_drop)
+
+        bottom_frame = ttk.Frame(self)
+        bottom_frame.pack(fill="x", padx=10, pady=(0, 10))
+
+        ttk.Label(bottom_frame, textvariable=self.health_var).pack(side="left")
+
+        ttk.Button(bottom_frame, text="Fermer", command=self.destroy).pack(side="right")
+        self.redo_button = ttk.Button(bottom_frame, text="Rétablir", command=self.redo)
+        self.redo_button.pack(side="right", padx=(0, 5))
+        self.undo_button = ttk.Button(bottom_frame, text="Annuler", command=self.undo)
+        self.undo_button.pack(side="right", padx=(0, 5))
+
+        self.bind("<Control-z>", lambda e: self.undo())
+        self.bind("<Control-y>", lambda e: self.redo())
+
+    # --- affichage ------------------------------------------------------
+
+    def _cell_label(self, cell):
+        spe, slot_idx, group_idx = cell
+        count = self.planner.cell_count(spe, slot_idx, group_idx)
+        capacity = f"/{self.planner.max_per_group}" if self.planner.max_per_group else ""
+        return f"{self.time_slots[slot_idx].label} · g{group_idx + 1}  ({count}{capacity})"
+
+    def _refresh_cell(self, cell):
+        node = self._cell_nodes[cell]
+        self.tree.item(node, text=self._cell_label(cell))
+
+        for child in self.tree.get_children(node):
+            self._student_nodes.pop(child, None)
+        self.tree.delete(*self.tree.get_children(node))
+
+        members = self.planner.cell_members(*cell)
+        if cell in self._loaded:
+            for st in sorted(members, key=lambda s: s.name):
+                child = self.tree.insert(node, "end", text=f"{st.name} ({st.classe})")
+                self._student_nodes[child] = (st, cell[1])
+        elif members:
+            self.tree.insert(node, "end", text="…")
+
+    def _refresh_health(self):
+        self.health_var.set(
+            f"Groupes en surcapacité : {self.planner.overfull_cells()}  ·  "
+            f"Écart-type des effectifs : {self.planner.fill_stddev():.2f}"
+        )
+        self.undo_button.config(state="normal" if self.planner.can_undo() else "disabled")
+        self.redo_button.config(state="normal" if self.planner.can_redo() else "disabled")
+
+    def _on_open(self, event):
+        node = self.tree.focus()
+        cell = self._node_cells.get(node)
+        if cell is not None and cell not in self._loaded:
+            self._loaded.add(cell)
+            self._refresh_cell(cell)
+
+    # --- glisser-déposer ------------------------------------------------
+
+    def _on_press(self, event):
+        node = self.tree.identify_row(event.y)
+        self._drag_node = node if node in self._student_nodes else None
+
+    def _on_drag(self, event):
+        if self._drag_node is not None:
+            self.tree.config(cursor="hand2")
+
+    def _on_drop(self, event):
+        self.tree.config(cursor="")
+        source = self._drag_node
+        self._drag_node = None
+        if source is None:
+            return
+
+        target = self.tree.identify_row(event.y)
+        if target in self._student_nodes:
+            target = self.tree.parent(target)
+        target_cell = self._node_cells.get(target)
+        if target_cell is None:
+            return
+
+        student, from_slot = self._student_nodes[source]
+        from_cell = self._cell_of(student, from_slot)
+        if target_cell == from_cell:
+            return
+        if target_cell[0] != from_cell[0]:
+            messagebox.showerror(
+                "Déplacement impossible",
+                "Un élève ne peut être déplacé que vers un groupe de la même spécialité.",
+                parent=self
+            )
+            return
+
+        _, to_slot, to_group = target_cell
+        allow_overfull = False
+        problems = self.planner.check_move(student, from_slot, to_slot, to_group)
+        if problems:
+            blocking = self.planner.check_move(
+                student, from_slot, to_slot, to_group, allow_overfull=True
+            )
+            if blocking:
+                messagebox.showerror("Déplacement impossible", "\n".join(blocking), parent=self)
+                return
+            if not messagebox.askyesno(
+                "Groupe complet ou places réservées",
+                "\n".join(problems) + "\n\nDéplacer quand même ?",
+                parent=self
+            ):
+                return
+            allow_overfull = True
+
+        self.planner.move_student(
+            student, from_slot, to_slot, to_group, allow_overfull=allow_overfull
+        )
+        self._after_move(from_cell, target_cell)
+
+    def _cell_of(self, student, slot_idx):
+        a = student.assignments[slot_idx]
+        return (a.specialty, slot_idx, a.group_index)
+
+    def _after_move(self, from_cell, to_cell):
+        self._refresh_cell(from_cell)
+        self._refresh_cell(to_cell)
+        # une place libérée peut être reprise aussitôt (liste d'attente, voir
+        # PriorityPlanner) : les autres cases dont l'effectif a changé aussi
+        for cell, node in self._cell_nodes.items():
+            if self.tree.item(node, "text") != self._cell_label(cell):
+                self._refresh_cell(cell)
+        self._refresh_health()
+        if self.on_change is not None:
+            self.on_change()
+
+    # --- annuler / rétablir ---------------------------------------------
+
+    def undo(self):
+        move = self.planner.undo()
+        if move is not None:
+            self._after_move(
+                (move.specialty, move.to_slot, move.to_group),
+                (move.specialty, move.from_slot, move.from_group),
+            )
+
+    def redo(self):
+        move = self.planner.redo()
+        if move is not None:
+            self._after_move(
+                (move.specialty, move.from_slot, move.from_group),
+                (move.specialty, move.to_slot, move.to_group),
+            )
+
+
+class StatsWindow(tk.Toplevel):
+    """Statistiques du planning : un onglet par tableau, export CSV / JSON."""
+
+    def __init__(self, parent, students, planner):
+        from utils.stats import compute_stats
+
+        super().__init__(parent)
+
+        self.title("Statistiques de la répartition")
+        self.geometry("800x500")
+        self.resizable(True, True)
+        self.transient(parent)
+
+        self.stats = compute_stats(students, planner)
+
+        self._build_ui()
+
+    def _build_ui(self):
+        notebook = ttk.Notebook(self)
+        notebook.pack(fill="both", expand=True, padx=10, pady=(10, 5))
+
+        for title, (header, rows) in self.stats.tables().items():
+            frame = ttk.Frame(notebook)
+            notebook.add(frame, text=title)
+
+            tree = ttk.Treeview(frame, columns=header, show="headings")
+            for col in header:
+                tree.heading(col, text=col)
+                tree.column(col, width=110, stretch=True)
+            for row in rows:
+                tree.insert("", "end", values=row)
+
+            scrollbar = ttk.Scrollbar(frame, orient="vertical", command=tree.yview)
+            tree.configure(yscrollcommand=scrollbar.set)
+            tree.pack(side="left", fill="both", expand=True)
+            scrollbar.pack(side="right", fill="y")
+
+        button_frame = ttk.Frame(self)
+        button_frame.pack(fill="x", padx=10, pady=(5, 10))
+
+        ttk.Button(
+            button_frame,
+            text="💾 Exporter les statistiques...",
+            command=self.save_stats
+        ).pack(side="left")
+
+        ttk.Button(
+            button_frame,
+            text="Fermer",
+            command=self.destroy
+        ).pack(side="right")
+
+    def save_stats(self):
+        """Enregistrer les statistiques (CSV ou JSON)"""
+        from utils.stats import export_stats
+
+        file_path = filedialog.asksaveasfilename(
+            parent=self,
+            title="Enregistrer les statistiques",
+            defaultextension=".csv",
+            filetypes=[
+                ("Fichiers CSV", "*.csv"),
+                ("Fichiers JSON", "*.json"),
+                ("Tous les fichiers", "*.*"),
+            ],
+        )
+
+        if file_path:
+            try:
+                export_stats(file_path, self.stats)
+                messagebox.showinfo(
+                    "Succès",
+                    "Les statistiques ont été enregistrées avec succès.",
+                    parent=self
+                )
+            except Exception as e:
+                messagebox.showerror(
+                    "Erreur",
+                    f"Erreur lors de l'enregistrement :\n{str(e)}",
+                    parent=self
+                )
+
+
+class AdviceWindow(tk.Toplevel):
+    """Blocages par spécialité et remèdes classés par nombre d'élèves débloqués."""
+
+    def __init__(self, parent, report):
+        super().__init__(parent)
+
+        self.title("Blocages et remèdes")
+        self.geometry("700x480")
+        self.resizable(True, True)
+        self.transient(parent)
+
+        self.report = report
+
+        self._build_ui()
+
+    def _add_table(self, parent, header, rows, height):
+        frame = ttk.Frame(parent)
+        frame.pack(fill="both", expand=True, padx=10, pady=(0, 5))
+
+        tree = ttk.Treeview(frame, columns=header, show="headings", height=height)
+        for col in header:
+            tree.heading(col, text=col)
+            tree.column(col, width=100, stretch=True)
+        tree.column(header[0], width=360)
+        for row in rows:
+            tree.insert("", "end", values=row)
+
+        scrollbar = ttk.Scrollbar(frame, orient="vertical", command=tree.yview)
+        tree.configure(yscrollcommand=scrollbar.set)
+        tree.pack(side="left", fill="both", expand=True)
+        scrollbar.pack(side="right", fill="y")
+
+    def _build_ui(self):
+        report = self.report
+
+        ttk.Label(
+            self,
+            text=(
+                "Remèdes simulés sur les effectifs actuels : seuls les élèves non placés "
+                "sont replacés, les autres affectations ne bougent pas."
+            ),
+            wraplength=660,
+            foreground="gray"
+        ).pack(anchor="w", padx=10, pady=(10, 5))
+
+        ttk.Label(self, text="Remèdes", font=("Arial", 9, "bold")).pack(anchor="w", padx=10)
+        self._add_table(
+            self,
+            ["Remède", "Élèves placés"],
+            [[r.label, r.unblocked] for r in report.remedies],
+            height=7,
+        )
+
+        ttk.Label(self, text="Spécialités bloquantes", font=("Arial", 9, "bold")).pack(anchor="w", padx=10)
+        self._add_table(
+            self,
+            ["Spécialité", "Non placés", "Groupes pleins", "Conflits de créneaux"],
+            [[b.specialty, b.unplaced, b.full, b.slot_conflicts] for b in report.blocking],
+            height=6,
+        )
+
+        if report.too_many_choices:
+            ttk.Label(
+                self,
+                text=f"{report.too_many_choices} élève(s) ont plus de vœux que de créneaux disponibles.",
+                foreground="red"
+            ).pack(anchor="w", padx=10)
+
+        ttk.Button(self, text="Fermer", command=self.destroy).pack(side="right", padx=10, pady=10)
+
+
+class CorrectionsWindow(tk.Toplevel):
+    """
+    Anomalies du fichier d'élèves et corrections proposées, avant la
+    répartition : chaque rapprochement de spécialité est accepté ou refusé
+    séparément. Une fois la fenêtre fermée, result vaut les corrections à
+    appliquer (None : aucune) ou False si la répartition est annulée.
+    """
+
+    MAX_SUMMARY_LINES = 15
+
+    def __init__(self, parent, report):
+        super().__init__(parent)
+
+        self.title("Anomalies dans le fichier d'élèves")
+        self.resizable(False, False)
+        self.transient(parent)
+        self.grab_set()
+
+        self.report = report
+        self.result = False
+        self.skip_var = tk.BooleanVar(value=True)
+        self.alias_vars = {spelling: tk.BooleanVar(value=True) for spelling in sorted(report.aliases)}
+
+        self._build_ui()
+        self.protocol("WM_DELETE_WINDOW", self.cancel)
+
+    def _build_ui(self):
+        lines = self.report.summary(with_aliases=False).splitlines()
+        if len(lines) > self.MAX_SUMMARY_LINES:
+            extra = len(lines) - self.MAX_SUMMARY_LINES
+            lines = lines[:self.MAX_SUMMARY_LINES] + [f"... ({extra} ligne(s) de plus)"]
+        ttk.Label(self, text="\n".join(lines), justify="left", wraplength=520).pack(
+            anchor="w", padx=10, pady=(10, 5)
+        )
+
+        if self.report.skipped_rows or self.alias_vars:
+            frame = ttk.LabelFrame(self, text="Corrections à appliquer")
+            frame.pack(fill="x", padx=10, pady=5)
+            if self.report.skipped_rows:
+                ttk.Checkbutton(
+                    frame,
+                    text=f"Écarter les {len(self.report.skipped_rows)} doublon(s) "
+                         "(la première ligne est gardée)",
+                    variable=self.skip_var,
+                ).pack(anchor="w", padx=10)
+            for spelling, var in self.alias_vars.items():
+                ttk.Checkbutton(
+                    frame, text=self.report.alias_label(spelling), variable=var
+                ).pack(anchor="w", padx=10)
+            ttk.Label(
+                frame,
+                text="Décocher une correction pour garder le fichier tel quel sur ce point.",
+                foreground="gray",
+            ).pack(anchor="w", padx=10, pady=(0, 5))
+
+        button_frame = ttk.Frame(self)
+        button_frame.pack(fill="x", side="bottom", padx=10, pady=10)
+        ttk.Button(button_frame, text="Répartir", command=self.accept).pack(side="left")
+        ttk.Button(button_frame, text="Annuler", command=self.cancel).pack(side="right")
+
+    def accept(self):
+        accepted = [spelling for spelling, var in self.alias_vars.items() if var.get()]
+        skip = bool(self.report.skipped_rows) and self.skip_var.get()
+        if skip or accepted:
+            self.result = self.report.corrections(accepted, skip_duplicates=skip)
+        else:
+            self.result = None
+        self.destroy()
+
+    def cancel(self):
+        self.result = False
+        self.destroy()
+
+
+class ExportAllWindow(tk.Toplevel):
+    """
+    Enregistrement de tous les résultats en une fois (voir utils.export_all).
+
+    Les fichiers sont écrits dans des threads, dans des fichiers temporaires
+    renommés seulement si tout a réussi : la fenêtre reste utilisable,
+    l'export peut être annulé et aucun fichier partiel n'est laissé.
+    """
+
+    FORMATS = [
+        ("CSV", ".csv"),
+        ("Excel", ".xlsx"),
+        ("JSON", ".json"),
+        ("NDJSON", ".ndjson"),
+        ("PDF", ".pdf"),
+    ]
+
+    def __init__(self, parent, students, planner, time_slots, manifest=None):
+        from utils.export_all import EXPORT_LABELS
+
+        super().__init__(parent)
+
+        self.title("Tout enregistrer")
+        self.geometry("480x420")
+        self.resizable(False, False)
+        self.transient(parent)
+        self.grab_set()
+
+        self.students = students
+        self.planner = planner
+        self.time_slots = time_slots
+        self.manifest = manifest
+
+        self.folder_var = tk.StringVar()
+        self.format_vars = {ext: tk.BooleanVar(value=ext == ".csv") for _, ext in self.FORMATS}
+        kinds = ["students", "groups", "stats"]
+        if planner.unplaced_students:
+            kinds.insert(2, "unplaced")
+        if manifest is not None:
+            kinds.append("manifest")
+        self.kind_vars = {kind: tk.BooleanVar(value=True) for kind in kinds}
+        self.kind_labels = EXPORT_LABELS
+        self.status_var = tk.StringVar(value="Choisissez un dossier et les formats.")
+
+        # export en cours : arrêt demandé, messages des threads (file)
+        self._cancel_event = None
+        self._queue = None
+        self._worker = None
+
+        self._build_ui()
+        self.protocol("WM_DELETE_WINDOW", self.close)
+
+    def _build_ui(self):
+        padding = {"padx": 10, "pady": 5}
+
+        folder_frame = ttk.LabelFrame(self, text="Dossier")
+        folder_frame.pack(fill="x", padx=10, pady=(10, 5))
+        ttk.Entry(folder_frame, textvariable=self.folder_var, width=45).grid(
+            row=0, column=0, sticky="we", **padding
+        )
+        ttk.Button(folder_frame, text="Parcourir...", command=self.browse_folder).grid(
+            row=0, column=1, **padding
+        )
+
+        format_frame = ttk.LabelFrame(self, text="Formats")
+        format_frame.pack(fill="x", padx=10, pady=5)
+        for column, (label, ext) in enumerate(self.FORMATS):
+            ttk.Checkbutton(format_frame, text=label, variable=self.format_vars[ext]).grid(
+                row=0, column=column, sticky="w", **padding
+            )
+
+        kind_frame = ttk.LabelFrame(self, text="Fichiers")
+        kind_frame.pack(fill="x", padx=10, pady=5)
+        for kind, var in self.kind_vars.items():
+            ttk.Checkbutton(kind_frame, text=self.kind_labels[kind], variable=var).pack(
+                anchor="w", padx=10
+            )
+        ttk.Label(
+            kind_frame,
+            text="Statistiques : CSV ou JSON seulement ; manifeste : JSON seulement.",
+            foreground="gray",
+        ).pack(anchor="w", padx=10, pady=(0, 5))
+
+        self.progress = ttk.Progressbar(self, mode="determinate")
+        self.progress.pack(fill="x", padx=10, pady=(10, 0))
+        ttk.Label(self, textvariable=self.status_var, wraplength=450).pack(anchor="w", **padding)
+
+        button_frame = ttk.Frame(self)
+        button_frame.pack(fill="x", side="bottom", padx=10, pady=10)
+        self.save_button = ttk.Button(button_frame, text="Enregistrer", command=self.start)
+        self.save_button.pack(side="left")
+        self.close_button = ttk.Button(button_frame, text="Fermer", command=self.close)
+        self.close_button.pack(side="right")
+
+    def browse_folder(self):
+        folder = filedialog.askdirectory(parent=self, title="Dossier des résultats")
+        if folder:
+            self.folder_var.set(folder)
+
+    def _tasks(self):
+        import os
+        from utils.export_all import plan_exports
+
+        folder = self.folder_var.get().strip()
+        if not folder or not os.path.isdir(folder):
+            raise ValueError("Choisissez un dossier existant.")
+        formats = [ext for _, ext in self.FORMATS if self.format_vars[ext].get()]
+        kinds = [kind for kind, var in self.kind_vars.items() if var.get()]
+        tasks = plan_exports(
+            folder, formats, self.students, self.planner, self.time_slots,
+            manifest=self.manifest, kinds=kinds,
+        )
+        if not tasks:
+            raise ValueError("Aucun fichier à enregistrer avec ces formats.")
+        return tasks
+
+    def start(self):
+        import os
+        import queue
+        import threading
+        from utils.export_all import export_all
+
+        try:
+            tasks = self._tasks()
+        except ValueError as e:
+            messagebox.showerror("Tout enregistrer", str(e), parent=self)
+            return
+
+        existing = [os.path.basename(t.path) for t in tasks if os.path.exists(t.path)]
+        if existing and not messagebox.askyesno(
+            "Fichiers existants",
+            "Ces fichiers seront remplacés :\n" + "\n".join(existing[:10])
+            + ("\n..." if len(existing) > 10 else ""),
+            parent=self,
+        ):
+            return
+
+        self._cancel_event = threading.Event()
+        self._queue = queue.Queue()
+        self.progress.configure(maximum=len(tasks), value=0)
+        self.status_var.set(f"Écriture de {len(tasks)} fichier(s)...")
+        self.save_button.configure(state="disabled")
+        self.close_button.configure(text="Annuler")
+
+        def on_progress(done, total, task):
+            self._queue.put(("progress", done, total, task.label))
+
+        def run():
+            try:
+                written = export_all(tasks, on_progress=on_progress, cancel_event=self._cancel_event)
+                self._queue.put(("done", written))
+            except Exception as e:
+                self._queue.put(("error", e))
+
+        # Tk n'est utilisé que depuis ce thread : les threads d'export passent par la file
+        self._worker = threading.Thread(target=run, daemon=True)
+        self._worker.start()
+        self.after(100, self._poll)
+
+    def _poll(self):
+        from utils.export_all import ExportCancelled
+
+        while not self._queue.empty():
+            message = self._queue.get()
+            if message[0] == "progress":
+                _, done, total, label = message
+                self.progress.configure(value=done)
+                self.status_var.set(f"{done} / {total} : {label}")
+                continue
+
+            self._worker = None
+            self.save_button.configure(state="normal")
+            self.close_button.configure(text="Fermer")
+            if message[0] == "done":
+                self.status_var.set(f"{len(message[1])} fichier(s) enregistré(s).")
+                messagebox.showinfo(
+                    "Succès",
+                    f"{len(message[1])} fichier(s) enregistré(s) dans {self.folder_var.get()}.",
+                    parent=self,
+                )
+                self.destroy()
+            elif isinstance(message[1], ExportCancelled):
+                self.progress.configure(value=0)
+                self.status_var.set(str(message[1]))
+            else:
+                self.progress.configure(value=0)
+                self.status_var.set("Erreur : aucun fichier n'a été écrit.")
+                messagebox.showerror(
+                    "Erreur",
+                    f"Erreur lors de l'enregistrement (aucun fichier écrit) :\n{message[1]}",
+                    parent=self,
+                )
+            return
+        self.after(100, self._poll)
+
+    def close(self):
+        """Annule l'export en cours, ou ferme la fenêtre."""
+        if self._worker is not None:
+            self._cancel_event.set()
+            self.status_var.set("Annulation...")
+            return
+        self.destroy()
+
+
 class ResultsWindow(tk.Toplevel):
     """Fenêtre de résultats avec options d'export"""
     
-    def __init__(self, parent, students, planner, time_slots, min_group=5, max_group=8, max_groups_per_spe=5):
+    def __init__(self, parent, students, planner, time_slots, min_group=5, max_group=8, max_groups_per_spe=5,
+                 manifest=None):
         super().__init__(parent)
         
+        self.manifest = manifest
         self.students = students
         self.planner = planner
         self.time_slots = time_slots
         self.min_group = min_group
         self.max_group = max_group
         self.max_groups_per_spe = max_groups_per_spe
+        self._triage_report = None
+        # navigateurs ouverts, relus après chaque déplacement manuel
+        self._browsers = []
         
         self.title("Résultats de la planification")
         
         # Hauteur dynamique selon s'il y a des élèves non placés
-        height = 650 if planner.unplaced_students else 420
-        self.geometry(f"600x{height}")
+        height = 740 if planner.unplaced_students else 470
+        if planner.rebalance_report is not None:
+            height += 90
+        self.geometry(f"720x{height}")
         self.resizable(False, False)
         
         # Centrer la fenêtre
@@ -352,6 +1263,18 @@ class ResultsWindow(tk.Toplevel):
                 foreground="red"
             )
             label_unplaced.grid(row=2, column=1, sticky="w", **padding)
+
+        report = self.planner.rebalance_report
+        if report is not None:
+            ttk.Label(summary_frame, text="Équilibrage :").grid(
+                row=3, column=0, sticky="nw", **padding
+            )
+            ttk.Label(
+                summary_frame,
+                text=report.summary(),
+                justify="left",
+                wraplength=430,
+            ).grid(row=3, column=1, sticky="w", **padding)
         
         # Frame de conseils si élèves non placés
         if self.planner.unplaced_students:
@@ -369,11 +1292,35 @@ class ResultsWindow(tk.Toplevel):
                 foreground="#1a5490"
             )
             advice_label.pack(anchor="w", **padding)
+
+            ttk.Button(
+                advice_frame,
+                text="Détail des blocages et des remèdes...",
+                command=self.show_advice
+            ).pack(anchor="w", padx=10, pady=(0, 5))
         
         # Frame d'export
         export_frame = ttk.LabelFrame(self, text="Enregistrer les résultats")
         export_frame.pack(fill="both", expand=True, padx=10, pady=10)
         
+        # Export de tous les fichiers en une fois
+        all_frame = ttk.Frame(export_frame)
+        all_frame.pack(fill="x", padx=10, pady=(10, 0))
+
+        ttk.Button(
+            all_frame,
+            text="💾 Tout enregistrer...",
+            command=self.save_all
+        ).pack(side="left")
+
+        ttk.Label(
+            all_frame,
+            text="Tous les fichiers, dans un ou plusieurs formats, en une fois.",
+            foreground="gray"
+        ).pack(side="left", padx=(10, 0))
+
+        ttk.Separator(export_frame, orient="horizontal").pack(fill="x", padx=10, pady=5)
+
         # Export par élève
         student_frame = ttk.Frame(export_frame)
         student_frame.pack(fill="x", padx=10, pady=10)
@@ -449,53 +1396,136 @@ class ResultsWindow(tk.Toplevel):
         # Bouton fermer
         button_frame = ttk.Frame(self)
         button_frame.pack(fill="x", padx=10, pady=10)
-        
+
+        ttk.Button(
+            button_frame,
+            text="🔍 Parcourir les résultats...",
+            command=self.show_browser
+        ).pack(side="left")
+
+        ttk.Button(
+            button_frame,
+            text="✏️ Ajuster manuellement...",
+            command=self.show_editor
+        ).pack(side="left", padx=(5, 0))
+
+        ttk.Button(
+            button_frame,
+            text="📊 Statistiques...",
+            command=self.show_stats
+        ).pack(side="left", padx=(5, 0))
+
+        if self.manifest is not None:
+            ttk.Button(
+                button_frame,
+                text="📄 Manifeste d'exécution...",
+                command=self.save_run_manifest
+            ).pack(side="left", padx=(5, 0))
+
         ttk.Button(
             button_frame,
             text="Fermer",
             command=self.destroy
         ).pack(side="right")
-    
+
+    def show_browser(self):
+        """Ouvrir le navigateur de résultats"""
+        self._browsers.append(BrowserWindow(self, self.students, self.planner, self.time_slots))
+
+    def show_editor(self):
+        """Ouvrir la fenêtre d'ajustements manuels"""
+        EditWindow(
+            self, self.students, self.planner, self.time_slots,
+            on_change=self._planning_changed,
+        )
+
+    def _planning_changed(self):
+        self._browsers = [browser for browser in self._browsers if browser.winfo_exists()]
+        for browser in self._browsers:
+            browser.refresh()
+
+    def save_all(self):
+        """Enregistrer tous les résultats (plusieurs formats, en parallèle)"""
+        ExportAllWindow(self, self.students, self.planner, self.time_slots, manifest=self.manifest)
+
+    def show_stats(self):
+        """Ouvrir les statistiques de la répartition"""
+        StatsWindow(self, self.students, self.planner)
+
+    def save_run_manifest(self):
+        """Enregistrer le manifeste d'exécution (pour rejouer la planification)"""
+        file_path = filedialog.asksaveasfilename(
+            parent=self,
+            title="Enregistrer le manifeste d'exécution",
+            defaultextension=".json",
+            filetypes=[("Fichiers JSON", "*.json"), ("Tous les fichiers", "*.*")],
+        )
+
+        if file_path:
+            try:
+                from utils.manifest import save_manifest
+                save_manifest(file_path, self.manifest)
+                messagebox.showinfo(
+                    "Succès",
+                    "Le manifeste d'exécution a été enregistré avec succès.",
+                    parent=self
+                )
+            except Exception as e:
+                messagebox.showerror(
+                    "Erreur",
+                    f"Erreur lors de l'enregistrement :\n{str(e)}",
+                    parent=self
+                )
+
+    def _get_triage(self):
+        """Analyse des non placés (calculée une seule fois)"""
+        if self._triage_report is None:
+            from classes.triage import triage
+            self._triage_report = triage(self.planner, self.max_groups_per_spe)
+        return self._triage_report
+
     def _generate_advice(self):
-        """Génère des conseils personnalisés pour améliorer la répartition"""
-        num_unplaced = len(self.planner.unplaced_students)
-        total_students = len(self.students)
-        
-        # Calculer des suggestions
-        suggestions = []
-        
-        # Suggestion 1: Augmenter le max par groupe
-        new_max = self.max_group + 2
-        suggestions.append(f"• Augmenter le max. élèves par groupe à {new_max}")
-        
-        # Suggestion 2: Augmenter le nombre de groupes si pas déjà élevé
-        if self.max_groups_per_spe < len(self.time_slots):
-            new_max_groups = min(self.max_groups_per_spe + 1, len(self.time_slots))
-            suggestions.append(f"• Augmenter le max. groupes par spécialité à {new_max_groups}")
-        
-        # Suggestion 3: Diminuer le min si pas trop bas
-        if self.min_group > 3:
-            new_min = max(3, self.min_group - 1)
-            suggestions.append(f"• Diminuer le min. élèves par groupe à {new_min}")
-        
-        advice = f"Pour placer les {num_unplaced} élève(s) restant(s), vous pouvez essayer de :\n\n"
-        advice += "\n".join(suggestions)
-        advice += "\n\nRecommandation : Privilégiez d'abord l'augmentation du nombre de groupes pour maintenir des effectifs raisonnables."
-        
+        """Conseils d'après les blocages réels et l'effet simulé de chaque remède"""
+        report = self._get_triage()
+
+        advice = f"Pour placer les {report.num_unplaced} élève(s) restant(s), vous pouvez essayer de :\n\n"
+        useful = [r for r in report.remedies if r.unblocked > 0][:3]
+        if useful:
+            advice += "\n".join(
+                f"• {r.label} : +{r.unblocked} élève(s) placé(s)" for r in useful
+            )
+        else:
+            advice += "• Aucun remède simple ne place d'élève supplémentaire ; revoir les vœux ou le nombre de créneaux"
+
+        if report.blocking:
+            blocking = ", ".join(f"{b.specialty} ({b.unplaced})" for b in report.blocking[:4])
+            advice += f"\n\nSpécialités bloquantes : {blocking}"
+        if report.too_many_choices:
+            advice += (
+                f"\n{report.too_many_choices} élève(s) ont plus de vœux que de créneaux "
+                "et ne peuvent pas être placés."
+            )
+
         return advice
-    
+
+    def show_advice(self):
+        """Ouvrir le détail des blocages et des remèdes"""
+        AdviceWindow(self, self._get_triage())
+
     def save_per_student(self):
         """Enregistrer le planning par élève"""
+        from utils.formats import OUTPUT_FILETYPES, export_planning_per_student
+
         file_path = filedialog.asksaveasfilename(
             parent=self,
             title="Enregistrer le planning par élève",
             defaultextension=".csv",
-            filetypes=[("Fichiers CSV", "*.csv"), ("Tous les fichiers", "*.*")],
+            filetypes=OUTPUT_FILETYPES,
         )
         
         if file_path:
             try:
-                save_planning_per_student(file_path, self.students, self.time_slots)
+                export_planning_per_student(file_path, self.students, self.time_slots)
                 messagebox.showinfo(
                     "Succès",
                     "Le planning par élève a été enregistré avec succès.",
@@ -510,16 +1540,18 @@ class ResultsWindow(tk.Toplevel):
     
     def save_per_group(self):
         """Enregistrer le planning par groupe"""
+        from utils.formats import OUTPUT_FILETYPES, export_planning_per_group
+
         file_path = filedialog.asksaveasfilename(
             parent=self,
             title="Enregistrer le planning par groupe",
             defaultextension=".csv",
-            filetypes=[("Fichiers CSV", "*.csv"), ("Tous les fichiers", "*.*")],
+            filetypes=OUTPUT_FILETYPES,
         )
         
         if file_path:
             try:
-                save_planning_per_group_formatted(
+                export_planning_per_group(
                     file_path,
                     self.planner.group_records,
                     self.time_slots,
@@ -538,16 +1570,18 @@ class ResultsWindow(tk.Toplevel):
     
     def save_unplaced(self):
         """Enregistrer la liste des élèves non placés"""
+        from utils.formats import OUTPUT_FILETYPES, export_unplaced_students
+
         file_path = filedialog.asksaveasfilename(
             parent=self,
             title="Enregistrer les élèves non placés",
             defaultextension=".csv",
-            filetypes=[("Fichiers CSV", "*.csv"), ("Tous les fichiers", "*.*")],
+            filetypes=OUTPUT_FILETYPES,
         )
         
         if file_path:
             try:
-                save_unplaced_students(file_path, self.planner.unplaced_students)
+                export_unplaced_students(file_path, self.planner.unplaced_students)
                 messagebox.showinfo(
                     "Succès",
                     "La liste des élèves non placés a été enregistrée avec succès.",
@@ -562,41 +1596,91 @@ class ResultsWindow(tk.Toplevel):
 
 # --- Config des créneaux (même chose que dans ton main actuel) ---
 
-TIME_SLOTS = [
-    TimeSlot(0, "09:00-09:25"),
-    TimeSlot(1, "09:30-09:55"),
-    TimeSlot(2, "10:05-10:30"),
-    TimeSlot(3, "10:35-11:00"),
-    TimeSlot(4, "11:00-11:25"),
+TIME_SLOT_LABELS = [
+    "09:00-09:25",
+    "09:30-09:55",
+    "10:05-10:30",
+    "10:35-11:00",
+    "11:00-11:25",
 ]
 
 
+def get_time_slots(labels=None):
+    from classes.models import TimeSlot
+    return [TimeSlot(i, label) for i, label in enumerate(labels or TIME_SLOT_LABELS)]
+
+
 class PlanningApp(tk.Tk):
     def __init__(self):
         super().__init__()
 
         self.title("Planning des spécialités")
-        self.geometry("650x300")
+        self.geometry("650x495")
         self.resizable(False, False)
 
         self.input_path = tk.StringVar()
         self.min_group_var = tk.StringVar(value="5")
         self.max_group_var = tk.StringVar(value="8")
         self.max_groups_per_spe_var = tk.StringVar(value="5")
-        self.status_var = tk.StringVar(value="En attente de fichier CSV...")
+        self.seed_var = tk.StringVar(value="")
+        self.strategy_var = tk.StringVar(value="")
+        self.rebalance_var = tk.BooleanVar(value=False)
+        self.time_budget_var = tk.StringVar(value="")
+        self.profile_var = tk.StringVar(value="")
+        self.status_var = tk.StringVar(value="En attente du fichier d'élèves...")
+
+        # profil chargé (utils.profiles.Profile) et ses créneaux
+        self.profile = None
+        self.time_slot_labels = list(TIME_SLOT_LABELS)
+        # libellé affiché -> nom de la stratégie (voir classes.strategies)
+        self._strategy_names = {}
+
+        # amélioration continue en cours : arrêt demandé, meilleur planning publié
+        self._cancel_event = None
+        self._snapshot = None
+        self._run_params = None
 
         self._build_ui()
+        # registre des stratégies lu une fois la fenêtre affichée
+        self.after_idle(self._refresh_strategies)
 
     # --- UI ---------------------------------------------------------
 
     def _build_ui(self):
         padding = {"padx": 10, "pady": 5}
 
+        # Frame profil
+        profile_frame = ttk.LabelFrame(self, text="Profil")
+        profile_frame.pack(fill="x", padx=10, pady=(10, 0))
+
+        # liste lue à l'ouverture seulement (utils.profiles est importé à la demande)
+        self.profile_combo = ttk.Combobox(
+            profile_frame,
+            textvariable=self.profile_var,
+            state="readonly",
+            width=35,
+            postcommand=self._refresh_profiles,
+        )
+        self.profile_combo.grid(row=0, column=0, sticky="w", **padding)
+        self.profile_combo.bind("<<ComboboxSelected>>", self._on_profile_selected)
+
+        ttk.Button(
+            profile_frame,
+            text="Enregistrer...",
+            command=self.save_profile,
+        ).grid(row=0, column=1, **padding)
+
+        ttk.Button(
+            profile_frame,
+            text="Supprimer",
+            command=self.delete_profile,
+        ).grid(row=0, column=2, **padding)
+
         # Frame fichier
         file_frame = ttk.LabelFrame(self, text="Fichier d'élèves")
         file_frame.pack(fill="x", padx=10, pady=10)
 
-        ttk.Label(file_frame, text="CSV des choix de spécialités :").grid(
+        ttk.Label(file_frame, text="Fichier des choix de spécialités :").grid(
             row=0, column=0, sticky="w", **padding
         )
 
@@ -636,6 +1720,37 @@ class PlanningApp(tk.Tk):
             row=2, column=1, sticky="w", **padding
         )
 
+        ttk.Label(params_frame, text="Graine de répartition (optionnel) :").grid(
+            row=3, column=0, sticky="w", **padding
+        )
+        ttk.Entry(params_frame, textvariable=self.seed_var, width=8).grid(
+            row=3, column=1, sticky="w", **padding
+        )
+
+        ttk.Label(params_frame, text="Stratégie de répartition :").grid(
+            row=4, column=0, sticky="w", **padding
+        )
+        self.strategy_combo = ttk.Combobox(
+            params_frame,
+            textvariable=self.strategy_var,
+            state="readonly",
+            width=35,
+        )
+        self.strategy_combo.grid(row=4, column=1, sticky="w", **padding)
+
+        ttk.Checkbutton(
+            params_frame,
+            text="Compléter ou fusionner les groupes sous le minimum d'élèves",
+            variable=self.rebalance_var,
+        ).grid(row=5, column=0, columnspan=2, sticky="w", **padding)
+
+        ttk.Label(params_frame, text="Durée max. du calcul (secondes, optionnel) :").grid(
+            row=6, column=0, sticky="w", **padding
+        )
+        ttk.Entry(params_frame, textvariable=self.time_budget_var, width=8).grid(
+            row=6, column=1, sticky="w", **padding
+        )
+
         # Frame actions
         action_frame = ttk.Frame(self)
         action_frame.pack(fill="x", padx=10, pady=10)
@@ -652,11 +1767,29 @@ class PlanningApp(tk.Tk):
             command=self.show_contact
         ).pack(side="left", padx=(5, 0))
 
-        ttk.Button(
+        self.generate_button = ttk.Button(
             action_frame,
             text="Générer les plannings",
             command=self.run_planning,
-        ).pack(side="right")
+        )
+        self.generate_button.pack(side="right")
+
+        # actifs seulement pendant l'amélioration continue
+        self.stop_button = ttk.Button(
+            action_frame,
+            text="Arrêter",
+            command=self.stop_improving,
+            state="disabled",
+        )
+        self.stop_button.pack(side="right", padx=(0, 5))
+
+        self.snapshot_button = ttk.Button(
+            action_frame,
+            text="Enregistrer le meilleur...",
+            command=self.save_snapshot,
+            state="disabled",
+        )
+        self.snapshot_button.pack(side="right", padx=(0, 5))
 
         # Copyright
         copyright_label = tk.Label(
@@ -682,13 +1815,138 @@ class PlanningApp(tk.Tk):
         ContactWindow(self)
 
     def browse_input_file(self):
+        from utils.formats import INPUT_FILETYPES
+
         path = filedialog.askopenfilename(
-            title="Choisir le fichier CSV d'entrée",
-            filetypes=[("Fichiers CSV", "*.csv"), ("Tous les fichiers", "*.*")],
+            title="Choisir le fichier d'élèves",
+            filetypes=INPUT_FILETYPES,
         )
         if path:
             self.input_path.set(path)
 
+    # --- Profils -----------------------------------------------------
+
+    def _refresh_profiles(self):
+        from utils.profiles import list_profiles
+        self.profile_combo["values"] = list_profiles()
+
+    def _refresh_strategies(self):
+        from classes.strategies import STRATEGIES
+        self._strategy_names = {s.label: s.name for s in STRATEGIES.values()}
+        # sans les stratégies à option requise (rotation : fichier d'historique) ;
+        # « sharded » lance des processus : l'exécutable s'appuie sur
+        # multiprocessing.freeze_support() (voir __main__)
+        self.strategy_combo["values"] = [s.label for s in STRATEGIES.values() if not s.requires]
+        if not self.strategy_var.get():
+            self._set_strategy("greedy")
+
+    def _set_strategy(self, name):
+        from classes.strategies import get_strategy
+        self.strategy_var.set(get_strategy(name).label)
+
+    def _selected_strategy(self):
+        """Stratégie choisie dans la liste (objet classes.strategies.Strategy)."""
+        from classes.strategies import get_strategy
+        if not self._strategy_names:
+            self._refresh_strategies()
+        return get_strategy(self._strategy_names.get(self.strategy_var.get(), "greedy"))
+
+    def _on_profile_selected(self, event=None):
+        from utils.profiles import load_profile
+
+        try:
+            profile = load_profile(self.profile_var.get())
+        except (OSError, ValueError) as e:
+            messagebox.showerror("Profil", f"Impossible de charger le profil :\n{e}")
+            return
+
+        self.profile = profile
+        self.time_slot_labels = [label for _, label in profile.time_slots]
+        self.min_group_var.set(str(profile.min_per_group))
+        self.max_group_var.set(str(profile.max_per_group))
+        self.max_groups_per_spe_var.set(str(profile.max_groups_per_spe))
+        self.seed_var.set("" if profile.seed is None else str(profile.seed))
+        self._set_strategy(profile.strategy)
+        self.rebalance_var.set(profile.rebalance)
+        time_budget = profile.strategy_params.get("time_budget")
+        self.time_budget_var.set("" if time_budget is None else f"{time_budget:g}")
+        self.status_var.set(f"Profil « {profile.name} » chargé.")
+
+    def _update_profile(self, profile, min_group, max_group, max_groups_per_spe, seed, time_budget):
+        """Reporte les paramètres saisis dans le profil."""
+        profile.time_slots = list(enumerate(self.time_slot_labels))
+        profile.min_per_group = min_group
+        profile.max_per_group = max_group
+        profile.max_groups_per_spe = max_groups_per_spe
+        profile.seed = seed
+        profile.rebalance = self.rebalance_var.get()
+        strategy = self._selected_strategy()
+        if strategy.name != profile.strategy:
+            profile.strategy, profile.strategy_params = strategy.name, {}
+        if "time_budget" in strategy.options:
+            if time_budget is None:
+                profile.strategy_params.pop("time_budget", None)
+            else:
+                profile.strategy_params["time_budget"] = time_budget
+
+    def save_profile(self):
+        from utils.profiles import Profile, save_profile
+        from utils.formats import detect_mapping
+
+        try:
+            params = self._read_params()
+        except ValueError as e:
+            messagebox.showerror("Paramètre invalide", str(e))
+            return
+
+        name = simpledialog.askstring(
+            "Enregistrer le profil",
+            "Nom du profil :",
+            initialvalue=self.profile.name if self.profile is not None else "",
+            parent=self,
+        )
+        if not name or not name.strip():
+            return
+        name = name.strip()
+
+        if self.profile is not None and self.profile.name == name:
+            profile = self.profile
+        else:
+            profile = Profile(name=name)
+        self._update_profile(profile, *params)
+
+        input_path = self.input_path.get().strip()
+        if input_path:
+            try:
+                profile.mapping = detect_mapping(input_path)
+            except (OSError, ValueError, ImportError):
+                pass    # colonnes détectées à chaque chargement
+
+        try:
+            save_profile(profile)
+        except (OSError, ValueError) as e:
+            messagebox.showerror("Profil", f"Erreur lors de l'enregistrement :\n{e}")
+            return
+        self.profile = profile
+        self.profile_var.set(profile.name)
+        self.status_var.set(f"Profil « {profile.name} » enregistré.")
+
+    def delete_profile(self):
+        from utils.profiles import delete_profile
+
+        if self.profile is None:
+            return
+        if not messagebox.askyesno(
+            "Supprimer le profil",
+            f"Supprimer le profil « {self.profile.name} » ?",
+        ):
+            return
+        delete_profile(self.profile.name)
+        self.status_var.set(f"Profil « {self.profile.name} » supprimé.")
+        self.profile = None
+        self.profile_var.set("")
+        self.time_slot_labels = list(TIME_SLOT_LABELS)
+
     def _parse_int(self, value_str: str, field_name: str):
         value_str = value_str.strip()
         if not value_str:
@@ -701,97 +1959,304 @@ class PlanningApp(tk.Tk):
             raise ValueError(f"Le champ '{field_name}' doit être > 0.")
         return value
 
+    def _read_params(self):
+        min_group = self._parse_int(
+            self.min_group_var.get(), "Min. élèves par groupe/créneau"
+        )
+        max_group = self._parse_int(
+            self.max_group_var.get(), "Max. élèves par groupe/créneau"
+        )
+        max_groups_per_spe = self._parse_int(
+            self.max_groups_per_spe_var.get(), "Max. groupes par spécialité"
+        )
+        seed = None
+        if self.seed_var.get().strip():
+            seed = self._parse_int(self.seed_var.get(), "Graine de répartition")
+        if min_group > max_group:
+            raise ValueError(
+                "Le minimum par groupe/créneau doit être inférieur ou égal au maximum."
+            )
+        time_budget = None
+        if self.time_budget_var.get().strip():
+            try:
+                time_budget = float(self.time_budget_var.get().replace(",", "."))
+            except ValueError:
+                raise ValueError("Le champ 'Durée max. du calcul' doit être un nombre de secondes.")
+            if time_budget <= 0:
+                raise ValueError("Le champ 'Durée max. du calcul' doit être > 0.")
+        return min_group, max_group, max_groups_per_spe, seed, time_budget
+
     def run_planning(self):
         # 1. Vérif fichier
         input_path = self.input_path.get().strip()
         if not input_path:
             messagebox.showwarning(
                 "Fichier manquant",
-                "Veuillez sélectionner un fichier CSV d'élèves.",
+                "Veuillez sélectionner un fichier d'élèves (CSV, Excel ou JSON).",
             )
             return
 
         # 2. Lecture des paramètres
         try:
-            min_group = self._parse_int(
-                self.min_group_var.get(), "Min. élèves par groupe/créneau"
-            )
-            max_group = self._parse_int(
-                self.max_group_var.get(), "Max. élèves par groupe/créneau"
-            )
-            max_groups_per_spe = self._parse_int(
-                self.max_groups_per_spe_var.get(), "Max. groupes par spécialité"
-            )
+            min_group, max_group, max_groups_per_spe, seed, time_budget = self._read_params()
+            strategy = self._selected_strategy()
+            # la durée max. ne sert qu'aux stratégies qui l'acceptent
+            strategy_params = strategy.params_from_options({"time_budget": time_budget})
         except ValueError as e:
             messagebox.showerror("Paramètre invalide", str(e))
             return
 
-        if min_group > max_group:
-            messagebox.showerror(
-                "Paramètres incohérents",
-                "Le minimum par groupe/créneau doit être inférieur ou égal au maximum.",
-            )
+        # 3. Contrôle du fichier (doublons, vœux répétés, spécialités mal orthographiées)
+        corrections = self._check_input(input_path)
+        if corrections is False:
             return
 
-        self.status_var.set("Chargement des élèves...")
-        self.update_idletasks()
+        # 4. Chargement, calcul des groupes par spé et répartition
+        from utils.manifest import run_planning
 
-        # 3. Charger les élèves
-        try:
-            students = load_students_from_csv(input_path)
-        except Exception as e:
-            messagebox.showerror("Erreur de lecture", str(e))
-            self.status_var.set("Erreur de lecture du fichier.")
-            return
+        time_slots = get_time_slots(self.time_slot_labels)
+        anytime = strategy.name == "anytime"
 
-        if not students:
-            messagebox.showerror(
-                "Aucun élève",
-                "Le fichier ne contient aucun élève.",
+        if self.profile is not None:
+            # paramètres saisis gardés dans le profil ; groupes par spé
+            # repris du profil si le fichier n'a pas changé
+            self._update_profile(
+                self.profile, min_group, max_group, max_groups_per_spe, seed, time_budget
             )
-            self.status_var.set("Aucun élève.")
-            return
-
-        # 4. Calcul des groupes par spé
-        from utils.utils import compute_groups_per_specialty  # si pas déjà importé en haut
 
-        self.status_var.set("Calcul des groupes par spécialité...")
-        self.update_idletasks()
+        # lu ici : plan() peut tourner hors du thread de Tk
+        rebalance = self.rebalance_var.get()
 
-        try:
-            groups_per_spe = compute_groups_per_specialty(
-                students,
-                TIME_SLOTS,
+        def plan(on_step, on_snapshot=None, cancel_event=None):
+            if self.profile is not None:
+                from utils.profiles import run_profile
+                return run_profile(
+                    self.profile, input_path, on_step=on_step,
+                    on_snapshot=on_snapshot, cancel_event=cancel_event,
+                    corrections=corrections,
+                )
+            return run_planning(
+                input_path,
+                time_slots,
                 min_group,
                 max_group,
                 max_groups_per_spe,
+                seed=seed,
+                on_step=on_step,
+                strategy=strategy.name,
+                strategy_params=strategy_params,
+                rebalance=rebalance,
+                on_snapshot=on_snapshot,
+                cancel_event=cancel_event,
+                corrections=corrections,
             )
+
+        limits = (time_slots, min_group, max_group, max_groups_per_spe)
+        if anytime:
+            self._start_improving(plan, limits)
+            return
+
+        def on_step(message):
+            self.status_var.set(message)
+            self.update_idletasks()
+
+        try:
+            result = plan(on_step)
         except Exception as e:
-            messagebox.showerror("Erreur de calcul des groupes", str(e))
-            self.status_var.set("Erreur lors du calcul des groupes.")
+            self._planning_failed(e)
             return
+        self.status_var.set("Terminé.")
+        self._show_results(result, limits)
+
+    def _planning_failed(self, error):
+        messagebox.showerror("Erreur", f"{self.status_var.get()}\n\n{error}")
+        self.status_var.set("Erreur : " + self.status_var.get())
+
+    def _show_results(self, result, limits):
+        students, planner, manifest = result
+        time_slots, min_group, max_group, max_groups_per_spe = limits
+        ResultsWindow(
+            self, students, planner, time_slots, min_group, max_group, max_groups_per_spe,
+            manifest=manifest,
+        )
 
-        # 5. Répartition
-        self.status_var.set("Répartition des élèves...")
-        self.update_idletasks()
+    def _check_input(self, input_path):
+        """
+        Contrôle le fichier d'élèves avant la répartition. Retourne les
+        corrections à appliquer (None : aucune) ou False si l'utilisateur
+        annule.
+        """
+        from utils.validation import validate_file
 
+        self.status_var.set("Contrôle du fichier d'élèves...")
+        self.update_idletasks()
+        known = self.profile.known_specialties() if self.profile is not None else None
         try:
-            planner = Planner(
-                time_slots=TIME_SLOTS,
-                groups_per_specialty=groups_per_spe,
-                max_per_group=max_group,
-            )
-            planner.plan(students)
+            report = validate_file(input_path, known_specialties=known)
         except Exception as e:
-            messagebox.showerror("Erreur de répartition", str(e))
-            self.status_var.set("Erreur lors de la répartition.")
+            messagebox.showerror("Erreur", f"Lecture du fichier impossible :\n\n{e}")
+            self.status_var.set("Erreur : lecture du fichier d'élèves.")
+            return False
+        if not report.has_issues:
+            return None
+
+        window = CorrectionsWindow(self, report)
+        self.wait_window(window)
+        if window.result is False:
+            self.status_var.set("Répartition annulée.")
+        return window.result
+
+    # --- Amélioration continue ----------------------------------------
+
+    def _start_improving(self, plan, limits):
+        """
+        Amélioration continue dans un thread : la fenêtre reste utilisable
+        (Arrêter, Enregistrer le meilleur...) pendant tout le calcul.
+        """
+        import queue
+        import threading
+
+        self._cancel_event = threading.Event()
+        self._snapshot = None
+        self._run_params = (limits[0], limits[2])
+        self._improve_queue = queue.Queue()
+        self.generate_button.configure(state="disabled")
+        self.stop_button.configure(state="normal")
+        self.snapshot_button.configure(state="normal")
+
+        def on_snapshot(snapshot):
+            # simple affectation : lue par save_snapshot
+            self._snapshot = snapshot
+
+        def run():
+            try:
+                result = plan(
+                    lambda message: self._improve_queue.put(("step", message)),
+                    on_snapshot=on_snapshot,
+                    cancel_event=self._cancel_event,
+                )
+                self._improve_queue.put(("done", result))
+            except Exception as e:
+                self._improve_queue.put(("error", e))
+
+        # Tk n'est utilisé que depuis ce thread : le calcul passe par la file
+        threading.Thread(target=run, daemon=True).start()
+        self.after(100, self._poll_improving, limits)
+
+    def _poll_improving(self, limits):
+        while not self._improve_queue.empty():
+            kind, value = self._improve_queue.get()
+            if kind == "step":
+                self.status_var.set(value)
+                continue
+
+            self._cancel_event = None
+            self.generate_button.configure(state="normal")
+            self.stop_button.configure(state="disabled")
+            self.snapshot_button.configure(state="disabled")
+            if kind == "error":
+                self._planning_failed(value)
+                return
+            if self._snapshot is not None:
+                self.status_var.set(f"Terminé. Meilleur planning — {self._snapshot.summary()}")
+            else:
+                self.status_var.set("Terminé.")
+            self._show_results(value, limits)
+            return
+        self.after(100, self._poll_improving, limits)
+
+    def stop_improving(self):
+        """Arrêter l'amélioration : le meilleur planning trouvé est gardé."""
+        if self._cancel_event is not None:
+            self._cancel_event.set()
+            self.status_var.set("Arrêt demandé, fin de l'étape en cours...")
+
+    def save_snapshot(self):
+        """Enregistrer le planning par élève du meilleur planning publié (calcul en cours)"""
+        from utils.formats import OUTPUT_FILETYPES, export_planning_per_student
+
+        snapshot = self._snapshot
+        if snapshot is None:
+            messagebox.showinfo(
+                "Amélioration en cours",
+                "Aucun planning n'est encore disponible.",
+                parent=self,
+            )
             return
 
-        # 6. Ouvrir la fenêtre de résultats
-        self.status_var.set("Terminé.")
-        ResultsWindow(self, students, planner, TIME_SLOTS, min_group, max_group, max_groups_per_spe)
+        file_path = filedialog.asksaveasfilename(
+            parent=self,
+            title="Enregistrer le meilleur planning actuel (par élève)",
+            defaultextension=".csv",
+            filetypes=OUTPUT_FILETYPES,
+        )
+        if file_path:
+            time_slots, max_group = self._run_params
+            try:
+                students, _ = snapshot.materialize(time_slots, max_group)
+                export_planning_per_student(file_path, students, time_slots)
+                messagebox.showinfo(
+                    "Succès",
+                    f"Planning enregistré ({snapshot.summary()}).",
+                    parent=self,
+                )
+            except Exception as e:
+                messagebox.showerror(
+                    "Erreur",
+                    f"Erreur lors de l'enregistrement :\n{str(e)}",
+                    parent=self,
+                )
+
+
+def report_startup_time(app):
+    """
+    Mode --startup-time : mesure le délai jusqu'à l'affichage de la première
+    fenêtre, puis le coût (incrémental) de chaque import différé, et quitte.
+
+    Le temps de démarrage de l'interpréteur lui-même (et l'extraction du
+    bundle PyInstaller) n'est pas inclus.
+    """
+    import importlib
+
+    app.update()
+    first_window = time.perf_counter() - _STARTUP_T0
+
+    lines = [
+        f"Imports au démarrage (tkinter) : {(_IMPORTS_DONE - _STARTUP_T0) * 1000:7.1f} ms",
+        f"Première fenêtre affichée      : {first_window * 1000:7.1f} ms",
+        "",
+        "Imports différés (coût à la première utilisation) :",
+    ]
+    for name in LAZY_MODULES:
+        if name in sys.modules:
+            lines.append(f"  {name:<22} déjà chargé au démarrage !")
+            continue
+        t0 = time.perf_counter()
+        try:
+            importlib.import_module(name)
+        except ImportError:
+            lines.append(f"  {name:<22} non installé")
+            continue
+        lines.append(f"  {name:<22} {(time.perf_counter() - t0) * 1000:7.1f} ms")
+
+    report = "\n".join(lines)
+    if sys.stdout is not None:
+        print(report)
+    else:
+        # exécutable sans console : rapport écrit dans le dossier courant
+        with open("startup-time.txt", "w", encoding="utf-8") as f:
+            f.write(report + "\n")
+    app.destroy()
 
 
 if __name__ == "__main__":
+    # exécutable PyInstaller : les processus de l'export PDF (et de la
+    # répartition parallèle) relancent l'exécutable, qui doit alors
+    # exécuter leur tâche au lieu d'ouvrir une nouvelle fenêtre
+    import multiprocessing
+    multiprocessing.freeze_support()
+
     app = PlanningApp()
+    if "--startup-time" in sys.argv[1:]:
+        app.after_idle(report_startup_time, app)
     app.mainloop()
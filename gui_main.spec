@@ -1,5 +1,14 @@
 # -*- mode: python ; coding: utf-8 -*-
 
+# Modules jamais utilisés par l'application : exclus pour alléger le bundle.
+# (openpyxl reste inclus s'il est installé : il sert à l'import/export Excel.)
+EXCLUDES = [
+    'unittest', 'doctest', 'pydoc', 'pdb', 'test', 'lib2to3', 'idlelib',
+    'turtle', 'turtledemo', 'tkinter.test', 'distutils', 'setuptools',
+    'pkg_resources', 'pytest', 'IPython',
+    'numpy', 'pandas', 'matplotlib', 'scipy', 'PIL',
+]
+
 
 a = Analysis(
     ['gui_main.py'],
@@ -10,25 +19,26 @@ a = Analysis(
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
-    excludes=[],
+    excludes=EXCLUDES,
     noarchive=False,
     optimize=0,
 )
 pyz = PYZ(a.pure)
 
+# Mode "dossier" (onedir) : contrairement au mode fichier unique, rien n'est
+# décompressé dans un dossier temporaire à chaque lancement, ce qui supprime
+# l'essentiel du temps de démarrage à froid. UPX est désactivé pour la même
+# raison (les DLL compressées doivent être décompressées au chargement).
 exe = EXE(
     pyz,
     a.scripts,
-    a.binaries,
-    a.datas,
     [],
+    exclude_binaries=True,
     name='gui_main',
     debug=False,
     bootloader_ignore_signals=False,
     strip=False,
-    upx=True,
-    upx_exclude=[],
-    runtime_tmpdir=None,
+    upx=False,
     console=False,
     disable_windowed_traceback=False,
     argv_emulation=False,
@@ -36,3 +46,13 @@ exe = EXE(
     codesign_identity=None,
     entitlements_file=None,
 )
+
+coll = COLLECT(
+    exe,
+    a.binaries,
+    a.datas,
+    strip=False,
+    upx=False,
+    upx_exclude=[],
+    name='gui_main',
+)
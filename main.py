@@ -1,30 +1,80 @@
 # main.py
+import argparse
+import multiprocessing
+from typing import Optional
+
 from classes.models import TimeSlot
-from classes.planner import Planner
-from utils.utils import (
-    load_students_from_csv,
-    save_planning_per_student,
-    save_planning_per_group_formatted,
-    compute_groups_per_specialty,
+from utils.formats import (
+    detect_mapping,
+    export_planning_per_student,
+    export_planning_matrices,
+    export_planning_per_group,
+    export_planning_per_group_by_specialty,
+    export_unplaced_students,
+    load_students,
+)
+from utils.utils import iter_coded_planning_matrices
+from classes.rotation import rotation_summary, save_history
+from classes.strategies import STRATEGIES, get_strategy, strategy_names
+from classes.triage import triage
+from utils.stats import compute_stats, export_stats
+from utils.manifest import (
+    run_planning,
+    run_streaming_planning,
+    read_students,
+    replay_manifest,
+    load_manifest,
+    save_manifest,
+    diff_plans,
+)
+from utils.profiles import (
+    DEFAULT_TIME_SLOTS,
+    DEFAULT_MIN_PER_GROUP,
+    DEFAULT_MAX_PER_GROUP,
+    DEFAULT_MAX_GROUPS_PER_SPECIALTY,
+    Profile,
+    load_profile,
+    list_profiles,
+    run_profile,
+    save_profile,
 )
+from utils.validation import validate_file
 
 # --- Configuration métier ---
 
-TIME_SLOTS = [
-    TimeSlot(0, "09:00-09:25"),
-    TimeSlot(1, "09:30-09:55"),
-    TimeSlot(2, "10:05-10:30"),
-    TimeSlot(3, "10:35-11:00"),
-    TimeSlot(4, "11:00-11:25"),
-]
+# créneaux et limites par défaut : communs avec les profils et le service
+# (voir utils.profiles)
+TIME_SLOTS = [TimeSlot(index, label) for index, label in DEFAULT_TIME_SLOTS]
+DEFAULT_LIMITS = (DEFAULT_MIN_PER_GROUP, DEFAULT_MAX_PER_GROUP, DEFAULT_MAX_GROUPS_PER_SPECIALTY)
 
 
-def main() -> None:
-    input_path = input("Chemin du fichier CSV d'entrée : ").strip()
+def main(
+    stream: bool = False,
+    workers: Optional[int] = None,
+    history_path: Optional[str] = None,
+    profile_name: Optional[str] = None,
+    time_budget: Optional[float] = None,
+    strategy_name: Optional[str] = None,
+    starts: Optional[int] = None,
+    priorities_path: Optional[str] = None,
+) -> None:
+    # réglages communs, transmis aux stratégies qui les acceptent
+    options = {
+        "history_path": history_path,
+        "time_budget": time_budget,
+        "workers": workers,
+        "starts": starts,
+        "priorities_path": priorities_path,
+    }
+    if strategy_name is not None:
+        # lève ValueError avant toute question si un réglage requis manque
+        get_strategy(strategy_name).params_from_options(options)
+
+    input_path = input("Chemin du fichier d'entrée (.csv, .xlsx, .json, .ndjson) : ").strip()
     if not input_path:
         print("Aucun fichier fourni, arrêt.")
         return
-    
+
     def ask_int(prompt: str, default: int) -> int:
         while True:
             val = input(f"{prompt} (défaut={default}) : ").strip()
@@ -38,51 +88,455 @@ def main() -> None:
             except ValueError:
                 print("Valeur invalide, entrez un entier.")
 
-    MAX_GROUPS_PER_SPECIALTY = ask_int("Nombre max de groupes par spécialité", 6)
-    MIN_STUDENTS_PER_GROUP = ask_int("Nombre min d'élèves par groupe", 5)
-    MAX_STUDENTS_PER_GROUP = ask_int("Nombre max d'élèves par groupe", 8)
+    def ask_optional_int(prompt: str):
+        while True:
+            val = input(f"{prompt} (vide = aucune) : ").strip()
+            if val == "":
+                return None
+            try:
+                return int(val)
+            except ValueError:
+                print("Valeur invalide, entrez un entier.")
 
-    print("Chargement des élèves...")
-    students = load_students_from_csv(input_path)
-    print(f"{len(students)} élèves chargés.")
+    def ask_yes_no(prompt: str) -> bool:
+        return input(f"{prompt} (o/N) : ").strip().lower() in ("o", "oui", "y", "yes")
 
-    groups_per_spe = compute_groups_per_specialty(
-        students,
-        TIME_SLOTS,
-        MIN_STUDENTS_PER_GROUP,
-        MAX_STUDENTS_PER_GROUP,
-        MAX_GROUPS_PER_SPECIALTY,
+    # profil existant : ses paramètres remplacent les questions
+    profile = None
+    if profile_name is not None and profile_name in list_profiles():
+        profile = load_profile(profile_name)
+        print(f"Profil « {profile.name} » chargé.")
+        if strategy_name is not None:
+            profile.strategy = strategy_name
+            profile.strategy_params = get_strategy(strategy_name).params_from_options(options)
+        elif history_path is not None:
+            profile.strategy, profile.strategy_params = "rotation", {"history_path": history_path}
+        elif priorities_path is not None:
+            profile.strategy, profile.strategy_params = "priority", {"priorities_path": priorities_path}
+        elif time_budget is not None:
+            profile.strategy, profile.strategy_params = "anytime", {"time_budget": time_budget}
+    time_slots = profile.get_time_slots() if profile is not None else TIME_SLOTS
+
+    # contrôle du fichier avant la répartition (spé rapprochées du registre du profil)
+    report = validate_file(
+        input_path,
+        known_specialties=profile.known_specialties() if profile is not None else None,
     )
+    print(report.summary())
+    corrections = None
+    if report.has_issues:
+        # chaque correction est acceptée ou refusée séparément
+        skip = bool(report.skipped_rows) and ask_yes_no(
+            f"Écarter les {len(report.skipped_rows)} doublon(s) (la première ligne est gardée) ?"
+        )
+        accepted = [
+            spelling for spelling in sorted(report.aliases)
+            if ask_yes_no("Corriger : " + report.alias_label(spelling) + " ?")
+        ]
+        if skip or accepted:
+            corrections = report.corrections(accepted, skip_duplicates=skip)
+
+    if profile is not None:
+        MAX_GROUPS_PER_SPECIALTY = profile.max_groups_per_spe
+        MIN_STUDENTS_PER_GROUP = profile.min_per_group
+        MAX_STUDENTS_PER_GROUP = profile.max_per_group
+    else:
+        MAX_GROUPS_PER_SPECIALTY = ask_int(
+            "Nombre max de groupes par spécialité", DEFAULT_MAX_GROUPS_PER_SPECIALTY
+        )
+        MIN_STUDENTS_PER_GROUP = ask_int("Nombre min d'élèves par groupe", DEFAULT_MIN_PER_GROUP)
+        MAX_STUDENTS_PER_GROUP = ask_int("Nombre max d'élèves par groupe", DEFAULT_MAX_PER_GROUP)
+
+    if stream:
+        # mode flux : ni graine, ni réallocation, ni équilibrage (voir StreamingPlanner)
+        students = None
+        planner, manifest = run_streaming_planning(
+            input_path,
+            time_slots,
+            MIN_STUDENTS_PER_GROUP,
+            MAX_STUDENTS_PER_GROUP,
+            MAX_GROUPS_PER_SPECIALTY,
+            on_step=print,
+            corrections=corrections,
+        )
+    elif profile is not None:
+        # groupes par spé repris du profil si le fichier n'a pas changé
+        students, planner, manifest = run_profile(
+            profile, input_path, on_step=print, corrections=corrections
+        )
+    else:
+        SEED = ask_optional_int("Graine de répartition (ordre reproductible)")
+        JOINT = (
+            strategy_name is None and history_path is None and priorities_path is None
+            and time_budget is None
+        ) and ask_yes_no(
+            "Réallouer les groupes entre spécialités selon les élèves non placés ?"
+        )
+        REBALANCE = ask_yes_no("Compléter ou fusionner les groupes sous le minimum d'élèves ?")
+
+        if strategy_name is not None:
+            strategy = strategy_name
+        elif history_path is not None:
+            # séance suivante : rotation des créneaux / groupes d'après l'historique
+            strategy = "rotation"
+        elif priorities_path is not None:
+            # niveaux de priorité, places réservées et listes d'attente
+            strategy = "priority"
+        elif JOINT:
+            strategy = "joint"
+        elif time_budget is not None:
+            # amélioration continue ; Ctrl+C l'arrête en gardant le meilleur planning
+            strategy = "anytime"
+        elif workers is not None:
+            strategy = "sharded"
+        else:
+            strategy = "greedy"
+        strategy_params = get_strategy(strategy).params_from_options(options)
+
+        students, planner, manifest = run_planning(
+            input_path,
+            time_slots,
+            MIN_STUDENTS_PER_GROUP,
+            MAX_STUDENTS_PER_GROUP,
+            MAX_GROUPS_PER_SPECIALTY,
+            seed=SEED,
+            on_step=print,
+            strategy=strategy,
+            strategy_params=strategy_params,
+            rebalance=REBALANCE,
+            corrections=corrections,
+        )
+
+        if profile_name is not None:
+            # nouveau profil : ces réponses, et les artefacts de cette exécution
+            profile = Profile(
+                name=profile_name,
+                time_slots=manifest.time_slots,
+                min_per_group=MIN_STUDENTS_PER_GROUP,
+                max_per_group=MAX_STUDENTS_PER_GROUP,
+                max_groups_per_spe=MAX_GROUPS_PER_SPECIALTY,
+                strategy=strategy,
+                strategy_params=strategy_params,
+                rebalance=REBALANCE,
+                seed=SEED,
+                mapping=detect_mapping(input_path),
+            )
+            profile.update_artefacts(manifest, students)
+            print(f"Profil « {profile_name} » enregistré dans {save_profile(profile)}")
+    print(f"{manifest.num_students} élèves chargés.")
 
     print("Groupes par spécialité :")
-    for spe, g in groups_per_spe.items():
+    for spe, g in planner.groups_per_specialty.items():
         print(f"  - {spe}: {g} groupe(s)")
 
-    planner = Planner(
-        time_slots=TIME_SLOTS,
-        groups_per_specialty=groups_per_spe,
-        max_per_group=MAX_STUDENTS_PER_GROUP,
-    )
-
-    print("Répartition en cours...")
-    planner.plan(students)
     print("Répartition terminée.")
+    if planner.rebalance_report is not None:
+        print(planner.rebalance_report.summary())
 
-    out_students = input("Chemin de sortie pour le planning PAR ÉLÈVE (.csv) : ").strip()
+    if manifest.strategy == "rotation" and planner.history_path:
+        history_path = planner.history_path
+        history = planner.history
+        print(f"Séance {history.num_rounds + 1} : {rotation_summary(history, students).summary()}")
+        history.record(planner, students)
+        save_history(history_path, history)
+        print(f"Historique des séances enregistré dans {history_path}")
+
+    if manifest.strategy == "priority":
+        print("Listes d'attente :")
+        print(planner.waitlist_summary())
+
+    if planner.unplaced_students:
+        report = triage(planner, MAX_GROUPS_PER_SPECIALTY)
+        print(f"{report.num_unplaced} élève(s) non placé(s). Remèdes simulés :")
+        for remedy in report.remedies[:5]:
+            print(f"  - {remedy.label} : +{remedy.unblocked} élève(s) placé(s)")
+
+    out_students = input("Chemin de sortie pour le planning PAR ÉLÈVE (.csv, .xlsx, .json, .ndjson) : ").strip()
     if out_students:
-        save_planning_per_student(out_students, students, TIME_SLOTS)
+        if stream:
+            # relecture des noms dans le fichier d'entrée, cases depuis les codes compacts
+            matrices = iter_coded_planning_matrices(
+                planner.iter_coded_students(read_students(input_path, manifest)),
+                planner.cells,
+                len(time_slots),
+            )
+            export_planning_matrices(out_students, matrices, time_slots, planner.num_students)
+        else:
+            export_planning_per_student(out_students, students, time_slots)
         print(f"Planning par élève enregistré dans {out_students}")
 
-    out_groups = input("Chemin de sortie pour le planning PAR GROUPE (.csv) : ").strip()
+    out_groups = input("Chemin de sortie pour le planning PAR GROUPE (.csv, .xlsx, .json, .ndjson) : ").strip()
     if out_groups:
-        save_planning_per_group_formatted(
-            out_groups,
-            planner.group_records,
-            TIME_SLOTS,
-        )
+        if stream:
+            export_planning_per_group_by_specialty(
+                out_groups,
+                planner.iter_group_records_by_specialty(),
+                time_slots,
+            )
+        else:
+            export_planning_per_group(
+                out_groups,
+                planner.group_records,
+                time_slots,
+            )
         print(f"Planning par groupe enregistré dans {out_groups}")
 
+    if stream and manifest.num_unplaced:
+        out_unplaced = input("Chemin de sortie pour les élèves NON PLACÉS (.csv, .xlsx, .json, .ndjson) : ").strip()
+        if out_unplaced:
+            export_unplaced_students(out_unplaced, planner.iter_unplaced())
+            print(f"Élèves non placés enregistrés dans {out_unplaced}")
+
+    out_stats = input("Chemin de sortie pour les statistiques (.csv, .json) : ").strip()
+    if out_stats:
+        if stream:
+            students = planner.iter_planned_students(read_students(input_path, manifest))
+        export_stats(out_stats, compute_stats(students, planner))
+        print(f"Statistiques enregistrées dans {out_stats}")
+
+    out_manifest = input("Chemin de sortie pour le manifeste d'exécution (.json) : ").strip()
+    if out_manifest:
+        save_manifest(out_manifest, manifest)
+        print(f"Manifeste enregistré dans {out_manifest}")
+
+    planner.cleanup()
     print("Terminé.")
 
+
+def check_main(input_path: str, max_issues: int = 20) -> None:
+    """Contrôle un fichier d'élèves (doublons, vœux répétés, spécialités) sans le répartir."""
+    report = validate_file(input_path)
+    print(report.summary())
+    for issue in report.issues[:max_issues]:
+        print(f"  élève n°{issue.row} [{issue.kind}] {issue.name} ({issue.classe}) : {issue.detail}")
+    hidden = sum(report.issue_counts.values()) - min(len(report.issues), max_issues)
+    if hidden > 0:
+        print(f"  ... et {hidden} autre(s) anomalie(s).")
+
+
+def benchmark_main(
+    input_path: str,
+    strategies: Optional[str] = None,
+    output_path: Optional[str] = None,
+    profile_name: Optional[str] = None,
+    **options,
+) -> None:
+    """Compare les stratégies sur un fichier (paramètres du profil ou par défaut)."""
+    from utils.benchmark import benchmark_strategies, print_benchmark, export_benchmark
+
+    if profile_name is not None:
+        profile = load_profile(profile_name)
+        time_slots = profile.get_time_slots()
+        limits = (profile.min_per_group, profile.max_per_group, profile.max_groups_per_spe)
+        seed = profile.seed
+    else:
+        time_slots, limits, seed = TIME_SLOTS, DEFAULT_LIMITS, None
+
+    rows = benchmark_strategies(
+        input_path,
+        time_slots,
+        *limits,
+        strategies=strategies.split(",") if strategies else None,
+        seed=seed,
+        options=options,
+        on_step=print,
+    )
+    print_benchmark(rows)
+    if output_path:
+        export_benchmark(output_path, rows)
+        print(f"Comparatif enregistré dans {output_path}")
+
+
+def forecast_main(
+    input_path: str,
+    expected: int,
+    simulations: Optional[int] = None,
+    workers: Optional[int] = None,
+    output_path: Optional[str] = None,
+    profile_name: Optional[str] = None,
+) -> None:
+    """Prévoit les groupes nécessaires d'après les réponses déjà reçues."""
+    from utils.forecast import DEFAULT_SIMULATIONS, forecast_demand, export_forecast
+
+    if profile_name is not None:
+        profile = load_profile(profile_name)
+        time_slots = profile.get_time_slots()
+        limits = (profile.min_per_group, profile.max_per_group, profile.max_groups_per_spe)
+        seed = profile.seed or 0
+    else:
+        time_slots, limits, seed = TIME_SLOTS, DEFAULT_LIMITS, 0
+    print(
+        f"Groupes de {limits[0]} à {limits[1]} élèves par créneau, "
+        f"plafond de {limits[2]} groupes par spé"
+        + (f" (profil « {profile_name} »)." if profile_name is not None else " (valeurs par défaut).")
+    )
+
+    forecast = forecast_demand(
+        load_students(input_path),
+        expected,
+        time_slots,
+        *limits,
+        simulations=simulations or DEFAULT_SIMULATIONS,
+        seed=seed,
+        workers=workers,
+        on_step=print,
+    )
+    print(forecast.summary())
+    if output_path:
+        export_forecast(output_path, forecast)
+        print(f"Prévision enregistrée dans {output_path}")
+
+
+def replay_main(manifest_path: str) -> None:
+    """Rejoue une exécution à partir de son manifeste."""
+    manifest = load_manifest(manifest_path)
+    students, planner, replayed = replay_manifest(manifest)
+    planner.cleanup()
+    print(
+        f"Rejeu identique : {replayed.num_students} élèves, "
+        f"{replayed.num_unplaced} non placé(s), "
+        f"répartition en {replayed.durations['plan']:.3f} s."
+    )
+
+
+def diff_main(manifest_a: str, manifest_b: str) -> None:
+    """Rejoue deux manifestes et affiche les élèves dont l'affectation diffère."""
+    students_a, planner_a, _ = replay_manifest(load_manifest(manifest_a))
+    students_b, planner_b, replayed_b = replay_manifest(load_manifest(manifest_b))
+    labels = dict(replayed_b.time_slots)
+
+    diffs = diff_plans(students_a, students_b)
+    for d in diffs:
+        slots = sorted(set(d.before) | set(d.after))
+        changes = ", ".join(
+            f"{labels.get(s, s)}: "
+            f"{d.before.get(s, '-')} -> {d.after.get(s, '-')}"
+            for s in slots
+            if d.before.get(s) != d.after.get(s)
+        )
+        print(f"[{d.status}] {d.name} ({d.classe}) {changes}")
+    print(f"{len(diffs)} élève(s) avec une affectation différente.")
+    planner_a.cleanup()
+    planner_b.cleanup()
+
+
 if __name__ == "__main__":
-    main()
+    # processus de l'export PDF et de --workers, si le script est empaqueté
+    multiprocessing.freeze_support()
+
+    parser = argparse.ArgumentParser(description="Planification des spécialités (CLI)")
+    parser.add_argument("--replay", metavar="MANIFESTE", help="rejouer une exécution enregistrée")
+    parser.add_argument(
+        "--diff", nargs=2, metavar=("MANIFESTE_A", "MANIFESTE_B"),
+        help="comparer les plannings de deux exécutions",
+    )
+    parser.add_argument(
+        "--check", metavar="FICHIER",
+        help="contrôler un fichier d'élèves (doublons, vœux répétés, spécialités mal "
+             "orthographiées) sans le répartir",
+    )
+    parser.add_argument(
+        "--stream", action="store_true",
+        help="mode flux pour les très gros fichiers (mémoire bornée, sans graine ni réallocation)",
+    )
+    parser.add_argument(
+        "--workers", type=int, metavar="N",
+        help="répartir en parallèle (N processus) les groupes de spécialités indépendants",
+    )
+    parser.add_argument(
+        "--history", metavar="HISTORIQUE",
+        help="planifier la séance suivante (rotation des créneaux, groupes et camarades) "
+             "d'après ce fichier d'historique, puis l'y ajouter",
+    )
+    parser.add_argument(
+        "--profile", metavar="NOM",
+        help="utiliser les paramètres de ce profil (ou l'enregistrer avec les réponses "
+             "données s'il n'existe pas encore)",
+    )
+    parser.add_argument(
+        "--time-budget", type=float, metavar="SECONDES",
+        help="améliorer le planning glouton pendant SECONDES secondes (réparations, "
+             "réordonnancements, équilibrage) ; Ctrl+C arrête en gardant le meilleur",
+    )
+    parser.add_argument(
+        "--strategy", choices=list(STRATEGIES), metavar="NOM",
+        help="stratégie de répartition : " + ", ".join(
+            f"{s.name} ({s.description})" for s in STRATEGIES.values()
+        ),
+    )
+    parser.add_argument(
+        "--starts", type=int, metavar="N",
+        help="nombre de passes de la stratégie multistart (défaut 8)",
+    )
+    parser.add_argument(
+        "--priorities", metavar="FICHIER",
+        help="niveaux de priorité (.json) : élèves prioritaires, places réservées par "
+             "groupe, listes d'attente promues dès qu'une place se libère",
+    )
+    parser.add_argument(
+        "--benchmark", metavar="FICHIER",
+        help="comparer les stratégies sur ce fichier (durée, placés, équilibre, vœux)",
+    )
+    parser.add_argument(
+        "--strategies", metavar="NOM,NOM",
+        help="stratégies comparées avec --benchmark (défaut : " + ",".join(strategy_names(interactive=True)) + ")",
+    )
+    parser.add_argument(
+        "--forecast", metavar="FICHIER",
+        help="prévoir, pendant la collecte, les groupes nécessaires d'après les réponses "
+             "déjà reçues dans ce fichier (simulations Monte-Carlo, avec --expected)",
+    )
+    parser.add_argument(
+        "--expected", type=int, metavar="N",
+        help="nombre total d'élèves attendus à la fin de la collecte (avec --forecast)",
+    )
+    parser.add_argument(
+        "--simulations", type=int, metavar="N",
+        help="nombre de simulations de la prévision (défaut 200)",
+    )
+    parser.add_argument(
+        "--output", metavar="FICHIER",
+        help="enregistrer le comparatif ou la prévision (.csv ou .json)",
+    )
+    args = parser.parse_args()
+
+    if args.replay:
+        replay_main(args.replay)
+    elif args.diff:
+        diff_main(*args.diff)
+    elif args.check:
+        check_main(args.check)
+    elif args.forecast:
+        if args.expected is None:
+            parser.error("--forecast demande --expected (nombre total d'élèves attendus)")
+        forecast_main(
+            args.forecast,
+            args.expected,
+            simulations=args.simulations,
+            workers=args.workers,
+            output_path=args.output,
+            profile_name=args.profile,
+        )
+    elif args.benchmark:
+        benchmark_main(
+            args.benchmark,
+            strategies=args.strategies,
+            output_path=args.output,
+            profile_name=args.profile,
+            history_path=args.history,
+            time_budget=args.time_budget,
+            workers=args.workers,
+            starts=args.starts,
+            priorities_path=args.priorities,
+        )
+    else:
+        main(
+            stream=args.stream,
+            workers=args.workers,
+            history_path=args.history,
+            profile_name=args.profile,
+            time_budget=args.time_budget,
+            strategy_name=args.strategy,
+            starts=args.starts,
+            priorities_path=args.priorities,
+        )
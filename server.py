@@ -0,0 +1,450 @@
+# server.py
+"""
+Service local de planification (API JSON) : un poste puissant fait les
+calculs, les autres postes n'envoient que leur fichier d'élèves.
+
+    python server.py --host 0.0.0.0 --port 8765 --workers 2
+
+Routes :
+- POST /jobs?min_per_group=5&max_per_group=8&max_groups_per_spe=6
+        [&seed=42][&strategy=joint|ordered|flow|...][&rebalance=1][&format=xlsx]
+        [&time_slots=09:00-09:25,09:30-09:55,...]
+  corps = contenu du fichier d'élèves, en-tête X-Filename (ex. eleves.csv)
+  pour en connaître le format. Répond {"job_id": ..., "status": ...}.
+- GET /jobs/<id>                    : état du travail et résumé
+- GET /jobs/<id>/result/<fichier>   : students, groups, unplaced ou manifest
+- GET /health
+
+Les travaux passent par une file asyncio et sont exécutés dans un pool de
+processus borné (--workers). Les résultats sont mis en cache d'après
+l'empreinte du fichier et les paramètres : une requête identique renvoie
+le même travail, sans recalcul.
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlsplit, parse_qs
+
+MAX_UPLOAD_BYTES = 50 * 1024 * 1024
+MAX_HEADER_LINES = 100
+DEFAULT_CACHE_SIZE = 32
+DEFAULT_MAX_PENDING = 64
+
+INPUT_EXTENSIONS = (".csv", ".xlsx", ".json", ".ndjson", ".jsonl")
+OUTPUT_FORMATS = ("csv", "xlsx", "json", "ndjson")
+RESULT_KINDS = ("students", "groups", "unplaced", "manifest")
+
+CONTENT_TYPES = {
+    ".csv": "text/csv; charset=utf-8",
+    ".xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    ".json": "application/json",
+    ".ndjson": "application/x-ndjson",
+}
+
+REASONS = {
+    200: "OK", 202: "Accepted", 400: "Bad Request", 404: "Not Found",
+    405: "Method Not Allowed", 409: "Conflict", 413: "Payload Too Large",
+    500: "Internal Server Error", 503: "Service Unavailable",
+}
+
+
+class HttpError(Exception):
+    def __init__(self, status: int, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+@dataclass
+class Job:
+    job_id: str
+    key: str
+    params: Dict[str, object]
+    workdir: str
+    input_path: str
+    status: str = "en attente"      # "en attente", "en cours", "terminé", "erreur"
+    error: str = ""
+    summary: Dict[str, object] = field(default_factory=dict)
+    outputs: Dict[str, str] = field(default_factory=dict)   # type -> chemin
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("terminé", "erreur")
+
+    def to_json(self) -> Dict[str, object]:
+        return {
+            "job_id": self.job_id,
+            "status": self.status,
+            "error": self.error,
+            "params": self.params,
+            "summary": self.summary,
+            "results": sorted(self.outputs),
+        }
+
+
+# --- Calcul (exécuté dans un processus du pool) ------------------------------
+
+def run_job(input_path: str, workdir: str, params: Dict[str, object]) -> Dict[str, object]:
+    """Planification + exports d'un travail ; retourne le résumé et les fichiers."""
+    from classes.models import TimeSlot
+    from utils.formats import (
+        export_planning_per_student,
+        export_planning_per_group,
+        export_unplaced_students,
+    )
+    from utils.manifest import run_planning, save_manifest
+
+    time_slots = [TimeSlot(i, label) for i, label in enumerate(params["time_slots"])]
+    students, planner, manifest = run_planning(
+        input_path,
+        time_slots,
+        params["min_per_group"],
+        params["max_per_group"],
+        params["max_groups_per_spe"],
+        seed=params["seed"],
+        strategy=params["strategy"],
+        rebalance=params["rebalance"],
+    )
+
+    ext = "." + params["format"]
+    outputs = {
+        "students": os.path.join(workdir, "planning_eleves" + ext),
+        "groups": os.path.join(workdir, "planning_groupes" + ext),
+        "manifest": os.path.join(workdir, "manifeste.json"),
+    }
+    export_planning_per_student(outputs["students"], students, time_slots)
+    export_planning_per_group(outputs["groups"], planner.group_records, time_slots)
+    if planner.unplaced_students:
+        outputs["unplaced"] = os.path.join(workdir, "non_places" + ext)
+        export_unplaced_students(outputs["unplaced"], planner.unplaced_students)
+    save_manifest(outputs["manifest"], manifest)
+
+    summary = {
+        "num_students": manifest.num_students,
+        "num_unplaced": manifest.num_unplaced,
+        "groups_per_specialty": planner.groups_per_specialty,
+        "durations": manifest.durations,
+        "plan_sha256": manifest.plan_sha256,
+    }
+    return {"summary": summary, "outputs": outputs}
+
+
+# --- Service ----------------------------------------------------------------
+
+def parse_job_params(query: Dict[str, list]) -> Dict[str, object]:
+    """Paramètres d'un travail, normalisés (ils servent aussi de clé de cache)."""
+    def get(name: str, default: Optional[str] = None) -> Optional[str]:
+        values = query.get(name)
+        return values[-1].strip() if values else default
+
+    def get_int(name: str, default: Optional[int], positive: bool = True) -> Optional[int]:
+        raw = get(name)
+        if raw is None or raw == "":
+            return default
+        try:
+            value = int(raw)
+        except ValueError:
+            raise HttpError(400, f"« {name} » doit être un entier.")
+        if positive and value <= 0:
+            raise HttpError(400, f"« {name} » doit être un entier positif.")
+        return value
+
+    # mêmes valeurs par défaut que main.py et les profils
+    from utils.profiles import (
+        DEFAULT_TIME_SLOTS,
+        DEFAULT_MIN_PER_GROUP,
+        DEFAULT_MAX_PER_GROUP,
+        DEFAULT_MAX_GROUPS_PER_SPECIALTY,
+    )
+
+    params: Dict[str, object] = {
+        "min_per_group": get_int("min_per_group", DEFAULT_MIN_PER_GROUP),
+        "max_per_group": get_int("max_per_group", DEFAULT_MAX_PER_GROUP),
+        "max_groups_per_spe": get_int("max_groups_per_spe", DEFAULT_MAX_GROUPS_PER_SPECIALTY),
+        "seed": get_int("seed", None, positive=False),
+        "strategy": get("strategy", "greedy"),
+        "rebalance": get("rebalance", "0").lower() in ("1", "true", "oui", "o", "yes"),
+        "format": get("format", "csv").lower().lstrip("."),
+    }
+    if params["min_per_group"] > params["max_per_group"]:
+        raise HttpError(400, "Le minimum par groupe doit être inférieur ou égal au maximum.")
+    from classes.strategies import strategy_names
+    if params["strategy"] not in strategy_names(interactive=True):
+        raise HttpError(400, f"Stratégie inconnue : {params['strategy']}")
+    if params["format"] not in OUTPUT_FORMATS:
+        raise HttpError(400, f"Format de sortie non pris en charge : {params['format']}")
+
+    slots = get("time_slots")
+    if slots:
+        params["time_slots"] = [label.strip() for label in slots.split(",") if label.strip()]
+    else:
+        params["time_slots"] = [label for _, label in DEFAULT_TIME_SLOTS]
+    return params
+
+
+class PlanningService:
+    """
+    File de travaux + pool de processus + cache des résultats.
+
+    Le cache garde les cache_size derniers travaux (LRU) ; un travail en
+    erreur n'est pas réutilisé, la requête suivante le relance.
+    """
+
+    def __init__(
+        self,
+        workdir: str,
+        workers: int = 2,
+        cache_size: int = DEFAULT_CACHE_SIZE,
+        max_pending: int = DEFAULT_MAX_PENDING,
+    ) -> None:
+        self.workdir = workdir
+        self.workers = workers
+        self.cache_size = cache_size
+        self.jobs: Dict[str, Job] = {}
+        self.cache: "OrderedDict[str, str]" = OrderedDict()   # clé -> job_id
+        self.queue: "asyncio.Queue[Job]" = asyncio.Queue(maxsize=max_pending)
+        self.executor = ProcessPoolExecutor(max_workers=workers)
+        self._tasks = []
+
+    def start(self) -> None:
+        for _ in range(self.workers):
+            self._tasks.append(asyncio.create_task(self._worker()))
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self.executor.shutdown(wait=False)
+
+    async def _worker(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            job = await self.queue.get()
+            job.status = "en cours"
+            try:
+                result = await loop.run_in_executor(
+                    self.executor, run_job, job.input_path, job.workdir, job.params
+                )
+            except Exception as e:
+                job.status = "erreur"
+                job.error = str(e) or type(e).__name__
+            else:
+                job.summary = result["summary"]
+                job.outputs = result["outputs"]
+                job.status = "terminé"
+            finally:
+                self.queue.task_done()
+
+    def _evict(self) -> None:
+        """Oublie les plus anciens travaux terminés au-delà de cache_size."""
+        for key, job_id in list(self.cache.items()):
+            if len(self.cache) <= self.cache_size:
+                break
+            job = self.jobs[job_id]
+            if not job.finished:
+                continue
+            del self.cache[key]
+            del self.jobs[job_id]
+            shutil.rmtree(job.workdir, ignore_errors=True)
+
+    def submit(self, filename: str, content: bytes, params: Dict[str, object]) -> Tuple[Job, bool]:
+        """Retourne (travail, True si trouvé dans le cache)."""
+        ext = os.path.splitext(filename)[1].lower()
+        if ext not in INPUT_EXTENSIONS:
+            raise HttpError(400, f"Format d'entrée non pris en charge : {filename or '(sans nom)'}")
+        if not content:
+            raise HttpError(400, "Le fichier d'élèves est vide.")
+
+        digest = hashlib.sha256(content).hexdigest()
+        key = digest + json.dumps(params, sort_keys=True, ensure_ascii=False)
+        job_id = self.cache.get(key)
+        if job_id is not None:
+            job = self.jobs[job_id]
+            if job.status != "erreur":
+                self.cache.move_to_end(key)
+                return job, True
+            # nouvel essai : le travail en erreur est oublié avec son dossier
+            del self.cache[key]
+            del self.jobs[job_id]
+            shutil.rmtree(job.workdir, ignore_errors=True)
+
+        if self.queue.full():
+            raise HttpError(503, "Trop de travaux en attente, réessayez plus tard.")
+
+        job_id = uuid.uuid4().hex
+        workdir = os.path.join(self.workdir, job_id)
+        os.makedirs(workdir)
+        input_path = os.path.join(workdir, "eleves" + ext)
+        with open(input_path, "wb") as f:
+            f.write(content)
+
+        job = Job(job_id, key, params, workdir, input_path)
+        self.jobs[job_id] = job
+        self.cache[key] = job_id
+        self.cache.move_to_end(key)
+        self.queue.put_nowait(job)
+        self._evict()
+        return job, False
+
+    def get(self, job_id: str) -> Job:
+        job = self.jobs.get(job_id)
+        if job is None:
+            raise HttpError(404, f"Travail inconnu : {job_id}")
+        return job
+
+
+# --- HTTP (minimal, au-dessus des flux asyncio) ------------------------------
+
+async def _read_request(reader: asyncio.StreamReader):
+    request_line = (await reader.readline()).decode("latin-1").strip()
+    if not request_line:
+        return None
+    try:
+        method, target, _ = request_line.split(" ", 2)
+    except ValueError:
+        raise HttpError(400, "Requête invalide.")
+
+    headers: Dict[str, str] = {}
+    for _ in range(MAX_HEADER_LINES):
+        line = (await reader.readline()).decode("latin-1")
+        if line in ("\r\n", "\n", ""):
+            break
+        name, _, value = line.partition(":")
+        headers[name.strip().lower()] = value.strip()
+    else:
+        raise HttpError(400, "Trop d'en-têtes.")
+
+    try:
+        length = int(headers.get("content-length", "0"))
+    except ValueError:
+        raise HttpError(400, "Content-Length invalide.")
+    if length > MAX_UPLOAD_BYTES:
+        raise HttpError(413, "Fichier trop volumineux.")
+    body = await reader.readexactly(length) if length else b""
+    return method.upper(), target, headers, body
+
+
+def _response(status: int, body: bytes, content_type: str, extra: Dict[str, str] = None) -> bytes:
+    headers = {
+        "Content-Type": content_type,
+        "Content-Length": str(len(body)),
+        "Connection": "close",
+        **(extra or {}),
+    }
+    head = f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+    head += "".join(f"{k}: {v}\r\n" for k, v in headers.items())
+    return head.encode("latin-1") + b"\r\n" + body
+
+
+def _json_response(status: int, data: object) -> bytes:
+    body = json.dumps(data, ensure_ascii=False).encode("utf-8")
+    return _response(status, body, "application/json; charset=utf-8")
+
+
+def _file_response(path: str) -> bytes:
+    ext = os.path.splitext(path)[1].lower()
+    with open(path, "rb") as f:
+        body = f.read()
+    return _response(
+        200, body, CONTENT_TYPES.get(ext, "application/octet-stream"),
+        {"Content-Disposition": f'attachment; filename="{os.path.basename(path)}"'},
+    )
+
+
+def route(service: PlanningService, method: str, target: str, headers, body: bytes) -> bytes:
+    url = urlsplit(target)
+    parts = [p for p in url.path.split("/") if p]
+
+    if parts == ["health"] and method == "GET":
+        return _json_response(200, {
+            "status": "ok",
+            "workers": service.workers,
+            "pending": service.queue.qsize(),
+            "jobs": len(service.jobs),
+        })
+
+    if parts == ["jobs"]:
+        if method != "POST":
+            raise HttpError(405, "Méthode non autorisée.")
+        params = parse_job_params(parse_qs(url.query))
+        filename = headers.get("x-filename", "")
+        job, cached = service.submit(filename, body, params)
+        return _json_response(200 if cached else 202, {**job.to_json(), "cached": cached})
+
+    if len(parts) >= 2 and parts[0] == "jobs" and method == "GET":
+        job = service.get(parts[1])
+        if len(parts) == 2:
+            return _json_response(200, job.to_json())
+        if len(parts) == 4 and parts[2] == "result":
+            kind = parts[3]
+            if kind not in RESULT_KINDS:
+                raise HttpError(404, f"Résultat inconnu : {kind}")
+            if not job.finished:
+                raise HttpError(409, "Le travail n'est pas terminé.")
+            if kind not in job.outputs:
+                raise HttpError(404, f"Pas de résultat « {kind} » pour ce travail.")
+            return _file_response(job.outputs[kind])
+
+    raise HttpError(404, "Route inconnue.")
+
+
+async def handle_client(service: PlanningService, reader, writer) -> None:
+    try:
+        try:
+            request = await _read_request(reader)
+            if request is None:
+                return
+            response = route(service, *request)
+        except HttpError as e:
+            response = _json_response(e.status, {"error": str(e)})
+        except asyncio.IncompleteReadError:
+            return
+        except Exception as e:
+            response = _json_response(500, {"error": f"Erreur interne : {e}"})
+        writer.write(response)
+        await writer.drain()
+    finally:
+        writer.close()
+
+
+async def serve(host: str, port: int, workers: int, cache_size: int, workdir: Optional[str]) -> None:
+    workdir = workdir or tempfile.mkdtemp(prefix="planification_spe_")
+    os.makedirs(workdir, exist_ok=True)
+    service = PlanningService(workdir, workers=workers, cache_size=cache_size)
+    service.start()
+
+    server = await asyncio.start_server(
+        lambda r, w: handle_client(service, r, w), host, port
+    )
+    print(f"Service de planification sur http://{host}:{port} ({workers} processus, dossier {workdir})")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await service.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Service local de planification (API JSON)")
+    parser.add_argument("--host", default="127.0.0.1", help="adresse d'écoute (0.0.0.0 pour le réseau local)")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2,
+                        help="nombre de planifications simultanées")
+    parser.add_argument("--cache-size", type=int, default=DEFAULT_CACHE_SIZE,
+                        help="nombre de travaux terminés gardés en cache")
+    parser.add_argument("--data-dir", help="dossier des fichiers reçus et des résultats")
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(serve(args.host, args.port, args.workers, args.cache_size, args.data_dir))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,679 @@
+# tests/property_checks.py
+"""
+Vérifications aléatoires (par propriétés) et mesures de passage à
+l'échelle du Planner et de ses variantes.
+
+    python -m tests.property_checks                      # 200 cas aléatoires
+    python -m tests.property_checks --cases 1000 --seed 7
+    python -m tests.property_checks --case 123456        # rejouer un cas
+    python -m tests.property_checks --scaling --output courbes.csv
+
+Chaque cas tire des élèves (demande déséquilibrée entre spé, vœux en
+trop, élèves sans vœu), des créneaux et des paramètres, puis exécute
+chaque mode de répartition et vérifie les invariants (voir check_planner).
+Les modes censés donner le même résultat que la passe gloutonne (flux,
+parallèle) sont comparés à celle-ci ; l'amélioration continue et le
+multi-départ ne doivent jamais placer moins d'élèves qu'elle ; en mode
+priorité, les places réservées sont respectées et les listes d'attente
+restent cohérentes après des retraits d'élèves et des déplacements ;
+le choix de la case la moins remplie par créneau donne le même planning
+que l'énumération de toutes les cases ; l'index d'effectif (précalculs
+partagés) ne change pas le planning et les simulations à partir d'un
+instantané des effectifs ne modifient ni l'instantané ni le planner
+d'origine. En cas d'échec, le numéro du cas est affiché pour le rejouer
+avec --case.
+
+Toute optimisation du Planner doit laisser ces vérifications au vert.
+"""
+from __future__ import annotations
+import argparse
+import math
+import os
+import random
+import sys
+import time
+from collections import Counter
+from dataclasses import dataclass
+from typing import List, Dict, Optional, Tuple, Callable
+from classes.models import TimeSlot, Student
+from classes.planner import Planner
+from utils.manifest import plan_fingerprint
+from utils.utils import compute_groups_per_specialty
+
+SPECIALTIES = [
+    "Maths", "PC", "SVT", "NSI", "SES", "HGGSP", "HLP", "LLCER",
+    "SI", "Arts", "EPS", "Bio-éco",
+]
+
+# Exposant de croissance (temps ~ n^k) au-delà duquel on signale la mesure
+SUPERLINEAR_EXPONENT = 1.3
+SCALING_SIZES = (1000, 2000, 4000, 8000)
+
+
+@dataclass
+class Case:
+    """Un cas tiré au hasard, entièrement déterminé par sa graine."""
+    seed: int
+    time_slots: List[TimeSlot]
+    rows: List[Tuple[str, str, List[str]]]      # (nom, classe, vœux)
+    groups_per_specialty: Dict[str, int]
+    min_per_group: int
+    max_per_group: Optional[int]
+    planner_seed: Optional[int]
+
+    def students(self) -> List[Student]:
+        """Élèves neufs (les planners modifient les élèves qu'ils placent)."""
+        return [Student(name=name, classe=classe, choices=list(choices)) for name, classe, choices in self.rows]
+
+    def describe(self) -> str:
+        return (
+            f"cas {self.seed} : {len(self.rows)} élèves, {len(self.time_slots)} créneaux, "
+            f"{len(self.groups_per_specialty)} spé, max {self.max_per_group}, "
+            f"graine {self.planner_seed}"
+        )
+
+
+def random_case(seed: int) -> Case:
+    rng = random.Random(seed)
+    num_slots = rng.randint(2, 6)
+    time_slots = [TimeSlot(i, f"C{i + 1}") for i in range(num_slots)]
+    specialties = rng.sample(SPECIALTIES, rng.randint(2, len(SPECIALTIES)))
+    # demande déséquilibrée : quelques spé très demandées
+    weights = [rng.paretovariate(1.5) for _ in specialties]
+
+    rows = []
+    for i in range(rng.randint(0, 400)):
+        # parfois plus de vœux que de créneaux, parfois aucun
+        num_choices = min(len(specialties), max(0, int(rng.gauss(num_slots - 1, 1.5))))
+        choices: List[str] = []
+        while len(choices) < num_choices:
+            spe = rng.choices(specialties, weights)[0]
+            if spe not in choices:
+                choices.append(spe)
+        rows.append((f"Élève {i:04d}", f"1{rng.randint(1, 6)}", choices))
+
+    min_per_group = rng.randint(1, 6)
+    max_per_group = rng.choice([None, min_per_group + rng.randint(0, 8)])
+    groups = compute_groups_per_specialty(
+        [Student(name=n, classe=c, choices=ch) for n, c, ch in rows],
+        time_slots,
+        min_per_group,
+        max_per_group or 1000,
+        rng.randint(1, 6),
+        on_warning=None,
+    ) if rows else {}
+
+    return Case(
+        seed=seed,
+        time_slots=time_slots,
+        rows=rows,
+        groups_per_specialty=groups,
+        min_per_group=min_per_group,
+        max_per_group=max_per_group,
+        planner_seed=rng.choice([None, rng.randint(0, 10 ** 6)]),
+    )
+
+
+# --- Invariants --------------------------------------------------------------
+
+def check_planner(planner: Planner, students: List[Student]) -> List[str]:
+    """
+    Invariants d'un planner après répartition (et après déplacements,
+    fermetures de groupes ou équilibrage). Retourne les violations.
+    """
+    problems: List[str] = []
+    num_slots = len(planner.time_slots)
+
+    # compteurs : dimensions et capacité
+    for spe, counts in planner._group_counts.items():
+        if len(counts) != num_slots:
+            problems.append(f"{spe} : {len(counts)} lignes de compteurs pour {num_slots} créneaux")
+        widths = {len(row) for row in counts}
+        if len(widths) != 1:
+            problems.append(f"{spe} : nombre de groupes différent selon le créneau {sorted(widths)}")
+        for slot_idx, row in enumerate(counts):
+            for group_idx, count in enumerate(row):
+                if count < 0:
+                    problems.append(f"{spe} C{slot_idx} g{group_idx + 1} : effectif négatif {count}")
+                if planner.max_per_group is not None and count > planner.max_per_group:
+                    problems.append(
+                        f"{spe} C{slot_idx} g{group_idx + 1} : {count} élèves > max {planner.max_per_group}"
+                    )
+
+    # compteurs == enregistrements par groupe == affectations des élèves
+    from_counts = Counter({
+        (spe, slot_idx, group_idx): count
+        for spe, counts in planner._group_counts.items()
+        for slot_idx, row in enumerate(counts)
+        for group_idx, count in enumerate(row)
+        if count
+    })
+    from_records = Counter(
+        (r.specialty, r.timeslot.index, r.group_index) for r in planner.group_records
+    )
+    from_students = Counter(
+        (a.specialty, slot_idx, a.group_index)
+        for st in students
+        for slot_idx, a in st.assignments.items()
+    )
+    if from_counts != from_records:
+        problems.append(f"compteurs != group_records : {_counter_diff(from_counts, from_records)}")
+    if from_counts != from_students:
+        problems.append(f"compteurs != affectations : {_counter_diff(from_counts, from_students)}")
+
+    # chaque élève : placé (tous ses vœux, un par créneau) ou non placé, une seule fois
+    unplaced = Counter(id(u.student) for u in planner.unplaced_students)
+    for st in students:
+        n_unplaced = unplaced.get(id(st), 0)
+        if n_unplaced > 1:
+            problems.append(f"{st.name} : {n_unplaced} fois dans les non placés")
+        if n_unplaced and st.assignments:
+            problems.append(f"{st.name} : non placé mais avec des affectations")
+        if not n_unplaced:
+            assigned = Counter(a.specialty for a in st.assignments.values())
+            if assigned != Counter(st.choices):
+                problems.append(f"{st.name} : affecté à {dict(assigned)} pour les vœux {st.choices}")
+        for slot_idx, a in st.assignments.items():
+            if a.timeslot.index != slot_idx:
+                problems.append(f"{st.name} : affectation rangée au créneau {slot_idx} au lieu de {a.timeslot.index}")
+            record = planner._records_by_slot.get((id(st), slot_idx))
+            if record is None or (record.specialty, record.group_index) != (a.specialty, a.group_index):
+                problems.append(f"{st.name} : index des enregistrements désynchronisé (C{slot_idx})")
+            members = planner._cell_members.get((a.specialty, slot_idx, a.group_index), {})
+            if id(st) not in members:
+                problems.append(f"{st.name} : absent des membres de {a.specialty} C{slot_idx} g{a.group_index + 1}")
+    if len(planner._records_by_slot) != len(planner.group_records):
+        problems.append("index des enregistrements : entrées en trop")
+    num_members = sum(len(m) for m in planner._cell_members.values())
+    if num_members != len(planner.group_records):
+        problems.append(f"{num_members} membres de cases pour {len(planner.group_records)} enregistrements")
+
+    # indicateurs incrémentaux == recalcul
+    cells = [c for counts in planner._group_counts.values() for row in counts for c in row]
+    overfull = sum(
+        1 for c in cells if planner.max_per_group is not None and c > planner.max_per_group
+    )
+    expected = (sum(cells), sum(c * c for c in cells), overfull, len(cells))
+    actual = (planner._total_count, planner._total_sq, planner._overfull_cells, planner._num_cells)
+    if expected != actual:
+        problems.append(f"indicateurs incrémentaux {actual} au lieu de {expected}")
+
+    return problems
+
+
+def _counter_diff(a: Counter, b: Counter) -> str:
+    diff = sorted((k, a.get(k, 0), b.get(k, 0)) for k in set(a) | set(b) if a.get(k, 0) != b.get(k, 0))
+    return ", ".join(f"{k}: {x} / {y}" for k, x, y in diff[:5])
+
+
+def _outcome(planner: Planner, students: List[Student]) -> Tuple[object, ...]:
+    """Ce qui doit être identique entre deux modes équivalents."""
+    return (
+        plan_fingerprint(students),
+        [(r.specialty, r.timeslot.index, r.group_index, r.student_name) for r in planner.group_records],
+        [(u.student.name, u.failed_specialty) for u in planner.unplaced_students],
+        {spe: [row[:] for row in counts] for spe, counts in planner._group_counts.items()},
+    )
+
+
+def _random_moves(planner: Planner, students: List[Student], rng: random.Random, num_moves: int) -> None:
+    """Déplacements manuels valides au hasard, puis annulations / rétablissements."""
+    placed = [st for st in students if st.assignments]
+    if not placed:
+        return
+    for _ in range(num_moves):
+        st = rng.choice(placed)
+        from_slot = rng.choice(list(st.assignments))
+        spe = st.assignments[from_slot].specialty
+        to_slot = rng.randrange(len(planner.time_slots))
+        to_group = rng.randrange(len(planner._group_counts[spe][0]))
+        if not planner.check_move(st, from_slot, to_slot, to_group):
+            planner.move_student(st, from_slot, to_slot, to_group)
+    for _ in range(rng.randint(0, num_moves)):
+        rng.choice([planner.undo, planner.redo])()
+
+
+# --- Modes ------------------------------------------------------------------
+
+def _greedy(case: Case) -> Planner:
+    return Planner(case.time_slots, case.groups_per_specialty, case.max_per_group)
+
+
+def _seeded(case: Case) -> Planner:
+    return Planner(case.time_slots, case.groups_per_specialty, case.max_per_group, seed=case.planner_seed)
+
+
+def _joint(case: Case) -> Planner:
+    from classes.joint_planner import JointPlanner
+    # sans limite de temps : le résultat ne dépend que du cas
+    return JointPlanner(
+        case.time_slots, case.groups_per_specialty, case.max_per_group, seed=case.planner_seed,
+        max_groups_per_spe=8, time_budget=None, max_iterations=20,
+    )
+
+
+def _sharded(case: Case) -> Planner:
+    from classes.sharded_planner import ShardedPlanner
+    # processus dès 2 élèves, pour exercer la fusion des lots
+    return ShardedPlanner(
+        case.time_slots, case.groups_per_specialty, case.max_per_group, seed=case.planner_seed,
+        workers=2, min_parallel_students=2,
+    )
+
+
+def _rotation(case: Case) -> Planner:
+    from classes.rotation import RotationPlanner, RoundHistory
+    # historique : une séance précédente répartie par la passe gloutonne
+    previous = case.students()
+    planner = _greedy(case)
+    planner.plan(previous)
+    history = RoundHistory()
+    history.record(planner, previous)
+    return RotationPlanner(
+        case.time_slots, case.groups_per_specialty, case.max_per_group, seed=case.planner_seed,
+        history=history,
+    )
+
+
+def _anytime(case: Case) -> Planner:
+    from classes.anytime_planner import AnytimePlanner
+    # nombre d'étapes fixé : le résultat ne dépend que du cas
+    return AnytimePlanner(
+        case.time_slots, case.groups_per_specialty, case.max_per_group, seed=case.planner_seed,
+        min_per_group=case.min_per_group, time_budget=None, max_iterations=12,
+    )
+
+
+def _ordered(case: Case) -> Planner:
+    from classes.ordered_planner import OrderedPlanner
+    return OrderedPlanner(case.time_slots, case.groups_per_specialty, case.max_per_group, seed=case.planner_seed)
+
+
+def _flow(case: Case) -> Planner:
+    from classes.flow_planner import FlowPlanner
+    return FlowPlanner(case.time_slots, case.groups_per_specialty, case.max_per_group, seed=case.planner_seed)
+
+
+def _multistart(case: Case) -> Planner:
+    from classes.multistart_planner import MultiStartPlanner
+    return MultiStartPlanner(
+        case.time_slots, case.groups_per_specialty, case.max_per_group, seed=case.planner_seed,
+        starts=4,
+    )
+
+
+def _priority(case: Case) -> Planner:
+    from classes.priority_planner import PriorityPlanner, PriorityPolicy, PriorityTier
+    # classes 11 et 12 prioritaires, une place réservée par case
+    policy = PriorityPolicy([PriorityTier("prioritaires", classes=["11", "12"], reserved=1)])
+    return PriorityPlanner(
+        case.time_slots, case.groups_per_specialty, case.max_per_group, seed=case.planner_seed,
+        priorities=policy,
+    )
+
+
+def _enumerated(case: Case) -> Planner:
+    planner = _seeded(case)
+    # référence : énumération de toutes les cases libres puis _best_candidate
+    planner._least_filled_choice = False
+    return planner
+
+
+def _indexed(case: Case) -> Planner:
+    from classes.roster_index import roster_index
+    planner = _seeded(case)
+    # index construit sur les mêmes élèves, dans le même ordre
+    planner.roster_index = roster_index(case.students(), case.time_slots)
+    return planner
+
+
+def _check_snapshot(planner: Planner, students: List[Student]) -> List[str]:
+    """Simulation à partir d'un instantané : copie à l'écriture, indicateurs exacts."""
+    problems: List[str] = []
+    before = {spe: [row[:] for row in counts] for spe, counts in planner._group_counts.items()}
+    snapshot = planner.occupancy_snapshot()
+
+    sim = Planner(planner.time_slots, planner.groups_per_specialty, planner.max_per_group)
+    sim.restore_occupancy(snapshot)
+    for spe in list(sim._group_counts)[:1]:
+        sim.add_group(spe)
+    for u in planner.unplaced_students:
+        st = u.student
+        sim._place_student(Student(st.name, st.classe, list(st.choices)))
+
+    if {spe: [list(row) for row in counts] for spe, counts in planner._group_counts.items()} != before:
+        problems.append("la simulation a modifié les effectifs du planner d'origine")
+    if {spe: [list(row) for row in counts] for spe, counts in snapshot.counts.items()} != before:
+        problems.append("la simulation a modifié l'instantané")
+    cells = [c for counts in sim._group_counts.values() for row in counts for c in row]
+    if (sim._total_count, sim._total_sq, sim._num_cells) != (sum(cells), sum(c * c for c in cells), len(cells)):
+        problems.append("indicateurs de la simulation incohérents avec ses effectifs")
+    return problems
+
+
+def _check_reservations(planner: Planner) -> List[str]:
+    """
+    Places réservées : dans chaque case, pour chaque niveau t, les élèves de
+    niveau t ou moins prioritaire plus les places encore réservées aux
+    niveaux plus prioritaires ne dépassent pas la capacité (un niveau peut
+    prendre les places réservées aux niveaux suivants, pas l'inverse).
+    """
+    problems: List[str] = []
+    if planner.max_per_group is None:
+        return problems
+    num_tiers = len(planner._reserved)
+    for (spe, slot_idx, group_idx), members in planner._cell_members.items():
+        present = [0] * num_tiers
+        for st in members.values():
+            present[planner.tier_of(st)] += 1
+        for t in range(num_tiers):
+            held = sum(max(0, planner._reserved[u] - present[u]) for u in range(t))
+            if sum(present[t:]) + held > planner.max_per_group:
+                problems.append(
+                    f"{spe} g{group_idx + 1} créneau {slot_idx} : {sum(present[t:])} élève(s) "
+                    f"de niveau >= {t} et {held} place(s) réservée(s) pour {planner.max_per_group}"
+                )
+                break
+    return problems
+
+
+def _check_waitlists(planner: Planner, students: List[Student], rng: random.Random) -> List[str]:
+    """
+    Retraits d'élèves puis déplacements manuels : places réservées
+    respectées, promotions immédiates, listes d'attente cohérentes.
+    """
+    problems: List[str] = _check_reservations(planner)
+    placed = [st for st in students if st.assignments]
+    withdrawn = rng.sample(placed, min(len(placed), 5))
+    for st in withdrawn:
+        planner.withdraw_student(st)
+    remaining = [st for st in students if all(st is not w for w in withdrawn)]
+    problems += check_planner(planner, remaining)
+    problems += _check_reservations(planner)
+
+    _random_moves(planner, remaining, rng, num_moves=30)
+    problems += [f"déplacements : {p}" for p in check_planner(planner, remaining)]
+    problems += [f"déplacements : {p}" for p in _check_reservations(planner)]
+
+    waiting = {id(st): spe for spe, queue in planner.waitlists.items() for st in queue.students()}
+    for u in planner.unplaced_students:
+        expected = u.failed_specialty if u.failed_specialty in u.student.choices else None
+        if waiting.get(id(u.student)) != expected:
+            problems.append(f"{u.student.name} : non placé sur {u.failed_specialty}, en attente sur {waiting.get(id(u.student))}")
+    unplaced = {id(u.student) for u in planner.unplaced_students}
+    if any(sid not in unplaced for sid in waiting):
+        problems.append("un élève placé ou retiré est resté en liste d'attente")
+    # une spé avec une place libre pour tous n'a personne en attente en tête de file
+    for spe, queue in planner.waitlists.items():
+        head = queue.students()[:1]
+        if head and planner.max_per_group is None:
+            problems.append(f"{spe} : liste d'attente sans capacité maximale")
+    return problems
+
+
+MODES: Dict[str, Callable[[Case], Planner]] = {
+    "glouton": _greedy,
+    "graine": _seeded,
+    "réallocation": _joint,
+    "parallèle": _sharded,
+    "rotation": _rotation,
+    "amélioration": _anytime,
+    "ordonné": _ordered,
+    "couplage": _flow,
+    "multi-départ": _multistart,
+    "priorité": _priority,
+    "index": _indexed,
+    "énumération": _enumerated,
+}
+
+
+def _check_streaming(case: Case, reference: Tuple[object, ...]) -> List[str]:
+    """Le mode flux doit reproduire la passe gloutonne sans graine."""
+    from classes.streaming_planner import StreamingPlanner
+
+    planner = StreamingPlanner(case.time_slots, case.groups_per_specialty, case.max_per_group)
+    try:
+        planner.plan(iter(case.students()))
+        students = list(planner.iter_planned_students(iter(case.students())))
+        records = sorted(
+            (r.specialty, r.timeslot.index, r.group_index, r.student_name)
+            for _, group in planner.iter_group_records_by_specialty()
+            for r in group
+        )
+        unplaced = [(u.student.name, u.failed_specialty) for u in planner.iter_unplaced()]
+    finally:
+        planner.cleanup()
+
+    problems = []
+    if plan_fingerprint(students) != reference[0]:
+        problems.append("flux : affectations différentes de la passe gloutonne")
+    if records != sorted(reference[1]):
+        problems.append("flux : enregistrements par groupe différents")
+    if unplaced != reference[2]:
+        problems.append("flux : non placés différents")
+    return problems
+
+
+def run_case(case: Case) -> List[str]:
+    """Exécute tous les modes sur un cas ; retourne les violations (préfixées du mode)."""
+    problems: List[str] = []
+    rng = random.Random(case.seed)
+    outcomes = {}
+
+    for name, factory in MODES.items():
+        students = case.students()
+        planner = factory(case)
+        planner.plan(students)
+        problems += [f"{name} : {p}" for p in check_planner(planner, students)]
+        outcomes[name] = _outcome(planner, students)
+
+        if name == "glouton":
+            problems += _check_streaming(case, outcomes[name])
+        if name == "priorité":
+            problems += [f"priorité : {p}" for p in _check_waitlists(planner, students, rng)]
+        if name == "index":
+            problems += [f"instantané : {p}" for p in _check_snapshot(planner, students)]
+        if name == "graine":
+            if case.planner_seed is not None:
+                # même graine, fichier dans un autre ordre : même planning
+                shuffled = case.students()
+                rng.shuffle(shuffled)
+                again = _seeded(case)
+                again.plan(shuffled)
+                if plan_fingerprint(shuffled) != outcomes[name][0]:
+                    problems.append("graine : résultat dépendant de l'ordre des lignes")
+
+            # déplacements manuels puis équilibrage sur ce planning
+            _random_moves(planner, students, rng, num_moves=30)
+            problems += [f"déplacements : {p}" for p in check_planner(planner, students)]
+            planner.rebalance(case.min_per_group)
+            problems += [f"équilibrage : {p}" for p in check_planner(planner, students)]
+
+    if outcomes["index"] != outcomes["graine"]:
+        problems.append("index : résultat différent de la passe gloutonne")
+    if outcomes["énumération"] != outcomes["graine"]:
+        problems.append("énumération : choix des cases différent du parcours par créneau")
+    if outcomes["parallèle"] != outcomes["graine"]:
+        problems.append("parallèle : résultat différent de la passe gloutonne")
+    if len(outcomes["amélioration"][2]) > len(outcomes["graine"][2]):
+        problems.append("amélioration : plus de non placés que la passe gloutonne")
+    # la passe 0 du multi-départ est la passe gloutonne avec graine
+    if len(outcomes["multi-départ"][2]) > len(outcomes["graine"][2]):
+        problems.append("multi-départ : plus de non placés que la passe gloutonne")
+    return problems
+
+
+def run_cases(num_cases: int, seed: int, out=sys.stdout) -> int:
+    """Exécute num_cases cas ; retourne le nombre de cas en échec."""
+    master = random.Random(seed)
+    failures = 0
+    t0 = time.perf_counter()
+    for i in range(num_cases):
+        case = random_case(master.randrange(10 ** 9))
+        problems = run_case(case)
+        if problems:
+            failures += 1
+            print(f"ÉCHEC {case.describe()}", file=out)
+            for p in problems[:10]:
+                print(f"    - {p}", file=out)
+    print(
+        f"{num_cases} cas, {len(MODES) + 1} modes : {failures} échec(s) "
+        f"en {time.perf_counter() - t0:.1f} s",
+        file=out,
+    )
+    return failures
+
+
+# --- Passage à l'échelle ------------------------------------------------------
+
+def scaling_students(num_students: int, seed: int = 0) -> List[Student]:
+    rng = random.Random(seed)
+    weights = [1.0 / (rank + 1) for rank in range(len(SPECIALTIES))]
+    students = []
+    for i in range(num_students):
+        choices: List[str] = []
+        while len(choices) < 3:
+            spe = rng.choices(SPECIALTIES, weights)[0]
+            if spe not in choices:
+                choices.append(spe)
+        students.append(Student(name=f"Élève {i}", classe=f"1{i % 8}", choices=choices))
+    return students
+
+
+def _time_best(run: Callable[[], None], repeats: int) -> float:
+    best = math.inf
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def measure_scaling(
+    sizes: Tuple[int, ...] = SCALING_SIZES,
+    repeats: int = 3,
+    max_groups_per_spe: Optional[int] = None,
+) -> List[Dict[str, object]]:
+    """
+    Durée de la répartition gloutonne et de l'équilibrage selon l'effectif.
+
+    Les groupes sont dimensionnés pour 5 à 8 élèves par groupe et par
+    créneau ; sans max_groups_per_spe, leur nombre croît avec l'effectif
+    (cas des fichiers consolidés). Chaque ligne donne l'exposant k
+    (durée ~ n^k) mesuré depuis l'effectif précédent.
+    """
+    time_slots = [TimeSlot(i, f"C{i + 1}") for i in range(5)]
+    rows: List[Dict[str, object]] = []
+    previous: Dict[str, Tuple[int, float]] = {}
+
+    for n in sizes:
+        students = scaling_students(n)
+        groups = compute_groups_per_specialty(
+            students, time_slots, 5, 8, max_groups_per_spe or n, on_warning=None,
+        )
+        planners: List[Planner] = []
+
+        def plan() -> None:
+            for st in students:
+                st.assignments.clear()
+            planner = Planner(time_slots, groups, 8)
+            planner.plan(students)
+            planners.append(planner)
+
+        measures = {"répartition": _time_best(plan, repeats)}
+        measures["équilibrage"] = _time_best(lambda: planners[-1].rebalance(5), 1)
+
+        for step, seconds in measures.items():
+            exponent = None
+            if step in previous:
+                n0, t0 = previous[step]
+                if t0 > 0 and seconds > 0:
+                    exponent = math.log(seconds / t0) / math.log(n / n0)
+            previous[step] = (n, seconds)
+            rows.append({
+                "étape": step,
+                "élèves": n,
+                "groupes": sum(groups.values()),
+                "secondes": round(seconds, 4),
+                "exposant": None if exponent is None else round(exponent, 2),
+                "super_linéaire": exponent is not None and exponent > SUPERLINEAR_EXPONENT,
+            })
+    return rows
+
+
+def print_scaling(rows: List[Dict[str, object]], out=sys.stdout) -> int:
+    """Affiche les courbes ; retourne le nombre de mesures super-linéaires."""
+    print(f"{'étape':<12} {'élèves':>8} {'groupes':>8} {'secondes':>10} {'exposant':>9}", file=out)
+    flagged = 0
+    for row in rows:
+        exponent = "" if row["exposant"] is None else f"{row['exposant']:.2f}"
+        flag = "  ⚠ super-linéaire" if row["super_linéaire"] else ""
+        flagged += bool(row["super_linéaire"])
+        print(
+            f"{row['étape']:<12} {row['élèves']:>8} {row['groupes']:>8} "
+            f"{row['secondes']:>10.4f} {exponent:>9}{flag}",
+            file=out,
+        )
+    return flagged
+
+
+def export_scaling(path: str, rows: List[Dict[str, object]]) -> None:
+    """Courbes en .csv ou .json (comme les statistiques)."""
+    import json
+    from utils.utils import write_csv_rows
+
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".csv":
+        header = list(rows[0]) if rows else []
+        write_csv_rows(path, [header] + [[row[h] for h in header] for row in rows])
+    elif ext == ".json":
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(rows, f, ensure_ascii=False, indent=2)
+    else:
+        raise ValueError(f"Format non pris en charge pour les courbes : {os.path.basename(path)} (.csv ou .json)")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Vérifications aléatoires et passage à l'échelle du Planner",
+    )
+    parser.add_argument("--cases", type=int, default=200, help="nombre de cas aléatoires (défaut 200)")
+    parser.add_argument("--seed", type=int, default=0, help="graine de tirage des cas")
+    parser.add_argument("--case", type=int, metavar="NUMÉRO", help="rejouer un seul cas (numéro affiché en cas d'échec)")
+    parser.add_argument("--scaling", action="store_true", help="mesurer aussi les durées selon l'effectif")
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", metavar="N", default=list(SCALING_SIZES),
+        help="effectifs mesurés avec --scaling",
+    )
+    parser.add_argument(
+        "--max-groups", type=int, metavar="G",
+        help="max. groupes par spé pour --scaling (défaut : croît avec l'effectif)",
+    )
+    parser.add_argument("--output", metavar="FICHIER", help="enregistrer les courbes (.csv ou .json)")
+    args = parser.parse_args(argv)
+
+    if args.case is not None:
+        case = random_case(args.case)
+        problems = run_case(case)
+        print(case.describe())
+        for p in problems:
+            print(f"    - {p}")
+        print("OK" if not problems else f"{len(problems)} violation(s)")
+        return 1 if problems else 0
+
+    failures = run_cases(args.cases, args.seed)
+
+    if args.scaling:
+        rows = measure_scaling(tuple(args.sizes), max_groups_per_spe=args.max_groups)
+        flagged = print_scaling(rows)
+        if flagged:
+            print(f"{flagged} mesure(s) super-linéaire(s) (exposant > {SUPERLINEAR_EXPONENT})")
+        if args.output:
+            export_scaling(args.output, rows)
+            print(f"Courbes enregistrées dans {args.output}")
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,72 @@
+# tests/test_csv_format.py
+"""
+Détection du format des fichiers CSV (voir utils/csv_format.py) :
+séparateur, BOM, encodage, et repli cp1252 après le préfixe analysé.
+"""
+import pytest
+
+from utils.csv_format import SNIFF_BYTES, CP1252_FALLBACK, detect_csv_format
+from utils.utils import load_students_from_csv
+
+HEADER = "Nom;Classe;Spé 1;Spé 2;Spé 3\n"
+
+
+def _roster(delimiter=";"):
+    lines = [HEADER.replace(";", delimiter)]
+    lines += [delimiter.join([f"Élève {i}", "1A", "Maths", "SVT", "SES"]) + "\n" for i in range(3)]
+    return "".join(lines)
+
+
+@pytest.mark.parametrize("delimiter", [";", ",", "\t", "|"])
+def test_delimiter(delimiter):
+    fmt = detect_csv_format(_roster(delimiter).encode("utf-8"))
+    assert fmt.delimiter == delimiter
+    assert fmt.mapping.name_cols == ["Nom"]
+    assert fmt.mapping.class_col == "Classe"
+    assert fmt.mapping.choice_cols == ["Spé 1", "Spé 2", "Spé 3"]
+
+
+def test_utf8_bom():
+    fmt = detect_csv_format(b"\xef\xbb\xbf" + _roster().encode("utf-8"))
+    assert fmt.encoding == "utf-8-sig"
+    # le BOM ne reste pas collé au premier en-tête
+    assert fmt.mapping.name_cols == ["Nom"]
+
+
+@pytest.mark.parametrize("encoding, expected", [
+    ("utf-8", "utf-8"),
+    ("cp1252", "cp1252"),
+])
+def test_encoding(encoding, expected):
+    fmt = detect_csv_format(_roster().encode(encoding))
+    assert fmt.encoding == expected
+    assert fmt.errors == (CP1252_FALLBACK if expected == "utf-8" else "strict")
+
+
+def test_utf8_character_cut_by_prefix():
+    # le préfixe s'arrête au milieu d'un « É » (2 octets en UTF-8)
+    raw = _roster().encode("utf-8")
+    cut = raw.index("Élève".encode("utf-8")) + 1
+    assert detect_csv_format(raw[:cut]).encoding == "utf-8"
+
+
+def test_cp1252_after_prefix(tmp_path):
+    # préfixe en ASCII pur (détecté UTF-8), premier « É » cp1252 bien après
+    header = "Nom;Classe;Specialite 1;Specialite 2;Specialite 3\n"
+    lines = [header]
+    size = len(header)
+    i = 0
+    while size <= SNIFF_BYTES:
+        line = f"Eleve {i};1A;Maths;SVT;SES\n"
+        lines.append(line)
+        size += len(line)
+        i += 1
+    lines.append("Émilie Noël;1B;Maths;SVT;SES\n")
+    path = tmp_path / "eleves.csv"
+    path.write_bytes("".join(lines).encode("cp1252"))
+
+    assert detect_csv_format(path.read_bytes()[:SNIFF_BYTES]).encoding == "utf-8"
+    students = load_students_from_csv(str(path))
+    assert len(students) == i + 1
+    assert students[-1].name == "Émilie Noël"
+    assert students[-1].choices == ["Maths", "SVT", "SES"]
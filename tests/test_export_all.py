@@ -0,0 +1,115 @@
+# tests/test_export_all.py
+"""
+Export groupé (voir utils/export_all.py) : en cas d'erreur d'écriture,
+d'annulation ou d'échec d'un renommage, les fichiers existants restent
+intacts et aucun fichier temporaire (.part) n'est laissé.
+"""
+import os
+import threading
+import time
+
+import pytest
+
+from utils.export_all import ExportCancelled, ExportTask, export_all
+
+
+def _writer(text):
+    def write(path):
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+    return write
+
+
+def _tasks(folder, names=("a", "b", "c")):
+    return [
+        ExportTask("students", os.path.join(folder, f"{name}.csv"), _writer(f"nouveau {name}"))
+        for name in names
+    ]
+
+
+def _contents(folder):
+    result = {}
+    for name in sorted(os.listdir(folder)):
+        with open(os.path.join(folder, name), encoding="utf-8") as f:
+            result[name] = f.read()
+    return result
+
+
+def _wait_for_no_part_files(folder, timeout=2.0):
+    # les écritures abandonnées sont effacées à leur fin, dans leur thread
+    deadline = time.monotonic() + timeout
+    while any(".part" in name for name in os.listdir(folder)):
+        if time.monotonic() > deadline:
+            break
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def folder(tmp_path):
+    (tmp_path / "a.csv").write_text("ancien a", encoding="utf-8")
+    return str(tmp_path)
+
+
+def test_success(folder):
+    written = export_all(_tasks(folder))
+    assert len(written) == 3
+    assert _contents(folder) == {"a.csv": "nouveau a", "b.csv": "nouveau b", "c.csv": "nouveau c"}
+
+
+def test_write_error(folder):
+    def fail(path):
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("partiel")
+        raise OSError("disque plein")
+
+    tasks = _tasks(folder)
+    tasks[1].write = fail
+    with pytest.raises(OSError, match="disque plein"):
+        export_all(tasks)
+    _wait_for_no_part_files(folder)
+    assert _contents(folder) == {"a.csv": "ancien a"}
+
+
+def test_cancel_during_write(folder):
+    cancel_event = threading.Event()
+    started = threading.Event()
+    release = threading.Event()
+
+    def slow(path):
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("en cours")
+        started.set()
+        release.wait(5)
+
+    tasks = _tasks(folder)
+    tasks[0].write = slow
+
+    def cancel():
+        started.wait(5)
+        cancel_event.set()
+
+    canceller = threading.Thread(target=cancel)
+    canceller.start()
+    with pytest.raises(ExportCancelled):
+        export_all(tasks, max_workers=1, cancel_event=cancel_event)
+    canceller.join()
+    # l'écriture commencée se termine après l'annulation, puis est effacée
+    release.set()
+    _wait_for_no_part_files(folder)
+    assert _contents(folder) == {"a.csv": "ancien a"}
+
+
+def test_rename_error_rolls_back(folder, monkeypatch):
+    replace = os.replace
+
+    def flaky(src, dst):
+        if os.path.basename(dst) == "c.csv":
+            raise OSError("renommage impossible")
+        replace(src, dst)
+
+    monkeypatch.setattr(os, "replace", flaky)
+    with pytest.raises(OSError, match="renommage impossible"):
+        export_all(_tasks(folder))
+    monkeypatch.undo()
+    # a.csv remplacé puis remis en place, b.csv retiré
+    assert _contents(folder) == {"a.csv": "ancien a"}
@@ -0,0 +1,17 @@
+# tests/test_property_checks.py
+"""
+Vérifications aléatoires des invariants du Planner (voir
+tests/property_checks.py), sur quelques cas tirés à graine fixe.
+"""
+import io
+
+import pytest
+
+from tests.property_checks import run_cases
+
+
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_invariants(seed):
+    out = io.StringIO()
+    failures = run_cases(8, seed=seed, out=out)
+    assert failures == 0, out.getvalue()
@@ -0,0 +1,115 @@
+# utils/benchmark.py
+"""
+Comparatif des stratégies de répartition sur un même fichier d'élèves.
+
+    python main.py --benchmark eleves.csv
+    python main.py --benchmark eleves.csv --strategies greedy,flow,multistart --output comparatif.csv
+
+Les groupes par spécialité sont calculés une fois, puis chaque stratégie
+du registre (voir classes.strategies) répartit les mêmes élèves avec les
+mêmes paramètres, via run_planning : durée, placés, écart-type des
+effectifs, petits groupes et satisfaction des vœux sont mesurés de la même
+façon pour toutes.
+"""
+from __future__ import annotations
+import json
+import os
+import sys
+from typing import List, Dict, Optional
+from classes.models import TimeSlot
+from classes.strategies import get_strategy, strategy_names
+from utils.manifest import run_planning
+from utils.stats import compute_stats
+from utils.utils import write_csv_rows
+
+
+def benchmark_strategies(
+    input_path: str,
+    time_slots: List[TimeSlot],
+    min_per_group: int,
+    max_per_group: int,
+    max_groups_per_spe: int,
+    strategies: Optional[List[str]] = None,
+    seed: Optional[int] = None,
+    options: Optional[Dict[str, object]] = None,
+    corrections: Optional[Dict[str, object]] = None,
+    on_step=None,
+) -> List[Dict[str, object]]:
+    """
+    Une ligne par stratégie (défaut : toutes celles sans option requise).
+    options: réglages communs (time_budget, workers, starts, history_path),
+    transmis aux stratégies qui les acceptent.
+    """
+    if strategies is None:
+        strategies = strategy_names(interactive=True)
+    # noms vérifiés avant le premier calcul
+    selected = [get_strategy(name) for name in strategies]
+    params = {s.name: s.params_from_options(options or {}) for s in selected}
+
+    rows: List[Dict[str, object]] = []
+    groups_per_specialty = None
+    input_sha256 = None
+    for strategy in selected:
+        if on_step is not None:
+            on_step(f"Stratégie {strategy.name}...")
+        students, planner, manifest = run_planning(
+            input_path,
+            time_slots,
+            min_per_group,
+            max_per_group,
+            max_groups_per_spe,
+            seed=seed,
+            groups_per_specialty=groups_per_specialty,
+            strategy=strategy.name,
+            strategy_params=params[strategy.name],
+            input_sha256=input_sha256,
+            corrections=corrections,
+        )
+        # mêmes groupes de départ pour toutes les stratégies
+        groups_per_specialty = manifest.groups_per_specialty
+        input_sha256 = manifest.input_sha256
+
+        stats = compute_stats(students, planner)
+        rows.append({
+            "stratégie": strategy.name,
+            "secondes": round(manifest.durations["plan"], 4),
+            "élèves": manifest.num_students,
+            "placés": stats.num_placed,
+            "non_placés": manifest.num_unplaced,
+            "groupes": sum(planner.groups_per_specialty.values()),
+            "petits_groupes": planner.small_cells(min_per_group),
+            "surcharges": planner.overfull_cells(),
+            "écart_type": round(planner.fill_stddev(), 3),
+            "premier_vœu_pct": round(100 * stats.first_choice_rate, 1),
+            "vœux_pct": round(100 * stats.choices_rate, 1),
+        })
+        planner.cleanup()
+    return rows
+
+
+def print_benchmark(rows: List[Dict[str, object]], out=sys.stdout) -> None:
+    print(
+        f"{'stratégie':<12} {'secondes':>9} {'placés':>7} {'non placés':>10} {'groupes':>8} "
+        f"{'petits':>7} {'écart-type':>10} {'1er vœu %':>9}",
+        file=out,
+    )
+    for row in rows:
+        print(
+            f"{row['stratégie']:<12} {row['secondes']:>9.3f} {row['placés']:>7} "
+            f"{row['non_placés']:>10} {row['groupes']:>8} {row['petits_groupes']:>7} "
+            f"{row['écart_type']:>10.3f} {row['premier_vœu_pct']:>9.1f}",
+            file=out,
+        )
+
+
+def export_benchmark(path: str, rows: List[Dict[str, object]]) -> None:
+    """Comparatif en .csv ou .json (comme les statistiques)."""
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".csv":
+        header = list(rows[0]) if rows else []
+        write_csv_rows(path, [header] + [[row[h] for h in header] for row in rows])
+    elif ext == ".json":
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(rows, f, ensure_ascii=False, indent=2)
+    else:
+        raise ValueError(f"Format non pris en charge pour le comparatif : {os.path.basename(path)} (.csv ou .json)")
@@ -0,0 +1,222 @@
+# utils/csv_format.py
+from __future__ import annotations
+import codecs
+import csv
+import difflib
+import re
+import unicodedata
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+# Taille du préfixe analysé pour détecter encodage / séparateur / en-têtes.
+# Le reste du fichier n'est lu qu'une fois, lors du chargement.
+SNIFF_BYTES = 64 * 1024
+
+# Ordre d'essai des encodages (le BOM UTF-8 est traité à part)
+CANDIDATE_ENCODINGS = ["utf-8", "cp1252", "latin-1"]
+CANDIDATE_DELIMITERS = ";,\t|"
+# Gestionnaire d'erreurs du décodage UTF-8 : un préfixe en ASCII pur est
+# détecté comme UTF-8 même si la suite du fichier est en cp1252 (« É » après
+# SNIFF_BYTES) ; les octets invalides sont alors relus en cp1252.
+CP1252_FALLBACK = "cp1252-fallback"
+
+# Mots-clés (normalisés : minuscules, sans accents) pour chaque rôle de colonne
+NAME_KEYWORDS = ["nom", "eleve", "name"]
+FIRSTNAME_KEYWORDS = ["prenom", "first name", "firstname"]
+CLASS_KEYWORDS = ["classe", "class", "division"]
+CHOICE_KEYWORDS = ["specialite", "spe", "choix", "voeu", "option"]
+
+ORDINALS = {
+    "premiere": 1, "premier": 1, "deuxieme": 2, "second": 2, "seconde": 2,
+    "troisieme": 3, "quatrieme": 4, "cinquieme": 5, "sixieme": 6,
+    "septieme": 7, "huitieme": 8,
+}
+
+
+@dataclass
+class ColumnMapping:
+    """Correspondance entre colonnes du fichier et rôles attendus."""
+    name_cols: List[str]                   # ex: ["Nom", "Prénom"] ou ["Nom des élèves"]
+    class_col: Optional[str]
+    choice_cols: List[str] = field(default_factory=list)  # dans l'ordre des vœux
+
+
+@dataclass
+class CsvFormat:
+    encoding: str
+    delimiter: str
+    mapping: ColumnMapping
+    errors: str = "strict"      # gestionnaire d'erreurs de décodage (voir CP1252_FALLBACK)
+
+
+def _cp1252_fallback(error: UnicodeError) -> Tuple[str, int]:
+    """Octets refusés par le décodeur UTF-8, relus en cp1252 (latin-1 pour les octets non définis)."""
+    if not isinstance(error, UnicodeDecodeError):
+        raise error
+    text = "".join(
+        bytes([byte]).decode("cp1252", errors="ignore") or chr(byte)
+        for byte in error.object[error.start:error.end]
+    )
+    return text, error.end
+
+
+codecs.register_error(CP1252_FALLBACK, _cp1252_fallback)
+
+
+def normalize_header(header: str) -> str:
+    """Minuscules, sans accents ni ponctuation superflue."""
+    text = unicodedata.normalize("NFKD", header)
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    text = text.lower().replace("œ", "oe")
+    text = re.sub(r"[^a-z0-9]+", " ", text)
+    return text.strip()
+
+
+def _has_keyword(norm: str, keywords: List[str]) -> bool:
+    words = norm.split()
+    for kw in keywords:
+        if " " in kw:
+            if kw in norm:
+                return True
+        elif any(w == kw or (len(kw) > 3 and w.startswith(kw)) for w in words):
+            return True
+    return False
+
+
+def _fuzzy_role(norm: str, keywords: List[str], cutoff: float = 0.8) -> bool:
+    """Repli pour les en-têtes mal orthographiés (ex: 'Clase', 'Prenon')."""
+    for word in norm.split():
+        if difflib.get_close_matches(word, keywords, n=1, cutoff=cutoff):
+            return True
+    return False
+
+
+def _choice_rank(norm: str, position: int) -> Tuple[int, int]:
+    """Rang d'une colonne de vœu : numéro ou ordinal trouvé, sinon sa position."""
+    for word in norm.split():
+        if word in ORDINALS:
+            return (ORDINALS[word], position)
+    numbers = re.findall(r"\d+", norm)
+    if numbers:
+        return (int(numbers[-1]), position)
+    return (1000, position)
+
+
+def map_columns(headers: List[str]) -> ColumnMapping:
+    """
+    Associe les en-têtes aux rôles nom / prénom / classe / vœux.
+
+    Les en-têtes exacts du formulaire Google (NAME_COL, CLASS_COL,
+    CHOICE_COLS de utils.utils) sont reconnus en priorité ; sinon on se
+    base sur des mots-clés puis sur une correspondance approchée.
+    """
+    from utils.utils import NAME_COL, CLASS_COL, CHOICE_COLS
+
+    if NAME_COL in headers and all(col in headers for col in CHOICE_COLS):
+        return ColumnMapping(
+            name_cols=[NAME_COL],
+            class_col=CLASS_COL if CLASS_COL in headers else None,
+            choice_cols=list(CHOICE_COLS),
+        )
+
+    name_col = None
+    firstname_col = None
+    class_col = None
+    choices = []
+
+    for position, header in enumerate(headers):
+        norm = normalize_header(header)
+        if not norm:
+            continue
+        # l'ordre des tests compte : "Nom de la spécialité" est un vœu
+        if _has_keyword(norm, CHOICE_KEYWORDS):
+            choices.append((_choice_rank(norm, position), header))
+        elif _has_keyword(norm, FIRSTNAME_KEYWORDS):
+            firstname_col = firstname_col or header
+        elif _has_keyword(norm, CLASS_KEYWORDS):
+            class_col = class_col or header
+        elif _has_keyword(norm, NAME_KEYWORDS):
+            name_col = name_col or header
+
+    # Repli approché pour les rôles non trouvés
+    for header in headers:
+        if header in (name_col, firstname_col, class_col):
+            continue
+        if any(header == h for _, h in choices):
+            continue
+        norm = normalize_header(header)
+        if firstname_col is None and _fuzzy_role(norm, FIRSTNAME_KEYWORDS):
+            firstname_col = header
+        elif class_col is None and _fuzzy_role(norm, CLASS_KEYWORDS):
+            class_col = header
+        elif name_col is None and _fuzzy_role(norm, NAME_KEYWORDS):
+            name_col = header
+
+    name_cols = [c for c in (name_col, firstname_col) if c is not None]
+    if not name_cols:
+        raise ValueError(
+            "Impossible de trouver la colonne des noms d'élèves.\n"
+            f"Colonnes trouvées : {headers}"
+        )
+    if not choices:
+        raise ValueError(
+            "Impossible de trouver les colonnes de spécialités.\n"
+            f"Colonnes trouvées : {headers}"
+        )
+
+    choices.sort(key=lambda c: c[0])
+    return ColumnMapping(
+        name_cols=name_cols,
+        class_col=class_col,
+        choice_cols=[header for _, header in choices],
+    )
+
+
+def _decode_prefix(raw: bytes) -> Tuple[str, str]:
+    """Retourne (encodage, texte) pour un préfixe de fichier."""
+    if raw.startswith(b"\xef\xbb\xbf"):
+        candidates = ["utf-8-sig"]
+    else:
+        candidates = CANDIDATE_ENCODINGS
+
+    for encoding in candidates:
+        try:
+            return encoding, raw.decode(encoding)
+        except UnicodeDecodeError as e:
+            # le préfixe peut couper un caractère multi-octets en fin de bloc
+            if encoding.startswith("utf-8") and e.start >= len(raw) - 3:
+                return encoding, raw[:e.start].decode(encoding)
+    return "latin-1", raw.decode("latin-1")
+
+
+def _sniff_delimiter(text: str) -> str:
+    lines = text.splitlines()
+    # on ne garde pas la dernière ligne, potentiellement tronquée
+    sample = "\n".join(lines[:-1] if len(lines) > 1 else lines)
+    try:
+        return csv.Sniffer().sniff(sample, delimiters=CANDIDATE_DELIMITERS).delimiter
+    except csv.Error:
+        header = lines[0] if lines else ""
+        return max(CANDIDATE_DELIMITERS, key=header.count)
+
+
+def detect_csv_format(
+    prefix: bytes,
+    delimiter: Optional[str] = None,
+    mapping: Optional[ColumnMapping] = None,
+) -> CsvFormat:
+    """
+    Détecte encodage, séparateur et colonnes à partir d'un préfixe borné
+    du fichier (voir SNIFF_BYTES).
+    """
+    encoding, text = _decode_prefix(prefix)
+    if delimiter is None:
+        delimiter = _sniff_delimiter(text)
+
+    if mapping is None:
+        first_line = text.splitlines()[0] if text else ""
+        headers = next(csv.reader([first_line], delimiter=delimiter), [])
+        mapping = map_columns(headers)
+
+    errors = CP1252_FALLBACK if encoding.startswith("utf-8") else "strict"
+    return CsvFormat(encoding=encoding, delimiter=delimiter, mapping=mapping, errors=errors)
@@ -0,0 +1,224 @@
+# utils/export_all.py
+"""
+Export groupé : tous les fichiers de résultats d'une répartition, dans
+plusieurs formats, écrits en parallèle (threads) sans jamais laisser de
+fichier partiel.
+
+Chaque fichier est d'abord écrit dans un fichier temporaire du même
+dossier (même extension, pour que le bon format soit choisi) ; ce n'est
+qu'une fois TOUS les fichiers écrits qu'ils sont renommés (os.replace,
+atomique) à leur nom définitif. En cas d'erreur ou d'annulation, aucun
+fichier final n'est créé ni modifié et les fichiers temporaires sont
+supprimés, y compris ceux d'une écriture encore en cours au moment de
+l'annulation (à la fin de celle-ci).
+"""
+from __future__ import annotations
+import os
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor, Future, wait, FIRST_COMPLETED
+from dataclasses import dataclass
+from typing import List, Dict, Optional, Callable
+
+# Nombre max de fichiers écrits en même temps
+MAX_EXPORT_WORKERS = 4
+# Intervalle (secondes) de vérification de l'annulation
+POLL_INTERVAL = 0.1
+
+# Nom de base de chaque fichier (comme ceux du serveur)
+EXPORT_NAMES = {
+    "students": "planning_eleves",
+    "groups": "planning_groupes",
+    "unplaced": "non_places",
+    "stats": "statistiques",
+    "manifest": "manifeste",
+}
+EXPORT_LABELS = {
+    "students": "Planning par élève",
+    "groups": "Planning par groupe",
+    "unplaced": "Élèves non placés",
+    "stats": "Statistiques",
+    "manifest": "Manifeste d'exécution",
+}
+# Formats possibles par fichier (None : tous ceux de utils.formats)
+EXPORT_FORMATS = {
+    "stats": (".csv", ".json"),
+    "manifest": (".json",),
+}
+
+
+class ExportCancelled(Exception):
+    """Export annulé : aucun fichier final n'a été écrit."""
+
+
+@dataclass
+class ExportTask:
+    kind: str                           # clé de EXPORT_NAMES
+    path: str                           # chemin définitif
+    write: Callable[[str], None]        # écrit le fichier au chemin donné
+
+    @property
+    def label(self) -> str:
+        return f"{EXPORT_LABELS.get(self.kind, self.kind)} ({os.path.basename(self.path)})"
+
+
+def _temp_path(path: str) -> str:
+    """Fichier temporaire caché, dans le même dossier et avec la même extension."""
+    folder, name = os.path.split(path)
+    stem, ext = os.path.splitext(name)
+    return os.path.join(folder, f".{stem}.{uuid.uuid4().hex[:8]}.part{ext}")
+
+
+def _remove(path: Optional[str]) -> None:
+    if path is None:
+        return
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def plan_exports(
+    folder: str,
+    formats: List[str],
+    students,
+    planner,
+    time_slots,
+    manifest=None,
+    kinds: Optional[List[str]] = None,
+) -> List[ExportTask]:
+    """
+    Fichiers à écrire dans folder pour chaque format (".csv", ".xlsx"...) :
+    plannings par élève et par groupe, non placés (s'il y en a),
+    statistiques et manifeste (dans les formats qu'ils acceptent).
+    """
+    from utils.formats import (
+        export_planning_per_student,
+        export_planning_per_group,
+        export_unplaced_students,
+    )
+
+    writers: Dict[str, Callable[[str], None]] = {
+        "students": lambda path: export_planning_per_student(path, students, time_slots),
+        "groups": lambda path: export_planning_per_group(path, planner.group_records, time_slots),
+    }
+    if planner.unplaced_students:
+        writers["unplaced"] = lambda path: export_unplaced_students(path, planner.unplaced_students)
+
+    def write_stats(path: str) -> None:
+        from utils.stats import compute_stats, export_stats
+        export_stats(path, compute_stats(students, planner))
+
+    writers["stats"] = write_stats
+    if manifest is not None:
+        from utils.manifest import save_manifest
+        writers["manifest"] = lambda path: save_manifest(path, manifest)
+
+    tasks = []
+    for kind, write in writers.items():
+        if kinds is not None and kind not in kinds:
+            continue
+        for ext in formats:
+            if ext in EXPORT_FORMATS.get(kind, (ext,)):
+                tasks.append(ExportTask(kind, os.path.join(folder, EXPORT_NAMES[kind] + ext), write))
+    return tasks
+
+
+def export_all(
+    tasks: List[ExportTask],
+    max_workers: int = MAX_EXPORT_WORKERS,
+    on_progress: Optional[Callable[[int, int, ExportTask], None]] = None,
+    cancel_event: Optional[threading.Event] = None,
+) -> List[str]:
+    """
+    Écrit les fichiers en parallèle puis les renomme tous, ou aucun : si un
+    renommage échoue, les fichiers déjà renommés sont retirés et ceux
+    qu'ils remplaçaient remis en place.
+
+    on_progress(fichiers écrits, total, tâche terminée) est appelé depuis le
+    thread appelant. Lève ExportCancelled si cancel_event est posé avant la
+    fin des écritures, ou la première erreur d'écriture. Retourne les
+    chemins écrits.
+    """
+    if len({task.path for task in tasks}) != len(tasks):
+        raise ValueError("Deux exports ont le même chemin de sortie.")
+    cancel_event = cancel_event or threading.Event()
+    # posé en cas d'annulation ou d'erreur : les écritures restantes sont abandonnées
+    abort = threading.Event()
+    temps = {id(task): _temp_path(task.path) for task in tasks}
+
+    def run(task: ExportTask) -> str:
+        temp = temps[id(task)]
+        if abort.is_set():
+            return temp
+        try:
+            task.write(temp)
+        except BaseException:
+            _remove(temp)
+            raise
+        return temp
+
+    def discard(future: Future) -> None:
+        # appelé tout de suite si l'écriture est finie, sinon à sa fin
+        if not future.cancelled() and future.exception() is None:
+            _remove(future.result())
+
+    executor = ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(tasks))))
+    futures = {executor.submit(run, task): task for task in tasks}
+    pending = set(futures)
+    done_count = 0
+    error: Optional[BaseException] = None
+    try:
+        while pending:
+            if cancel_event.is_set():
+                break
+            finished, pending = wait(pending, timeout=POLL_INTERVAL, return_when=FIRST_COMPLETED)
+            for future in finished:
+                if future.exception() is not None:
+                    error = future.exception()
+                    break
+                done_count += 1
+                if on_progress is not None:
+                    on_progress(done_count, len(tasks), futures[future])
+            if error is not None:
+                break
+    except BaseException as e:      # KeyboardInterrupt : comme une annulation
+        error = e
+
+    if error is not None or pending or cancel_event.is_set():
+        abort.set()
+        # (shutdown(cancel_futures=True) demande Python 3.9)
+        for future in futures:
+            future.cancel()
+        executor.shutdown(wait=False)
+        for future in futures:
+            future.add_done_callback(discard)
+        if error is not None and not isinstance(error, KeyboardInterrupt):
+            raise error
+        raise ExportCancelled("Export annulé : aucun fichier n'a été écrit.")
+    executor.shutdown()
+
+    # toutes les écritures ont réussi : renommages (chacun atomique). Les
+    # fichiers existants sont d'abord mis de côté, pour être remis en place
+    # si un renommage échoue en cours de route.
+    written: List[str] = []
+    backups: Dict[str, str] = {}    # chemin définitif -> ancien fichier mis de côté
+    try:
+        for task in tasks:
+            if os.path.exists(task.path):
+                backup = _temp_path(task.path)
+                os.replace(task.path, backup)
+                backups[task.path] = backup
+            os.replace(temps[id(task)], task.path)
+            written.append(task.path)
+    except BaseException:
+        for path in written:
+            _remove(path)
+        for path, backup in backups.items():
+            os.replace(backup, path)
+        for task in tasks:
+            _remove(temps[id(task)])
+        raise
+    for backup in backups.values():
+        _remove(backup)
+    return written
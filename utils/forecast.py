@@ -0,0 +1,291 @@
+# utils/forecast.py
+"""
+Prévision de la demande pendant la collecte des vœux.
+
+    python main.py --forecast reponses.csv --expected 1200
+    python main.py --forecast reponses.csv --expected 1200 --simulations 400 --output prevision.csv
+
+À partir des réponses déjà reçues, on simule des effectifs complets
+(Monte-Carlo) : les élèves manquants sont tirés parmi les réponses reçues,
+avec des poids aléatoires (bootstrap bayésien) pour tenir compte de
+l'incertitude sur les proportions observées. Les combinaisons de vœux et les
+classes sont tirées ensemble, ce qui garde les co-choix. Pour chaque
+effectif simulé, on compte les groupes nécessaires par spécialité pour ne
+pas dépasser max_per_group élèves par groupe et par créneau, sans le
+plafond max_groups_per_spe (required_groups) : le plafond n'est qu'un
+indicateur (part des simulations qui le dépassent). Une passe gloutonne de
+Planner (sans amélioration), avec les groupes plafonnés de
+compute_groups_per_specialty, estime les non placés.
+
+Les simulations sont réparties par lots entre plusieurs processus ; chaque
+simulation a sa propre graine (« graine:n° de simulation »), le résultat ne
+dépend donc pas du nombre de processus.
+"""
+from __future__ import annotations
+import json
+import math
+import os
+import random
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import List, Dict, Optional, Tuple, Callable
+from classes.models import Student, TimeSlot
+from classes.planner import Planner
+from utils.utils import compute_groups_per_specialty, required_groups, write_csv_rows
+
+DEFAULT_SIMULATIONS = 200
+DEFAULT_CONFIDENCE = 0.9
+# simulations par lot envoyé à un processus
+BATCH_SIZE = 25
+
+# (nom, classe, vœux) : ce qu'on envoie aux processus
+StudentRow = Tuple[str, str, List[str]]
+# (demande par spé, non placés)
+Simulation = Tuple[Dict[str, int], int]
+
+
+@dataclass
+class Range:
+    """Médiane et intervalle de confiance d'une grandeur simulée."""
+    low: float
+    median: float
+    high: float
+
+    def to_dict(self) -> Dict[str, float]:
+        return {"bas": self.low, "médiane": self.median, "haut": self.high}
+
+    def __str__(self) -> str:
+        if self.low == self.high:
+            return f"{self.median:g}"
+        return f"{self.median:g} [{self.low:g} ; {self.high:g}]"
+
+
+@dataclass
+class SpecialtyForecast:
+    specialty: str
+    observed: int                   # vœux déjà reçus
+    demand: Range                   # élèves qui la demanderont
+    groups: Range                   # groupes nécessaires, sans plafond
+    # probabilité de chaque nombre de groupes : {groupes: part des simulations}
+    group_shares: Dict[int, float] = field(default_factory=dict)
+    over_cap: float = 0.0           # part des simulations au-delà de max_groups_per_spe
+
+
+@dataclass
+class DemandForecast:
+    observed: int                   # réponses reçues
+    expected: int                   # effectif final attendu
+    simulations: int
+    confidence: float
+    seed: int
+    max_groups_per_spe: int         # plafond, indicateur seulement
+    specialties: List[SpecialtyForecast]
+    total_groups: Range
+    unplaced: Range
+
+    def summary(self) -> str:
+        lines = [
+            f"Prévision sur {self.simulations} simulations : {self.observed} réponses reçues "
+            f"sur {self.expected} attendues, intervalles à {round(100 * self.confidence)} %.",
+            f"Groupes nécessaires sans plafond ; « > {self.max_groups_per_spe} » : part des "
+            f"simulations au-delà du plafond de {self.max_groups_per_spe} groupes par spé.",
+            f"{'spécialité':<14} {'reçus':>6} {'demande':>22} {'groupes':>14} "
+            f"{'> ' + str(self.max_groups_per_spe):>8}",
+        ]
+        for spe in self.specialties:
+            lines.append(
+                f"{spe.specialty:<14} {spe.observed:>6} {str(spe.demand):>22} "
+                f"{str(spe.groups):>14} {round(100 * spe.over_cap):>7}%"
+            )
+        lines.append(f"Groupes au total : {self.total_groups}")
+        lines.append(f"Élèves non placés (passe gloutonne) : {self.unplaced}")
+        return "\n".join(lines)
+
+    def rows(self) -> List[Dict[str, object]]:
+        """Une ligne par spécialité (export .csv / .json)."""
+        return [
+            {
+                "spécialité": spe.specialty,
+                "reçus": spe.observed,
+                "demande_basse": spe.demand.low,
+                "demande_médiane": spe.demand.median,
+                "demande_haute": spe.demand.high,
+                "groupes_bas": spe.groups.low,
+                "groupes_médiane": spe.groups.median,
+                "groupes_haut": spe.groups.high,
+                "plafond": self.max_groups_per_spe,
+                "au_delà_plafond_pct": round(100 * spe.over_cap, 1),
+                "répartition_groupes": " ".join(
+                    f"{g}:{round(100 * share)}%" for g, share in sorted(spe.group_shares.items())
+                ),
+            }
+            for spe in self.specialties
+        ]
+
+
+def _quantile(values: List[float], q: float) -> float:
+    """Quantile q d'une liste triée (rang le plus proche)."""
+    index = min(len(values) - 1, max(0, math.ceil(q * len(values)) - 1))
+    return values[index]
+
+
+def _range(values: List[float], confidence: float) -> Range:
+    values = sorted(values)
+    tail = (1 - confidence) / 2
+    return Range(_quantile(values, tail), _quantile(values, 0.5), _quantile(values, 1 - tail))
+
+
+def simulate_roster(rows: List[StudentRow], expected: int, rng: random.Random) -> List[Student]:
+    """
+    Un effectif complet : les réponses reçues, plus expected - len(rows)
+    élèves tirés parmi elles avec des poids de Dirichlet(1, ..., 1).
+    """
+    students = [Student(name, classe, list(choices)) for name, classe, choices in rows]
+    missing = expected - len(rows)
+    if missing <= 0:
+        return students
+    weights = [rng.gammavariate(1.0, 1.0) for _ in rows]
+    for i, (_, classe, choices) in enumerate(rng.choices(rows, weights=weights, k=missing)):
+        students.append(Student(f"Simulé {i + 1}", classe, list(choices)))
+    return students
+
+
+def _simulate_batch(
+    rows: List[StudentRow],
+    expected: int,
+    time_slots: List[TimeSlot],
+    min_per_group: int,
+    max_per_group: int,
+    max_groups_per_spe: int,
+    seed: int,
+    indices: List[int],
+) -> List[Simulation]:
+    """Un lot de simulations (dans un processus du pool)."""
+    results: List[Simulation] = []
+    for k in indices:
+        students = simulate_roster(rows, expected, random.Random(f"{seed}:{k}"))
+        demand = Counter(spe for st in students for spe in st.choices)
+        groups = compute_groups_per_specialty(
+            students, time_slots, min_per_group, max_per_group, max_groups_per_spe,
+            on_warning=None,
+        )
+        planner = Planner(time_slots, groups, max_per_group)
+        planner.plan(students)
+        results.append((dict(demand), len(planner.unplaced_students)))
+    return results
+
+
+def forecast_demand(
+    students: List[Student],
+    expected: int,
+    time_slots: List[TimeSlot],
+    min_per_group: int,
+    max_per_group: int,
+    max_groups_per_spe: int,
+    simulations: int = DEFAULT_SIMULATIONS,
+    confidence: float = DEFAULT_CONFIDENCE,
+    seed: int = 0,
+    workers: Optional[int] = None,
+    on_step: Optional[Callable[[str], None]] = None,
+) -> DemandForecast:
+    """
+    Prévision des groupes nécessaires quand expected élèves auront répondu,
+    d'après les réponses reçues (students). Les groupes ne sont pas
+    plafonnés par max_groups_per_spe, qui sert à la passe gloutonne et à
+    l'indicateur over_cap. Lève ValueError si les paramètres sont
+    incohérents.
+    """
+    if not students:
+        raise ValueError("Aucune réponse reçue : impossible de prévoir la demande.")
+    if expected < len(students):
+        raise ValueError(
+            f"Effectif attendu ({expected}) inférieur au nombre de réponses reçues ({len(students)})."
+        )
+    if simulations < 1:
+        raise ValueError("Le nombre de simulations doit être au moins 1.")
+    if not 0 < confidence < 1:
+        raise ValueError("Le niveau de confiance doit être compris entre 0 et 1 (exclus).")
+
+    rows: List[StudentRow] = [(st.name, st.classe, list(st.choices)) for st in students]
+    batches = [
+        list(range(start, min(start + BATCH_SIZE, simulations)))
+        for start in range(0, simulations, BATCH_SIZE)
+    ]
+    args = (rows, expected, time_slots, min_per_group, max_per_group, max_groups_per_spe, seed)
+    workers = min(workers or os.cpu_count() or 1, len(batches))
+
+    results: List[Simulation] = []
+
+    def collect(batch_results: List[Simulation]) -> None:
+        results.extend(batch_results)
+        if on_step is not None:
+            on_step(f"Simulations : {len(results)} / {simulations}")
+
+    if workers <= 1:
+        for batch in batches:
+            collect(_simulate_batch(*args, batch))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(_simulate_batch, *args, batch) for batch in batches]
+            # résultats lus dans l'ordre des lots : indépendants du nombre de processus
+            for future in futures:
+                collect(future.result())
+
+    observed = Counter(spe for st in students for spe in st.choices)
+    names = sorted(set(observed).union(*(demand for demand, _ in results)), key=lambda s: (-observed[s], s))
+    slot_count = len(time_slots)
+    # groupes nécessaires par simulation et par spé, sans plafond
+    needed = [
+        {spe: required_groups(n, slot_count, max_per_group) for spe, n in demand.items()}
+        for demand, _ in results
+    ]
+    specialties: List[SpecialtyForecast] = []
+    for spe in names:
+        groups = [g.get(spe, 0) for g in needed]
+        shares = Counter(groups)
+        specialties.append(SpecialtyForecast(
+            specialty=spe,
+            observed=observed[spe],
+            demand=_range([d.get(spe, 0) for d, _ in results], confidence),
+            groups=_range(groups, confidence),
+            group_shares={g: count / len(results) for g, count in shares.items()},
+            over_cap=sum(1 for g in groups if g > max_groups_per_spe) / len(results),
+        ))
+
+    return DemandForecast(
+        observed=len(students),
+        expected=expected,
+        simulations=simulations,
+        confidence=confidence,
+        seed=seed,
+        max_groups_per_spe=max_groups_per_spe,
+        specialties=specialties,
+        total_groups=_range([sum(g.values()) for g in needed], confidence),
+        unplaced=_range([u for _, u in results], confidence),
+    )
+
+
+def export_forecast(path: str, forecast: DemandForecast) -> None:
+    """Prévision en .csv (une ligne par spécialité) ou .json (avec les totaux)."""
+    ext = os.path.splitext(path)[1].lower()
+    rows = forecast.rows()
+    if ext == ".csv":
+        header = list(rows[0]) if rows else []
+        write_csv_rows(path, [header] + [[row[h] for h in header] for row in rows])
+    elif ext == ".json":
+        data = {
+            "réponses_reçues": forecast.observed,
+            "effectif_attendu": forecast.expected,
+            "simulations": forecast.simulations,
+            "confiance": forecast.confidence,
+            "graine": forecast.seed,
+            "plafond_groupes_par_spé": forecast.max_groups_per_spe,
+            "groupes_total": forecast.total_groups.to_dict(),
+            "non_placés": forecast.unplaced.to_dict(),
+            "spécialités": rows,
+        }
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+    else:
+        raise ValueError(f"Format non pris en charge pour la prévision : {os.path.basename(path)} (.csv ou .json)")
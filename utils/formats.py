@@ -0,0 +1,359 @@
+# utils/formats.py
+"""
+Import / export multi-formats, choisis d'après l'extension du fichier :
+
+- .csv           : format historique (voir utils.utils)
+- .xlsx          : Excel, lu en mode read_only et écrit en mode write_only
+                   (nécessite le paquet optionnel openpyxl)
+- .json          : liste d'objets, lue et écrite objet par objet
+- .ndjson/.jsonl : un objet JSON par ligne
+- .pdf           : export seulement, documents imprimables (voir utils.pdf)
+
+Les fichiers sont traités en flux : ni le classeur ni la liste JSON
+complète ne sont chargés en mémoire.
+"""
+from __future__ import annotations
+import json
+import os
+import re
+from typing import List, Dict, Iterator, Iterable, Optional, Tuple
+from classes.models import Student, TimeSlot, GroupRecord, UnplacedStudent
+from utils.csv_format import SNIFF_BYTES, ColumnMapping, map_columns, detect_csv_format
+from utils.utils import (
+    iter_students_from_csv,
+    student_from_row,
+    student_planning_header,
+    PlanningMatrix,
+    iter_planning_matrices,
+    group_records_by_specialty,
+    iter_specialty_block_rows,
+    iter_unplaced_rows,
+    save_planning_matrices,
+    write_csv_rows,
+    save_unplaced_students,
+    UNPLACED_HEADER,
+)
+
+JSON_CHUNK_SIZE = 64 * 1024
+
+GROUP_RECORD_HEADER = ["Spécialité", "Groupe", "Créneau", "Nom", "Classe"]
+
+# Pour les boîtes de dialogue (filedialog)
+INPUT_FILETYPES = [
+    ("Tous les formats pris en charge", "*.csv *.xlsx *.json *.ndjson *.jsonl"),
+    ("Fichiers CSV", "*.csv"),
+    ("Classeurs Excel", "*.xlsx"),
+    ("Fichiers JSON", "*.json *.ndjson *.jsonl"),
+    ("Tous les fichiers", "*.*"),
+]
+OUTPUT_FILETYPES = [
+    ("Fichiers CSV", "*.csv"),
+    ("Classeurs Excel", "*.xlsx"),
+    ("Fichiers JSON", "*.json"),
+    ("Fichiers NDJSON", "*.ndjson"),
+    ("Documents PDF", "*.pdf"),
+    ("Tous les fichiers", "*.*"),
+]
+
+
+def _extension(path: str) -> str:
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".jsonl":
+        return ".ndjson"
+    return ext
+
+
+def _unsupported(path: str) -> ValueError:
+    return ValueError(
+        f"Format de fichier non pris en charge : {os.path.basename(path)}\n"
+        "Formats acceptés : .csv, .xlsx, .json, .ndjson (et .pdf en export)"
+    )
+
+
+def _openpyxl():
+    try:
+        import openpyxl
+    except ImportError:
+        raise ImportError(
+            "Le format Excel (.xlsx) nécessite le paquet openpyxl :\n"
+            "pip install openpyxl"
+        )
+    return openpyxl
+
+
+# --- Lecture ----------------------------------------------------------------
+
+def _iter_xlsx_rows(path: str) -> Iterator[Dict[str, object]]:
+    openpyxl = _openpyxl()
+    wb = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = wb.active.iter_rows(values_only=True)
+        header_row = next(rows, None)
+        if header_row is None:
+            return
+        headers = ["" if h is None else str(h) for h in header_row]
+        for values in rows:
+            yield dict(zip(headers, values))
+    finally:
+        wb.close()
+
+
+_WHITESPACE = re.compile(r"[\s,]*")
+
+
+def _iter_json_array(f) -> Iterator[object]:
+    """Décode une liste JSON élément par élément, par blocs de JSON_CHUNK_SIZE."""
+    decoder = json.JSONDecoder()
+    buf = f.read(JSON_CHUNK_SIZE).lstrip()
+    if not buf.startswith("["):
+        raise ValueError("Le fichier JSON doit contenir une liste d'élèves.")
+    pos = 1
+    eof = False
+
+    while True:
+        pos = _WHITESPACE.match(buf, pos).end()
+        if pos < len(buf) and buf[pos] == "]":
+            return
+        try:
+            if pos >= len(buf):
+                raise json.JSONDecodeError("fin de bloc", buf, pos)
+            obj, end = decoder.raw_decode(buf, pos)
+        except json.JSONDecodeError:
+            if eof:
+                raise ValueError("Fichier JSON tronqué ou invalide.")
+            chunk = f.read(JSON_CHUNK_SIZE)
+            eof = not chunk
+            buf = buf[pos:] + chunk
+            pos = 0
+            continue
+        yield obj
+        pos = end
+
+
+def _iter_ndjson(f) -> Iterator[object]:
+    for line_no, line in enumerate(f, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Ligne {line_no} invalide : {e}")
+
+
+def _iter_json_rows(path: str, ndjson: bool) -> Iterator[Dict[str, object]]:
+    with open(path, encoding="utf-8-sig") as f:
+        objects = _iter_ndjson(f) if ndjson else _iter_json_array(f)
+        for obj in objects:
+            if not isinstance(obj, dict):
+                raise ValueError("Chaque élève doit être un objet JSON (clé -> valeur).")
+            yield obj
+
+
+def _students_from_rows(
+    rows: Iterable[Dict[str, object]],
+    mapping: Optional[ColumnMapping],
+) -> Iterator[Student]:
+    for row in rows:
+        if mapping is None:
+            # colonnes déduites de la première ligne (en-têtes / clés)
+            mapping = map_columns(list(row.keys()))
+        student = student_from_row(row, mapping)
+        if student is not None:
+            yield student
+
+
+def iter_students(path: str, mapping: Optional[ColumnMapping] = None) -> Iterator[Student]:
+    """Lit les élèves un par un, quel que soit le format du fichier."""
+    ext = _extension(path)
+    if ext in (".csv", ".txt"):
+        return iter_students_from_csv(path, mapping=mapping)
+    if ext == ".xlsx":
+        return _students_from_rows(_iter_xlsx_rows(path), mapping)
+    if ext in (".json", ".ndjson"):
+        return _students_from_rows(_iter_json_rows(path, ext == ".ndjson"), mapping)
+    raise _unsupported(path)
+
+
+def load_students(path: str, mapping: Optional[ColumnMapping] = None) -> List[Student]:
+    return list(iter_students(path, mapping))
+
+
+def detect_mapping(path: str) -> ColumnMapping:
+    """Colonnes reconnues dans un fichier d'élèves (en-têtes ou clés du premier objet)."""
+    ext = _extension(path)
+    if ext in (".csv", ".txt"):
+        with open(path, "rb") as raw:
+            return detect_csv_format(raw.read(SNIFF_BYTES)).mapping
+    if ext == ".xlsx":
+        rows = _iter_xlsx_rows(path)
+    elif ext in (".json", ".ndjson"):
+        rows = _iter_json_rows(path, ext == ".ndjson")
+    else:
+        raise _unsupported(path)
+    first = next(rows, None)
+    rows.close()
+    if first is None:
+        raise ValueError("Le fichier ne contient aucun élève.")
+    return map_columns(list(first.keys()))
+
+
+# --- Écriture ---------------------------------------------------------------
+
+def _write_xlsx(path: str, title: str, rows: Iterable[List[object]]) -> None:
+    openpyxl = _openpyxl()
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet(title=title)
+    for row in rows:
+        ws.append(row)
+    wb.save(path)
+
+
+def _write_json(path: str, records: Iterable[Dict[str, object]], ndjson: bool) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        if ndjson:
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False))
+                f.write("\n")
+            return
+
+        f.write("[")
+        first = True
+        for record in records:
+            f.write("\n  " if first else ",\n  ")
+            f.write(json.dumps(record, ensure_ascii=False))
+            first = False
+        f.write("\n]\n" if not first else "]\n")
+
+
+def _prepend(header: List[str], rows: Iterable[List[object]]) -> Iterator[List[object]]:
+    yield header
+    yield from rows
+
+
+def _as_records(header: List[str], rows: Iterable[List[object]]) -> Iterator[Dict[str, object]]:
+    for row in rows:
+        yield dict(zip(header, row))
+
+
+def export_planning_per_student(
+    path: str,
+    students: Iterable[Student],
+    time_slots: List[TimeSlot],
+) -> None:
+    num_students = len(students) if isinstance(students, list) else None
+    export_planning_matrices(
+        path, iter_planning_matrices(students, time_slots), time_slots, num_students
+    )
+
+
+def export_planning_matrices(
+    path: str,
+    matrices: Iterable[PlanningMatrix],
+    time_slots: List[TimeSlot],
+    num_students: Optional[int] = None,
+) -> None:
+    """
+    Planning par élève à partir de blocs élèves × créneaux (voir
+    utils.utils.PlanningMatrix) : tous les formats partagent les mêmes
+    lignes, libellés résolus par table.
+    """
+    ext = _extension(path)
+    if ext == ".csv":
+        save_planning_matrices(path, matrices, time_slots)
+        return
+    if ext == ".pdf":
+        from utils.pdf import export_timetables_pdf
+        export_timetables_pdf(path, matrices, time_slots, num_students=num_students)
+        return
+
+    header = student_planning_header(time_slots)
+    rows = (row for matrix in matrices for row in matrix.rows())
+    if ext == ".xlsx":
+        _write_xlsx(path, "Par élève", _prepend(header, rows))
+    elif ext in (".json", ".ndjson"):
+        _write_json(path, _as_records(header, rows), ext == ".ndjson")
+    else:
+        raise _unsupported(path)
+
+
+def _iter_group_records_rows(group_records: Iterable[GroupRecord]) -> Iterator[List[object]]:
+    ordered = sorted(
+        group_records,
+        key=lambda r: (r.specialty, r.group_index, r.timeslot.index, r.student_name),
+    )
+    for r in ordered:
+        yield [r.specialty, r.group_index + 1, r.timeslot.label, r.student_name, r.classe]
+
+
+def export_planning_per_group(
+    path: str,
+    group_records: List[GroupRecord],
+    time_slots: List[TimeSlot],
+) -> None:
+    """
+    CSV / Excel : format bloc (un tableau par groupe).
+    JSON / NDJSON : un objet par élève et par groupe (spé, groupe, créneau, élève).
+    PDF : une feuille d'appel par groupe.
+    """
+    export_planning_per_group_by_specialty(
+        path, group_records_by_specialty(group_records), time_slots
+    )
+
+
+def export_planning_per_group_by_specialty(
+    path: str,
+    groups: Iterable[Tuple[str, Iterable[GroupRecord]]],
+    time_slots: List[TimeSlot],
+) -> None:
+    """
+    Comme export_planning_per_group, à partir d'enregistrements déjà
+    regroupés par spé (ordre alphabétique) : une seule spé est traitée à la
+    fois, ce qui permet de lire les groupes depuis le disque spé par spé.
+    """
+    ext = _extension(path)
+    if ext == ".pdf":
+        from utils.pdf import export_group_rosters_pdf
+        export_group_rosters_pdf(path, groups, time_slots)
+        return
+
+    block_rows = (
+        row
+        for spe, records in groups
+        for row in iter_specialty_block_rows(spe, records, time_slots)
+    )
+    if ext == ".csv":
+        write_csv_rows(path, block_rows)
+    elif ext == ".xlsx":
+        _write_xlsx(path, "Par groupe", block_rows)
+    elif ext in (".json", ".ndjson"):
+        rows = (
+            row
+            for _, records in groups
+            for row in _iter_group_records_rows(records)
+        )
+        _write_json(path, _as_records(GROUP_RECORD_HEADER, rows), ext == ".ndjson")
+    else:
+        raise _unsupported(path)
+
+
+def export_unplaced_students(
+    path: str,
+    unplaced_students: List[UnplacedStudent],
+) -> None:
+    ext = _extension(path)
+    if ext == ".csv":
+        save_unplaced_students(path, unplaced_students)
+        return
+    if ext == ".pdf":
+        from utils.pdf import export_unplaced_pdf
+        export_unplaced_pdf(path, UNPLACED_HEADER, iter_unplaced_rows(unplaced_students))
+        return
+
+    rows = iter_unplaced_rows(unplaced_students)
+    if ext == ".xlsx":
+        _write_xlsx(path, "Non placés", _prepend(UNPLACED_HEADER, rows))
+    elif ext in (".json", ".ndjson"):
+        _write_json(path, _as_records(UNPLACED_HEADER, rows), ext == ".ndjson")
+    else:
+        raise _unsupported(path)
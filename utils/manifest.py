@@ -0,0 +1,427 @@
+# utils/manifest.py
+"""
+Manifestes d'exécution : tout ce qu'il faut pour rejouer une planification
+à l'identique (empreinte du fichier d'entrée, paramètres, groupes par
+spécialité, stratégie, graine) + les durées de chaque étape.
+"""
+from __future__ import annotations
+import hashlib
+import json
+import threading
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field, asdict
+from datetime import datetime
+from typing import List, Dict, Optional, Tuple, Callable, Iterable
+from classes.models import TimeSlot, Student
+from classes.planner import Planner
+from classes.rebalancer import size_distribution
+from classes.roster_index import roster_index
+from classes.strategies import PlanningContext, create_planner, get_strategy
+from utils.csv_format import ColumnMapping
+from utils.utils import compute_groups_per_specialty
+from utils.formats import load_students, iter_students
+from utils.validation import apply_corrections
+
+MANIFEST_VERSION = 1
+HASH_CHUNK_SIZE = 1024 * 1024
+FINGERPRINT_MODULUS = 2 ** 256
+
+
+@dataclass
+class RunManifest:
+    input_path: str
+    input_sha256: str
+    time_slots: List[Tuple[int, str]]
+    min_per_group: int
+    max_per_group: int
+    max_groups_per_spe: int
+    groups_per_specialty: Dict[str, int]
+    strategy: str = "greedy"
+    strategy_params: Dict[str, object] = field(default_factory=dict)
+    seed: Optional[int] = None
+    rebalance: bool = False     # passe d'équilibrage (min_per_group)
+    started_at: str = ""
+    durations: Dict[str, float] = field(default_factory=dict)  # étape -> secondes
+    num_students: int = 0
+    num_unplaced: int = 0
+    group_sizes: Dict[int, int] = field(default_factory=dict)  # effectif -> nb de groupes
+    plan_sha256: str = ""       # empreinte des affectations obtenues
+    corrections: Dict[str, object] = field(default_factory=dict)  # voir utils.validation
+    version: int = MANIFEST_VERSION
+
+    def get_time_slots(self) -> List[TimeSlot]:
+        return [TimeSlot(index, label) for index, label in self.time_slots]
+
+
+@dataclass
+class StudentDiff:
+    """Différence d'affectation d'un élève entre deux plannings."""
+    name: str
+    classe: str
+    status: str                 # "modifié", "ajouté" ou "supprimé"
+    before: Dict[int, str]      # créneau -> "Spé (gN)" ; vide si non placé
+    after: Dict[int, str]
+
+
+# --- Empreintes -------------------------------------------------------------
+
+def hash_file(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _assignment_cells(student: Student) -> Dict[int, str]:
+    return {
+        slot_idx: f"{a.specialty} (g{a.group_index + 1})"
+        for slot_idx, a in student.assignments.items()
+    }
+
+
+def _student_key(student: Student) -> Tuple[str, str, Tuple[str, ...]]:
+    return (student.name, student.classe, tuple(student.choices))
+
+
+def _fingerprint_line(st: Student) -> str:
+    cells = "|".join(
+        f"{slot}:{value}" for slot, value in sorted(_assignment_cells(st).items())
+    )
+    return "\t".join([st.name, st.classe, ",".join(st.choices), cells])
+
+
+def plan_fingerprint(students: List[Student]) -> str:
+    """Empreinte des affectations, indépendante de l'ordre des élèves."""
+    lines = sorted(_fingerprint_line(st) for st in students)
+    return hashlib.sha256("\n".join(lines).encode("utf-8")).hexdigest()
+
+
+def streaming_plan_fingerprint(students: Iterable[Student]) -> str:
+    """
+    Variante en flux de plan_fingerprint (mode "streaming") : somme des
+    empreintes de chaque ligne, sans tri ni liste en mémoire. Les deux
+    empreintes ne sont pas comparables entre elles.
+    """
+    total = 0
+    for st in students:
+        digest = hashlib.sha256(_fingerprint_line(st).encode("utf-8")).digest()
+        total = (total + int.from_bytes(digest, "big")) % FINGERPRINT_MODULUS
+    return f"{total:064x}"
+
+
+# --- Exécution --------------------------------------------------------------
+
+def run_planning(
+    input_path: str,
+    time_slots: List[TimeSlot],
+    min_per_group: int,
+    max_per_group: int,
+    max_groups_per_spe: int,
+    seed: Optional[int] = None,
+    groups_per_specialty: Optional[Dict[str, int]] = None,
+    on_step: Optional[Callable[[str], None]] = None,
+    strategy: str = "greedy",
+    strategy_params: Optional[Dict[str, object]] = None,
+    rebalance: bool = False,
+    mapping: Optional[ColumnMapping] = None,
+    input_sha256: Optional[str] = None,
+    on_snapshot: Optional[Callable[[object], None]] = None,
+    cancel_event: Optional[threading.Event] = None,
+    corrections: Optional[Dict[str, object]] = None,
+) -> Tuple[List[Student], Planner, RunManifest]:
+    """
+    Chargement + calcul des groupes + répartition, avec manifeste.
+
+    Si groups_per_specialty est fourni (rejeu), il n'est pas recalculé.
+    strategy: nom d'une stratégie du registre (voir classes.strategies :
+    "greedy", "ordered", "flow", "multistart", "joint", "sharded",
+    "rotation", "priority", "anytime") ; strategy_params : ses paramètres propres.
+    rebalance: complète / fusionne ensuite les groupes sous min_per_group.
+    mapping: colonnes du fichier (sinon détectées) ; input_sha256 : empreinte
+    du fichier si elle est déjà connue (voir utils.profiles).
+    on_snapshot / cancel_event (stratégie "anytime") : appelé à chaque
+    meilleur planning intermédiaire (PlanSnapshot) ; threading.Event qui
+    arrête l'amélioration en gardant le meilleur planning.
+    corrections: doublons écartés et orthographes des spé remplacées au
+    chargement (voir utils.validation).
+    """
+    def step(message: str) -> None:
+        if on_step is not None:
+            on_step(message)
+
+    started_at = datetime.now().isoformat(timespec="seconds")
+    durations: Dict[str, float] = {}
+
+    step("Chargement des élèves...")
+    t0 = time.perf_counter()
+    if input_sha256 is None:
+        input_sha256 = hash_file(input_path)
+    durations["hash"] = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    if corrections:
+        students = list(apply_corrections(iter_students(input_path, mapping), corrections))
+    else:
+        students = load_students(input_path, mapping)
+    durations["load"] = time.perf_counter() - t0
+
+    if not students:
+        raise ValueError("Le fichier ne contient aucun élève.")
+
+    step("Calcul des groupes par spécialité...")
+    t0 = time.perf_counter()
+    if groups_per_specialty is None:
+        groups_per_specialty = compute_groups_per_specialty(
+            students,
+            time_slots,
+            min_per_group,
+            max_per_group,
+            max_groups_per_spe,
+        )
+    durations["groups"] = time.perf_counter() - t0
+
+    step("Répartition des élèves...")
+    t0 = time.perf_counter()
+    ctx = PlanningContext(
+        time_slots=time_slots,
+        groups_per_specialty=groups_per_specialty,
+        max_per_group=max_per_group,
+        seed=seed,
+        min_per_group=min_per_group,
+        max_groups_per_spe=max_groups_per_spe,
+        on_step=step,
+        on_snapshot=on_snapshot,
+        cancel_event=cancel_event,
+        # retrouvé dans le cache si cet effectif a déjà été réparti
+        roster_index=roster_index(students, time_slots),
+    )
+    planner = create_planner(strategy, ctx, strategy_params)
+    planner.plan(students)
+    durations["plan"] = time.perf_counter() - t0
+
+    if rebalance:
+        step("Équilibrage des groupes...")
+        t0 = time.perf_counter()
+        planner.rebalance(min_per_group)
+        durations["rebalance"] = time.perf_counter() - t0
+
+    manifest = RunManifest(
+        input_path=input_path,
+        input_sha256=input_sha256,
+        time_slots=[(ts.index, ts.label) for ts in time_slots],
+        min_per_group=min_per_group,
+        max_per_group=max_per_group,
+        max_groups_per_spe=max_groups_per_spe,
+        groups_per_specialty=dict(groups_per_specialty),
+        strategy=strategy,
+        strategy_params=planner.strategy_params(),
+        seed=seed,
+        rebalance=rebalance,
+        started_at=started_at,
+        durations=durations,
+        num_students=len(students),
+        num_unplaced=len(planner.unplaced_students),
+        group_sizes=size_distribution(planner),
+        plan_sha256=plan_fingerprint(students),
+        corrections=dict(corrections or {}),
+    )
+    return students, planner, manifest
+
+
+def run_streaming_planning(
+    input_path: str,
+    time_slots: List[TimeSlot],
+    min_per_group: int,
+    max_per_group: int,
+    max_groups_per_spe: int,
+    groups_per_specialty: Optional[Dict[str, int]] = None,
+    on_step: Optional[Callable[[str], None]] = None,
+    workdir: Optional[str] = None,
+    corrections: Optional[Dict[str, object]] = None,
+):
+    """
+    Comme run_planning, en mode flux (voir StreamingPlanner) : le fichier est
+    relu à chaque étape au lieu d'être chargé. Retourne (planner, manifeste) ;
+    appeler planner.cleanup() une fois les exports faits, et relire les
+    élèves avec read_students(input_path, manifest).
+    """
+    from classes.streaming_planner import StreamingPlanner
+
+    def step(message: str) -> None:
+        if on_step is not None:
+            on_step(message)
+
+    started_at = datetime.now().isoformat(timespec="seconds")
+    durations: Dict[str, float] = {}
+
+    t0 = time.perf_counter()
+    input_sha256 = hash_file(input_path)
+    durations["hash"] = time.perf_counter() - t0
+
+    step("Calcul des groupes par spécialité...")
+    t0 = time.perf_counter()
+    if groups_per_specialty is None:
+        groups_per_specialty = compute_groups_per_specialty(
+            apply_corrections(iter_students(input_path), corrections),
+            time_slots,
+            min_per_group,
+            max_per_group,
+            max_groups_per_spe,
+        )
+    durations["groups"] = time.perf_counter() - t0
+
+    step("Répartition des élèves (lecture en flux)...")
+    t0 = time.perf_counter()
+    planner = StreamingPlanner(
+        time_slots=time_slots,
+        groups_per_specialty=groups_per_specialty,
+        max_per_group=max_per_group,
+        workdir=workdir,
+    )
+    planner.plan(apply_corrections(iter_students(input_path), corrections))
+    durations["plan"] = time.perf_counter() - t0
+
+    if not planner.num_students:
+        planner.cleanup()
+        raise ValueError("Le fichier ne contient aucun élève.")
+
+    t0 = time.perf_counter()
+    plan_sha256 = streaming_plan_fingerprint(
+        planner.iter_planned_students(apply_corrections(iter_students(input_path), corrections))
+    )
+    durations["fingerprint"] = time.perf_counter() - t0
+
+    manifest = RunManifest(
+        input_path=input_path,
+        input_sha256=input_sha256,
+        time_slots=[(ts.index, ts.label) for ts in time_slots],
+        min_per_group=min_per_group,
+        max_per_group=max_per_group,
+        max_groups_per_spe=max_groups_per_spe,
+        groups_per_specialty=dict(groups_per_specialty),
+        strategy="streaming",
+        started_at=started_at,
+        durations=durations,
+        num_students=planner.num_students,
+        num_unplaced=planner.num_unplaced,
+        group_sizes=size_distribution(planner),
+        plan_sha256=plan_sha256,
+        corrections=dict(corrections or {}),
+    )
+    return planner, manifest
+
+
+def read_students(input_path: str, manifest: RunManifest) -> Iterable[Student]:
+    """Relit les élèves d'une exécution, avec ses corrections (mode flux)."""
+    return apply_corrections(iter_students(input_path), manifest.corrections)
+
+
+def replay_manifest(
+    manifest: RunManifest,
+    input_path: Optional[str] = None,
+) -> Tuple[Iterable[Student], Planner, RunManifest]:
+    """
+    Rejoue une exécution. Lève ValueError si le fichier d'entrée a changé
+    ou si le résultat diffère de celui enregistré.
+
+    En mode "streaming", les élèves sont renvoyés sous forme d'itérateur
+    (relu depuis le fichier d'entrée).
+    """
+    input_path = input_path or manifest.input_path
+    if hash_file(input_path) != manifest.input_sha256:
+        raise ValueError(
+            f"Le fichier {input_path} ne correspond pas à celui du manifeste "
+            "(empreinte différente)."
+        )
+
+    if manifest.strategy == "streaming":
+        planner, replayed = run_streaming_planning(
+            input_path,
+            manifest.get_time_slots(),
+            manifest.min_per_group,
+            manifest.max_per_group,
+            manifest.max_groups_per_spe,
+            groups_per_specialty=manifest.groups_per_specialty,
+            corrections=manifest.corrections,
+        )
+        if manifest.plan_sha256 and replayed.plan_sha256 != manifest.plan_sha256:
+            raise ValueError("Le rejeu ne reproduit pas le planning enregistré.")
+        return planner.iter_planned_students(read_students(input_path, manifest)), planner, replayed
+
+    # ex. pas de limite de temps au rejeu : les paramètres fixent le nombre d'itérations
+    strategy_params = {
+        **manifest.strategy_params,
+        **get_strategy(manifest.strategy).replay_params,
+    }
+
+    students, planner, replayed = run_planning(
+        input_path,
+        manifest.get_time_slots(),
+        manifest.min_per_group,
+        manifest.max_per_group,
+        manifest.max_groups_per_spe,
+        seed=manifest.seed,
+        groups_per_specialty=manifest.groups_per_specialty,
+        strategy=manifest.strategy,
+        strategy_params=strategy_params,
+        rebalance=manifest.rebalance,
+        corrections=manifest.corrections,
+    )
+    if manifest.plan_sha256 and replayed.plan_sha256 != manifest.plan_sha256:
+        raise ValueError("Le rejeu ne reproduit pas le planning enregistré.")
+    return students, planner, replayed
+
+
+# --- Lecture / écriture -----------------------------------------------------
+
+def save_manifest(path: str, manifest: RunManifest) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(asdict(manifest), f, ensure_ascii=False, indent=2)
+
+
+def load_manifest(path: str) -> RunManifest:
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    if data.get("version") != MANIFEST_VERSION:
+        raise ValueError(f"Version de manifeste non prise en charge : {data.get('version')}")
+    data["time_slots"] = [tuple(ts) for ts in data["time_slots"]]
+    # clés JSON toujours en texte
+    data["group_sizes"] = {int(k): v for k, v in data.get("group_sizes", {}).items()}
+    return RunManifest(**data)
+
+
+# --- Comparaison ------------------------------------------------------------
+
+def diff_plans(before: List[Student], after: List[Student]) -> List[StudentDiff]:
+    """
+    Compare les affectations de deux plannings.
+
+    Les élèves sont appariés par (nom, classe, vœux) via un index ; les
+    homonymes parfaits sont appariés dans leur ordre d'apparition.
+    """
+    index: Dict[Tuple, List[Student]] = defaultdict(list)
+    for st in before:
+        index[_student_key(st)].append(st)
+    # on consomme les homonymes dans l'ordre
+    for students in index.values():
+        students.reverse()
+
+    diffs: List[StudentDiff] = []
+    for st in after:
+        matches = index.get(_student_key(st))
+        old = matches.pop() if matches else None
+        old_cells = _assignment_cells(old) if old is not None else {}
+        new_cells = _assignment_cells(st)
+        if old is None:
+            diffs.append(StudentDiff(st.name, st.classe, "ajouté", {}, new_cells))
+        elif old_cells != new_cells:
+            diffs.append(StudentDiff(st.name, st.classe, "modifié", old_cells, new_cells))
+
+    # élèves présents uniquement dans le premier planning
+    for students in index.values():
+        for old in reversed(students):
+            diffs.append(StudentDiff(old.name, old.classe, "supprimé", _assignment_cells(old), {}))
+
+    return diffs
@@ -0,0 +1,404 @@
+# utils/pdf.py
+"""
+Export PDF imprimable, sans dépendance externe :
+- une page d'emploi du temps par élève ;
+- une feuille d'appel par groupe (une colonne par créneau) ;
+- la liste des élèves non placés.
+
+Le quadrillage, les en-têtes et les libellés de créneaux, identiques sur
+toutes les pages d'un même document, sont écrits une seule fois sous forme
+de modèle (Form XObject) ; chaque page ne contient que ses textes propres.
+Les pages sont rendues par lots (éventuellement dans plusieurs processus)
+et écrites sur le disque au fur et à mesure.
+"""
+from __future__ import annotations
+import os
+import zlib
+from collections import defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Iterable, Iterator, Optional, Tuple
+from classes.models import TimeSlot, GroupRecord
+from utils.utils import PlanningMatrix
+
+PAGE_WIDTH = 595    # A4, en points
+PAGE_HEIGHT = 842
+MARGIN = 40
+
+BATCH_SIZE = 200
+# En dessous, le coût des processus dépasse le gain
+MIN_PARALLEL_PAGES = 2000
+# Lots en cours de rendu par processus : la mémoire reste bornée
+BATCHES_IN_FLIGHT_PER_WORKER = 2
+
+ROSTER_ROWS_PER_PAGE = 30
+ROSTER_ROW_HEIGHT = 22
+TABLE_ROWS_PER_PAGE = 32
+TABLE_ROW_HEIGHT = 20
+
+FONTS = {"F1": "Helvetica", "F2": "Helvetica-Bold"}
+
+
+# --- Primitives ---------------------------------------------------------------
+
+def _pdf_string(text: str) -> bytes:
+    raw = str(text).encode("cp1252", "replace")
+    return b"(" + raw.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)") + b")"
+
+
+def _fit(text: str, width: float, size: float) -> str:
+    """Tronque un texte à la largeur donnée (largeur moyenne Helvetica ~ 0,5 em)."""
+    max_chars = max(1, int(width / (size * 0.5)))
+    text = str(text)
+    return text if len(text) <= max_chars else text[:max_chars - 1] + "…"
+
+
+def _text(x: float, y: float, text: str, size: float = 10, font: str = "F1") -> bytes:
+    return b"BT /%s %g Tf %g %g Td %s Tj ET\n" % (font.encode(), size, x, y, _pdf_string(text))
+
+
+def _rect(x: float, y: float, w: float, h: float) -> bytes:
+    return b"%g %g %g %g re S\n" % (x, y, w, h)
+
+
+def _hline(x1: float, x2: float, y: float) -> bytes:
+    return b"%g %g m %g %g l S\n" % (x1, y, x2, y)
+
+
+def _vline(x: float, y1: float, y2: float) -> bytes:
+    return b"%g %g m %g %g l S\n" % (x, y1, x, y2)
+
+
+class PdfWriter:
+    """
+    Écriture d'un PDF objet par objet, directement dans le fichier.
+
+    Seuls les décalages des objets et les numéros des pages restent en
+    mémoire ; la table des pages et le xref sont écrits à la fermeture.
+    """
+
+    CATALOG = 1
+    PAGES = 2
+
+    def __init__(self, path: str) -> None:
+        self.f = open(path, "wb")
+        self.f.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        self._offsets: Dict[int, int] = {}
+        self._next = 3
+        self._pages: List[int] = []
+
+        self.fonts = {}
+        for name, base_font in FONTS.items():
+            num = self._object(
+                b"<< /Type /Font /Subtype /Type1 /BaseFont /%s /Encoding /WinAnsiEncoding >>"
+                % base_font.encode()
+            )
+            self.fonts[name] = num
+        self._font_resources = b"/Font << %s >>" % b" ".join(
+            b"/%s %d 0 R" % (name.encode(), num) for name, num in self.fonts.items()
+        )
+        self._templates: Dict[str, int] = {}
+
+    def _reserve(self) -> int:
+        num = self._next
+        self._next += 1
+        return num
+
+    def _write(self, num: int, body: bytes) -> None:
+        self._offsets[num] = self.f.tell()
+        self.f.write(b"%d 0 obj\n" % num + body + b"\nendobj\n")
+
+    def _object(self, body: bytes) -> int:
+        num = self._reserve()
+        self._write(num, body)
+        return num
+
+    def _stream(self, extra: bytes, compressed: bytes) -> int:
+        return self._object(
+            b"<< %s /Length %d /Filter /FlateDecode >>\nstream\n" % (extra, len(compressed))
+            + compressed + b"\nendstream"
+        )
+
+    def add_template(self, name: str, content: bytes) -> None:
+        """Modèle commun à toutes les pages (appelé par « /name Do »)."""
+        self._templates[name] = self._stream(
+            b"/Type /XObject /Subtype /Form /BBox [0 0 %d %d] /Resources << %s >>"
+            % (PAGE_WIDTH, PAGE_HEIGHT, self._font_resources),
+            zlib.compress(content),
+        )
+
+    def add_page(self, compressed_content: bytes) -> None:
+        contents = self._stream(b"", compressed_content)
+        xobjects = b" ".join(
+            b"/%s %d 0 R" % (name.encode(), num) for name, num in self._templates.items()
+        )
+        self._pages.append(self._object(
+            b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 %d %d] "
+            b"/Resources << %s /XObject << %s >> >> /Contents %d 0 R >>"
+            % (self.PAGES, PAGE_WIDTH, PAGE_HEIGHT, self._font_resources, xobjects, contents)
+        ))
+
+    def close(self) -> None:
+        kids = b" ".join(b"%d 0 R" % num for num in self._pages)
+        self._write(self.PAGES, b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, len(self._pages)))
+        self._write(self.CATALOG, b"<< /Type /Catalog /Pages %d 0 R >>" % self.PAGES)
+
+        xref_offset = self.f.tell()
+        size = self._next
+        self.f.write(b"xref\n0 %d\n0000000000 65535 f \n" % size)
+        for num in range(1, size):
+            self.f.write(b"%010d 00000 n \n" % self._offsets[num])
+        self.f.write(
+            b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n"
+            % (size, self.CATALOG, xref_offset)
+        )
+        self.f.close()
+
+
+# --- Mises en page --------------------------------------------------------------
+
+# Emploi du temps élève : une ligne par créneau
+TT_TOP = PAGE_HEIGHT - 140
+TT_ROW = 48
+TT_COLS = (MARGIN, MARGIN + 130, PAGE_WIDTH - MARGIN - 90, PAGE_WIDTH - MARGIN)
+
+
+def _timetable_template(slot_labels: List[str]) -> bytes:
+    x0, x1, x2, x3 = TT_COLS
+    bottom = TT_TOP - TT_ROW * (len(slot_labels) + 1)
+    ops = [b"0.5 w\n", _rect(x0, bottom, x3 - x0, TT_TOP - bottom)]
+    ops.append(_text(x0 + 8, TT_TOP - 30, "Créneau", 11, "F2"))
+    ops.append(_text(x1 + 8, TT_TOP - 30, "Spécialité", 11, "F2"))
+    ops.append(_text(x2 + 8, TT_TOP - 30, "Groupe", 11, "F2"))
+    for i, label in enumerate(slot_labels, start=1):
+        y = TT_TOP - TT_ROW * i
+        ops.append(_hline(x0, x3, y))
+        ops.append(_text(x0 + 8, y - 30, label, 11))
+    ops.append(_vline(x1, bottom, TT_TOP))
+    ops.append(_vline(x2, bottom, TT_TOP))
+    return b"".join(ops)
+
+
+def _timetable_page(page: Tuple[str, str, List[Tuple[int, str, int]]]) -> bytes:
+    name, classe, cells = page
+    x0, x1, x2, x3 = TT_COLS
+    ops = [
+        b"/TT Do\n",
+        _text(x0, PAGE_HEIGHT - 70, _fit(name, x3 - x0, 20), 20, "F2"),
+        _text(x0, PAGE_HEIGHT - 95, f"Classe : {classe}" if classe else "", 12),
+    ]
+    for slot_idx, spe, group_idx in cells:
+        y = TT_TOP - TT_ROW * (slot_idx + 1) - 30
+        ops.append(_text(x1 + 8, y, _fit(spe, x2 - x1 - 16, 13), 13))
+        ops.append(_text(x2 + 8, y, f"g{group_idx + 1}", 13))
+    if not cells:
+        ops.append(_text(x0, TT_TOP - TT_ROW * 7, "Non placé", 13, "F2"))
+    return b"".join(ops)
+
+
+# Feuille d'appel : une colonne par créneau
+ROSTER_TOP = PAGE_HEIGHT - 110
+
+
+def _roster_template(slot_labels: List[str]) -> bytes:
+    width = (PAGE_WIDTH - 2 * MARGIN) / len(slot_labels)
+    bottom = ROSTER_TOP - ROSTER_ROW_HEIGHT * (ROSTER_ROWS_PER_PAGE + 1)
+    ops = [b"0.5 w\n", _rect(MARGIN, bottom, PAGE_WIDTH - 2 * MARGIN, ROSTER_TOP - bottom)]
+    for i, label in enumerate(slot_labels):
+        x = MARGIN + i * width
+        if i:
+            ops.append(_vline(x, bottom, ROSTER_TOP))
+        ops.append(_text(x + 4, ROSTER_TOP - 15, _fit(label, width - 8, 10), 10, "F2"))
+    for row in range(1, ROSTER_ROWS_PER_PAGE + 1):
+        ops.append(_hline(MARGIN, PAGE_WIDTH - MARGIN, ROSTER_TOP - ROSTER_ROW_HEIGHT * row))
+    ops.append(_text(MARGIN, 55, "Professeur : ____________________    Salle : ____________", 10))
+    return b"".join(ops)
+
+
+def _roster_page(page: Tuple[str, List[List[str]]]) -> bytes:
+    title, columns = page
+    width = (PAGE_WIDTH - 2 * MARGIN) / len(columns)
+    ops = [b"/RO Do\n", _text(MARGIN, PAGE_HEIGHT - 70, title, 20, "F2")]
+    for i, names in enumerate(columns):
+        x = MARGIN + i * width + 4
+        for row, name in enumerate(names, start=1):
+            y = ROSTER_TOP - ROSTER_ROW_HEIGHT * row - 15
+            ops.append(_text(x, y, _fit(name, width - 8, 9), 9))
+    return b"".join(ops)
+
+
+# Tableau simple (non placés)
+TABLE_TOP = PAGE_HEIGHT - 100
+UNPLACED_WIDTHS = (130, 50, 150, 80, 105)
+
+
+def _table_template(header: List[str], widths: Tuple[int, ...]) -> bytes:
+    ops = [b"0.5 w\n"]
+    x = MARGIN
+    for label, width in zip(header, widths):
+        ops.append(_text(x + 3, TABLE_TOP - 14, _fit(label, width - 6, 9), 9, "F2"))
+        x += width
+    ops.append(_hline(MARGIN, PAGE_WIDTH - MARGIN, TABLE_TOP - TABLE_ROW_HEIGHT))
+    return b"".join(ops)
+
+
+def _table_page(page: Tuple[str, List[List[str]]]) -> bytes:
+    title, rows = page
+    ops = [b"/TB Do\n", _text(MARGIN, PAGE_HEIGHT - 70, title, 18, "F2")]
+    for row_idx, row in enumerate(rows, start=1):
+        y = TABLE_TOP - TABLE_ROW_HEIGHT * row_idx - 14
+        x = MARGIN
+        for value, width in zip(row, UNPLACED_WIDTHS):
+            ops.append(_text(x + 3, y, _fit(value, width - 6, 8), 8))
+            x += width
+    return b"".join(ops)
+
+
+_RENDERERS = {
+    "timetable": _timetable_page,
+    "roster": _roster_page,
+    "table": _table_page,
+}
+
+
+def _render_batch(kind: str, pages: List[object]) -> List[bytes]:
+    """Rend et compresse un lot de pages (éventuellement dans un processus)."""
+    render = _RENDERERS[kind]
+    return [zlib.compress(render(page)) for page in pages]
+
+
+def _batches(pages: Iterable[object], size: int) -> Iterator[List[object]]:
+    batch = []
+    for page in pages:
+        batch.append(page)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _write_pages(
+    writer: PdfWriter,
+    kind: str,
+    pages: Iterable[object],
+    num_pages: int,
+    workers: Optional[int],
+) -> None:
+    if workers is None:
+        workers = (os.cpu_count() or 1) if num_pages >= MIN_PARALLEL_PAGES else 1
+
+    batches = _batches(pages, BATCH_SIZE)
+    if workers <= 1:
+        for batch in batches:
+            for content in _render_batch(kind, batch):
+                writer.add_page(content)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # lots soumis au fur et à mesure (executor.map lirait tous les lots
+        # d'emblée) et écrits dans l'ordre dès que le plus ancien est rendu
+        in_flight = deque()
+        for batch in batches:
+            in_flight.append(executor.submit(_render_batch, kind, batch))
+            if len(in_flight) >= workers * BATCHES_IN_FLIGHT_PER_WORKER:
+                for content in in_flight.popleft().result():
+                    writer.add_page(content)
+        while in_flight:
+            for content in in_flight.popleft().result():
+                writer.add_page(content)
+
+
+# --- Exports ----------------------------------------------------------------------
+
+def export_timetables_pdf(
+    path: str,
+    matrices: Iterable[PlanningMatrix],
+    time_slots: List[TimeSlot],
+    workers: Optional[int] = None,
+    num_students: Optional[int] = None,
+) -> None:
+    """
+    Une page d'emploi du temps par élève, à partir des blocs élèves ×
+    créneaux (voir utils.utils.iter_planning_matrices).
+    num_students: nombre de pages attendu, s'il est connu (rendu parallèle).
+    """
+    pages = (
+        (
+            name,
+            classe,
+            [(col, *matrix.labels.cells[code]) for col, code in enumerate(row) if code],
+        )
+        for matrix in matrices
+        for name, classe, row in matrix.code_rows()
+    )
+
+    writer = PdfWriter(path)
+    try:
+        writer.add_template("TT", _timetable_template([ts.label for ts in time_slots]))
+        _write_pages(writer, "timetable", pages, num_students or 0, workers)
+    finally:
+        writer.close()
+
+
+def iter_roster_pages(
+    groups: Iterable[Tuple[str, Iterable[GroupRecord]]],
+    time_slots: List[TimeSlot],
+) -> Iterator[Tuple[str, List[List[str]]]]:
+    """
+    (titre, noms par créneau) : une page par groupe, ou plus s'il déborde.
+    Les enregistrements arrivent regroupés par spé, traitée une à une.
+    """
+    for spe, records in groups:
+        by_group: Dict[int, Dict[int, List[str]]] = defaultdict(lambda: defaultdict(list))
+        for r in records:
+            by_group[r.group_index][r.timeslot.index].append(r.student_name)
+
+        for group_idx, slots in sorted(by_group.items()):
+            columns = [sorted(slots.get(ts.index, [])) for ts in time_slots]
+            longest = max((len(c) for c in columns), default=0)
+            num_pages = max(1, -(-longest // ROSTER_ROWS_PER_PAGE))
+            for page in range(num_pages):
+                title = f"{spe} g{group_idx + 1}"
+                if num_pages > 1:
+                    title += f" ({page + 1}/{num_pages})"
+                start = page * ROSTER_ROWS_PER_PAGE
+                yield title, [c[start:start + ROSTER_ROWS_PER_PAGE] for c in columns]
+
+
+def export_group_rosters_pdf(
+    path: str,
+    groups: Iterable[Tuple[str, Iterable[GroupRecord]]],
+    time_slots: List[TimeSlot],
+    workers: Optional[int] = None,
+) -> None:
+    """Une feuille d'appel par groupe (enregistrements regroupés par spé)."""
+    writer = PdfWriter(path)
+    try:
+        writer.add_template("RO", _roster_template([ts.label for ts in time_slots]))
+        # peu de pages (une par groupe) : rendu dans ce processus
+        _write_pages(writer, "roster", iter_roster_pages(groups, time_slots), 0, workers)
+    finally:
+        writer.close()
+
+
+def export_unplaced_pdf(
+    path: str,
+    header: List[str],
+    rows: Iterable[List[str]],
+) -> None:
+    """Liste des élèves non placés, en tableau."""
+    rows = list(rows)
+    pages = [
+        (
+            f"Élèves non placés ({start + 1}-{min(start + TABLE_ROWS_PER_PAGE, len(rows))} / {len(rows)})",
+            rows[start:start + TABLE_ROWS_PER_PAGE],
+        )
+        for start in range(0, len(rows), TABLE_ROWS_PER_PAGE)
+    ] or [("Élèves non placés (aucun)", [])]
+
+    writer = PdfWriter(path)
+    try:
+        writer.add_template("TB", _table_template(header, UNPLACED_WIDTHS))
+        _write_pages(writer, "table", pages, len(pages), workers=1)
+    finally:
+        writer.close()
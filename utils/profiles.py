@@ -0,0 +1,246 @@
+# utils/profiles.py
+"""
+Profils de configuration nommés (un fichier JSON par profil) : créneaux,
+paramètres des groupes, colonnes du fichier d'élèves et stratégie.
+
+Chaque profil garde aussi les résultats de la dernière exécution qui ne
+dépendent que du fichier et des paramètres (artefacts) : registre des
+spécialités et nombre de groupes par spécialité. Tant que le fichier
+d'élèves et les paramètres sont inchangés, ils sont repris tels quels
+au lieu d'être recalculés.
+
+Les profils sont rangés dans le dossier de configuration de l'utilisateur
+(voir profiles_dir), ou dans PLANIFICATION_SPE_CONFIG s'il est défini.
+"""
+from __future__ import annotations
+import json
+import os
+import re
+import threading
+import unicodedata
+from dataclasses import dataclass, field, asdict
+from typing import List, Dict, Optional, Tuple, Callable
+from classes.models import TimeSlot, Student
+from classes.planner import Planner
+from utils.csv_format import ColumnMapping
+from utils.formats import detect_mapping
+from utils.manifest import RunManifest, run_planning, hash_file
+
+PROFILE_VERSION = 1
+APP_DIR_NAME = "planification_spe"
+
+DEFAULT_TIME_SLOTS = [
+    (0, "09:00-09:25"),
+    (1, "09:30-09:55"),
+    (2, "10:05-10:30"),
+    (3, "10:35-11:00"),
+    (4, "11:00-11:25"),
+]
+# Limites par défaut, sans profil ou pour un nouveau profil (questions de
+# main.py, --benchmark, --forecast, service partagé)
+DEFAULT_MIN_PER_GROUP = 5
+DEFAULT_MAX_PER_GROUP = 8
+DEFAULT_MAX_GROUPS_PER_SPECIALTY = 6
+
+
+@dataclass
+class ProfileArtefacts:
+    """Résultats réutilisables, valables pour un fichier et des paramètres donnés."""
+    key: Dict[str, object]                  # voir Profile.artefacts_key
+    specialties: List[str] = field(default_factory=list)   # registre, par demande décroissante
+    groups_per_specialty: Dict[str, int] = field(default_factory=dict)
+
+
+@dataclass
+class Profile:
+    name: str
+    time_slots: List[Tuple[int, str]] = field(default_factory=lambda: list(DEFAULT_TIME_SLOTS))
+    min_per_group: int = DEFAULT_MIN_PER_GROUP
+    max_per_group: int = DEFAULT_MAX_PER_GROUP
+    max_groups_per_spe: int = DEFAULT_MAX_GROUPS_PER_SPECIALTY
+    strategy: str = "greedy"
+    strategy_params: Dict[str, object] = field(default_factory=dict)
+    rebalance: bool = False
+    seed: Optional[int] = None
+    mapping: Optional[ColumnMapping] = None     # colonnes du dernier fichier (None : détectées)
+    artefacts: Optional[ProfileArtefacts] = None
+    version: int = PROFILE_VERSION
+
+    def get_time_slots(self) -> List[TimeSlot]:
+        return [TimeSlot(index, label) for index, label in self.time_slots]
+
+    def artefacts_key(
+        self,
+        input_sha256: str,
+        corrections: Optional[Dict[str, object]] = None,
+    ) -> Dict[str, object]:
+        """Tout ce dont dépendent les artefacts."""
+        key = {
+            "input_sha256": input_sha256,
+            "num_time_slots": len(self.time_slots),
+            "min_per_group": self.min_per_group,
+            "max_per_group": self.max_per_group,
+            "max_groups_per_spe": self.max_groups_per_spe,
+        }
+        if corrections:
+            key["corrections"] = corrections
+        return key
+
+    def cached_groups(
+        self,
+        input_sha256: str,
+        corrections: Optional[Dict[str, object]] = None,
+    ) -> Optional[Dict[str, int]]:
+        """Groupes par spécialité de la dernière exécution, s'ils sont encore valables."""
+        if self.artefacts is None or self.artefacts.key != self.artefacts_key(input_sha256, corrections):
+            return None
+        return dict(self.artefacts.groups_per_specialty)
+
+    def known_specialties(self) -> Optional[List[str]]:
+        """Registre des spé de la dernière exécution (contrôle du fichier, voir utils.validation)."""
+        if self.artefacts is None or not self.artefacts.specialties:
+            return None
+        return list(self.artefacts.specialties)
+
+    def update_artefacts(self, manifest: RunManifest, students: List[Student]) -> None:
+        demand: Dict[str, int] = {}
+        for st in students:
+            for spe in st.choices:
+                demand[spe] = demand.get(spe, 0) + 1
+        self.artefacts = ProfileArtefacts(
+            key=self.artefacts_key(manifest.input_sha256, manifest.corrections),
+            specialties=sorted(demand, key=lambda spe: (-demand[spe], spe)),
+            groups_per_specialty=dict(manifest.groups_per_specialty),
+        )
+
+
+# --- Stockage ---------------------------------------------------------------
+
+def profiles_dir() -> str:
+    root = os.environ.get("PLANIFICATION_SPE_CONFIG")
+    if not root:
+        if os.name == "nt":
+            base = os.environ.get("APPDATA") or os.path.expanduser("~")
+        else:
+            base = os.environ.get("XDG_CONFIG_HOME") or os.path.join(os.path.expanduser("~"), ".config")
+        root = os.path.join(base, APP_DIR_NAME)
+    return os.path.join(root, "profiles")
+
+
+def _slug(name: str) -> str:
+    text = unicodedata.normalize("NFKD", name)
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    text = re.sub(r"[^A-Za-z0-9]+", "-", text).strip("-").lower()
+    return text or "profil"
+
+
+def profile_path(name: str) -> str:
+    return os.path.join(profiles_dir(), _slug(name) + ".json")
+
+
+def _profile_from_dict(data: Dict[str, object]) -> Profile:
+    if data.get("version") != PROFILE_VERSION:
+        raise ValueError(f"Version de profil non prise en charge : {data.get('version')}")
+    data = dict(data)
+    data["time_slots"] = [tuple(ts) for ts in data["time_slots"]]
+    if data.get("mapping") is not None:
+        data["mapping"] = ColumnMapping(**data["mapping"])
+    if data.get("artefacts") is not None:
+        data["artefacts"] = ProfileArtefacts(**data["artefacts"])
+    return Profile(**data)
+
+
+def save_profile(profile: Profile) -> str:
+    if not profile.name.strip():
+        raise ValueError("Le profil doit avoir un nom.")
+    if profile.min_per_group > profile.max_per_group:
+        raise ValueError("Le minimum par groupe/créneau doit être inférieur ou égal au maximum.")
+
+    path = profile_path(profile.name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(asdict(profile), f, ensure_ascii=False, indent=2)
+    # remplacement atomique : un profil n'est jamais à moitié écrit
+    os.replace(tmp_path, path)
+    return path
+
+
+def load_profile(name: str) -> Profile:
+    path = profile_path(name)
+    if not os.path.exists(path):
+        raise ValueError(f"Profil introuvable : {name}")
+    with open(path, encoding="utf-8") as f:
+        return _profile_from_dict(json.load(f))
+
+
+def list_profiles() -> List[str]:
+    """Noms des profils enregistrés, par ordre alphabétique."""
+    folder = profiles_dir()
+    if not os.path.isdir(folder):
+        return []
+    names = []
+    for filename in os.listdir(folder):
+        if not filename.endswith(".json"):
+            continue
+        try:
+            with open(os.path.join(folder, filename), encoding="utf-8") as f:
+                names.append(json.load(f)["name"])
+        except (OSError, ValueError, KeyError):
+            continue    # fichier illisible : ignoré
+    return sorted(names, key=str.lower)
+
+
+def delete_profile(name: str) -> None:
+    path = profile_path(name)
+    if os.path.exists(path):
+        os.remove(path)
+
+
+# --- Exécution --------------------------------------------------------------
+
+def run_profile(
+    profile: Profile,
+    input_path: str,
+    on_step: Optional[Callable[[str], None]] = None,
+    save: bool = True,
+    on_snapshot: Optional[Callable[[object], None]] = None,
+    cancel_event: Optional[threading.Event] = None,
+    corrections: Optional[Dict[str, object]] = None,
+) -> Tuple[List[Student], Planner, RunManifest]:
+    """
+    run_planning avec les paramètres du profil. Les groupes par spécialité
+    et les colonnes sont repris du profil si le fichier et les paramètres
+    n'ont pas changé ; les artefacts sont ensuite mis à jour (et le profil
+    enregistré si save). on_snapshot / cancel_event / corrections : voir
+    run_planning.
+    """
+    input_sha256 = hash_file(input_path)
+    groups_per_specialty = profile.cached_groups(input_sha256, corrections)
+    # un autre fichier peut avoir d'autres colonnes : elles sont alors détectées
+    mapping = profile.mapping if groups_per_specialty is not None else None
+
+    students, planner, manifest = run_planning(
+        input_path,
+        profile.get_time_slots(),
+        profile.min_per_group,
+        profile.max_per_group,
+        profile.max_groups_per_spe,
+        seed=profile.seed,
+        groups_per_specialty=groups_per_specialty,
+        on_step=on_step,
+        strategy=profile.strategy,
+        strategy_params=dict(profile.strategy_params) or None,
+        rebalance=profile.rebalance,
+        mapping=mapping,
+        input_sha256=input_sha256,
+        on_snapshot=on_snapshot,
+        cancel_event=cancel_event,
+        corrections=corrections,
+    )
+    if mapping is None:
+        profile.mapping = detect_mapping(input_path)
+    profile.update_artefacts(manifest, students)
+    if save:
+        save_profile(profile)
+    return students, planner, manifest
@@ -0,0 +1,214 @@
+# utils/stats.py
+"""
+Statistiques d'un planning : remplissage par spécialité, histogramme des
+effectifs, occupation des créneaux, satisfaction des vœux et combinaisons
+de spécialités les plus demandées.
+
+Les effectifs sont lus dans les compteurs du planner (une case par
+spé / créneau / groupe) ; les élèves ne sont parcourus qu'une fois, ce qui
+permet aussi de passer l'itérateur du mode flux (voir StreamingPlanner).
+"""
+from __future__ import annotations
+import json
+import os
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import List, Dict, Optional, Tuple, Iterable
+from classes.models import Student
+from classes.planner import Planner
+from utils.utils import write_csv_rows
+
+DEFAULT_TOP_COMBINATIONS = 15
+
+
+@dataclass
+class SpecialtyStats:
+    specialty: str
+    demand: int                 # élèves l'ayant demandée
+    placed: int                 # élèves effectivement placés
+    groups: int
+    capacity: Optional[int]     # groupes x créneaux x max_per_group (None si pas de max)
+    min_size: int               # plus petite case non vide
+    max_size: int
+    mean_size: float            # moyenne sur les cases non vides
+
+    @property
+    def fill_rate(self) -> Optional[float]:
+        if not self.capacity:
+            return None
+        return self.placed / self.capacity
+
+
+@dataclass
+class SlotStats:
+    label: str
+    students: int               # places occupées sur le créneau
+    capacity: Optional[int]
+
+    @property
+    def utilisation(self) -> Optional[float]:
+        if not self.capacity:
+            return None
+        return self.students / self.capacity
+
+
+@dataclass
+class PlanStats:
+    num_students: int = 0
+    num_placed: int = 0
+    first_choice_rate: float = 0.0   # élèves ayant obtenu leur 1er vœu
+    choices_rate: float = 0.0        # vœux satisfaits / vœux demandés
+    specialties: List[SpecialtyStats] = field(default_factory=list)
+    slots: List[SlotStats] = field(default_factory=list)
+    size_histogram: Dict[int, int] = field(default_factory=dict)  # effectif -> nb de cases
+    combinations: List[Tuple[Tuple[str, ...], int]] = field(default_factory=list)
+
+    def tables(self) -> Dict[str, Tuple[List[str], List[List[object]]]]:
+        """Sections titre -> (en-tête, lignes), pour l'affichage et les exports."""
+        def pct(value: Optional[float]) -> object:
+            return "" if value is None else round(100 * value, 1)
+
+        return {
+            "Résumé": (
+                ["Indicateur", "Valeur"],
+                [
+                    ["Élèves", self.num_students],
+                    ["Élèves placés", self.num_placed],
+                    ["Élèves non placés", self.num_students - self.num_placed],
+                    ["1er vœu obtenu (%)", pct(self.first_choice_rate)],
+                    ["Vœux satisfaits (%)", pct(self.choices_rate)],
+                ],
+            ),
+            "Spécialités": (
+                [
+                    "Spécialité", "Demandes", "Placés", "Groupes", "Capacité",
+                    "Remplissage (%)", "Effectif min", "Effectif max", "Effectif moyen",
+                ],
+                [
+                    [
+                        s.specialty, s.demand, s.placed, s.groups,
+                        "" if s.capacity is None else s.capacity,
+                        pct(s.fill_rate), s.min_size, s.max_size, round(s.mean_size, 1),
+                    ]
+                    for s in self.specialties
+                ],
+            ),
+            "Créneaux": (
+                ["Créneau", "Places occupées", "Capacité", "Occupation (%)"],
+                [
+                    [s.label, s.students, "" if s.capacity is None else s.capacity,
+                     pct(s.utilisation)]
+                    for s in self.slots
+                ],
+            ),
+            "Effectifs des groupes": (
+                ["Effectif", "Nombre de groupes"],
+                [[size, n] for size, n in sorted(self.size_histogram.items())],
+            ),
+            "Combinaisons": (
+                ["Spécialités", "Élèves"],
+                [[" + ".join(combo), n] for combo, n in self.combinations],
+            ),
+        }
+
+
+def compute_stats(
+    students: Iterable[Student],
+    planner: Planner,
+    top_combinations: int = DEFAULT_TOP_COMBINATIONS,
+) -> PlanStats:
+    stats = PlanStats()
+    max_per_group = planner.max_per_group
+
+    # --- un passage sur les élèves ---
+    demand = Counter()
+    placed = Counter()
+    combos = Counter()
+    first_choice_total = 0
+    first_choice_ok = 0
+    requested = 0
+    satisfied = 0
+
+    for st in students:
+        stats.num_students += 1
+        assigned = {a.specialty for a in st.assignments.values()}
+        if assigned or not st.choices:
+            stats.num_placed += 1
+        demand.update(st.choices)
+        placed.update(assigned)
+        requested += len(st.choices)
+        satisfied += len(assigned)
+        if st.choices:
+            first_choice_total += 1
+            first_choice_ok += st.choices[0] in assigned
+            combos[tuple(sorted(st.choices))] += 1
+
+    stats.first_choice_rate = first_choice_ok / first_choice_total if first_choice_total else 0.0
+    stats.choices_rate = satisfied / requested if requested else 0.0
+    stats.combinations = combos.most_common(top_combinations)
+
+    # --- un passage sur les compteurs du planner ---
+    num_slots = len(planner.time_slots)
+    slot_students = [0] * num_slots
+    slot_groups = [0] * num_slots
+    histogram = Counter()
+
+    for spe, counts in sorted(planner.iter_counts()):
+        nb_groups = len(counts[0])
+        sizes = []
+        for slot_idx, row in enumerate(counts):
+            slot_students[slot_idx] += sum(row)
+            slot_groups[slot_idx] += nb_groups
+            sizes.extend(c for c in row if c > 0)
+        histogram.update(sizes)
+
+        stats.specialties.append(
+            SpecialtyStats(
+                specialty=spe,
+                demand=demand[spe],
+                placed=placed[spe],
+                groups=nb_groups,
+                capacity=None if max_per_group is None else nb_groups * num_slots * max_per_group,
+                min_size=min(sizes, default=0),
+                max_size=max(sizes, default=0),
+                mean_size=sum(sizes) / len(sizes) if sizes else 0.0,
+            )
+        )
+
+    stats.slots = [
+        SlotStats(
+            label=ts.label,
+            students=slot_students[i],
+            capacity=None if max_per_group is None else slot_groups[i] * max_per_group,
+        )
+        for i, ts in enumerate(planner.time_slots)
+    ]
+    stats.size_histogram = dict(histogram)
+    return stats
+
+
+def export_stats(path: str, stats: PlanStats) -> None:
+    """
+    .csv : une section par tableau (titre, en-tête, lignes, ligne vide).
+    .json : {section: [ {colonne: valeur}, ... ]}.
+    """
+    ext = os.path.splitext(path)[1].lower()
+    tables = stats.tables()
+
+    if ext == ".csv":
+        def rows():
+            for title, (header, table_rows) in tables.items():
+                yield [title]
+                yield header
+                yield from table_rows
+                yield []
+        write_csv_rows(path, rows())
+    elif ext == ".json":
+        data = {
+            title: [dict(zip(header, row)) for row in table_rows]
+            for title, (header, table_rows) in tables.items()
+        }
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+    else:
+        raise ValueError(f"Format de statistiques non pris en charge : {path} (.csv ou .json)")
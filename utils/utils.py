@@ -2,9 +2,16 @@
 from __future__ import annotations
 from collections import defaultdict, Counter
 import csv
+import io
 import math
-from typing import List, Dict
+from itertools import islice
+from types import MappingProxyType
+from typing import List, Dict, Iterable, Iterator, Mapping, Optional, Tuple, Callable
 from classes.models import Student, TimeSlot, GroupRecord, UnplacedStudent
+from utils.csv_format import SNIFF_BYTES, ColumnMapping, detect_csv_format
+
+# Élèves par bloc lors de l'export du planning par élève
+EXPORT_CHUNK_SIZE = 4096
 
 # Noms de colonnes du fichier d'entrée (ton CSV)
 NAME_COL = "Nom des élèves"
@@ -17,13 +24,61 @@ CHOICE_COLS = [
     "Indiquez la cinquième spécialité à laquelle vous voulez participer.",
 ]
 
-def load_students_from_csv(path: str, delimiter: str = ";") -> List[Student]:
-    students: List[Student] = []
-    with open(path, encoding="utf-8-sig", newline="") as f:
-        reader = csv.DictReader(f, delimiter=delimiter)
+def student_from_row(row: Dict[str, object], mapping: ColumnMapping) -> Optional[Student]:
+    """
+    Construit un élève à partir d'une ligne (colonne -> valeur).
+
+    Retourne None pour une ligne sans nom. Utilisé par tous les formats
+    d'import (CSV, Excel, JSON).
+    """
+    def cell(col: str) -> str:
+        value = row.get(col)
+        return "" if value is None else str(value).strip()
+
+    name = " ".join(part for part in (cell(col) for col in mapping.name_cols) if part)
+    if not name:
+        # ligne vide / anonyme => on skip (ex: ta 2de6 sans nom)
+        return None
+
+    classe = cell(mapping.class_col) if mapping.class_col else ""
+
+    choices = []
+    for col in mapping.choice_cols:
+        value = row.get(col)
+        # JSON : une colonne peut contenir directement la liste des spé
+        values = value if isinstance(value, list) else [value]
+        for v in values:
+            spe = "" if v is None else str(v).strip()
+            if spe:
+                choices.append(spe)
+
+    return Student(name=name, classe=classe, choices=choices)
+
+
+def iter_students_from_csv(
+    path: str,
+    delimiter: Optional[str] = None,
+    mapping: Optional[ColumnMapping] = None,
+) -> Iterator[Student]:
+    """
+    Lit les élèves un par un.
+
+    Encodage, séparateur et colonnes sont détectés sur un préfixe borné du
+    fichier (sauf si `delimiter` / `mapping` sont fournis) : le fichier
+    n'est ouvert et parcouru qu'une seule fois.
+    """
+    with open(path, "rb") as raw:
+        fmt = detect_csv_format(raw.read(SNIFF_BYTES), delimiter, mapping)
+        raw.seek(0)
+
+        f = io.TextIOWrapper(raw, encoding=fmt.encoding, errors=fmt.errors, newline="")
+        reader = csv.DictReader(f, delimiter=fmt.delimiter)
 
         # sécurité basique : vérifier les colonnes importantes
-        for col in [NAME_COL, CLASS_COL, *CHOICE_COLS]:
+        cols = [*fmt.mapping.name_cols, *fmt.mapping.choice_cols]
+        if fmt.mapping.class_col:
+            cols.append(fmt.mapping.class_col)
+        for col in cols:
             if col not in reader.fieldnames:
                 raise ValueError(
                     f"Colonne manquante dans le fichier : {col}\n"
@@ -31,55 +86,241 @@ def load_students_from_csv(path: str, delimiter: str = ";") -> List[Student]:
                 )
 
         for row in reader:
-            name = (row.get(NAME_COL) or "").strip()
-            if not name:
-                # ligne vide / anonyme => on skip (ex: ta 2de6 sans nom)
-                continue
+            student = student_from_row(row, fmt.mapping)
+            if student is not None:
+                yield student
+
+
+def load_students_from_csv(
+    path: str,
+    delimiter: Optional[str] = None,
+    mapping: Optional[ColumnMapping] = None,
+) -> List[Student]:
+    return list(iter_students_from_csv(path, delimiter, mapping))
 
-            classe = (row.get(CLASS_COL) or "").strip()
 
-            choices = []
-            for col in CHOICE_COLS:
-                spe = (row.get(col) or "").strip()
-                if spe:
-                    choices.append(spe)
+def student_planning_header(time_slots: List[TimeSlot]) -> List[str]:
+    # Les en-têtes = Nom, Classe, puis les heures des créneaux
+    return ["Nom", "Classe"] + [ts.label for ts in time_slots]
+
+
+class CellLabels:
+    """
+    Table code -> libellé « Spé (gN) » des cases d'emploi du temps, remplie
+    à la demande : chaque libellé n'est formaté qu'une fois par export.
+    Le code 0 est la case vide.
+    """
+
+    def __init__(self) -> None:
+        self.labels: List[str] = [""]
+        self.cells: List[Optional[Tuple[str, int]]] = [None]   # code -> (spé, groupe)
+        self._codes: Dict[Tuple[str, int], int] = {}
+        # (spé, groupe) -> code des cases déjà vues, en lecture seule
+        self.known: Mapping[Tuple[str, int], int] = MappingProxyType(self._codes)
 
-            students.append(Student(name=name, classe=classe, choices=choices))
+    def code(self, specialty: str, group_index: int) -> int:
+        return self.code_for((specialty, group_index))
 
-    return students
+    def code_for(self, cell: Tuple[str, int]) -> int:
+        """Code de la case (spé, groupe), créé au premier appel."""
+        code = self._codes.get(cell)
+        if code is None:
+            code = self._codes[cell] = len(self.labels)
+            specialty, group_index = cell
+            self.labels.append(f"{specialty} (g{group_index + 1})")
+            self.cells.append(cell)
+        return code
+
+
+class PlanningMatrix:
+    """
+    Bloc élèves × créneaux du planning par élève : noms, classes et un code
+    de case par élève et par créneau (à plat, ligne par ligne), résolus en
+    libellés par la table partagée CellLabels. Tous les formats d'export
+    partent de ces blocs.
+    """
+
+    def __init__(self, labels: CellLabels, num_slots: int) -> None:
+        self.labels = labels
+        self.num_slots = num_slots
+        self.names: List[str] = []
+        self.classes: List[str] = []
+        self.codes: List[int] = []
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def code_rows(self) -> Iterator[Tuple[str, str, List[int]]]:
+        """(nom, classe, codes des créneaux) pour chaque élève du bloc."""
+        codes, width = self.codes, self.num_slots
+        for i, (name, classe) in enumerate(zip(self.names, self.classes)):
+            yield name, classe, codes[i * width:(i + 1) * width]
+
+    def columns(self) -> List[List[str]]:
+        """Libellés colonne par colonne (un créneau par colonne)."""
+        flat = list(map(self.labels.labels.__getitem__, self.codes))
+        width = self.num_slots
+        return [flat[col::width] for col in range(width)]
+
+    def rows(self) -> Iterator[Tuple[str, ...]]:
+        """Lignes prêtes pour writerows, dans l'ordre de student_planning_header."""
+        # libellés résolus en un seul passage, puis lignes assemblées colonne par colonne
+        return zip(self.names, self.classes, *self.columns())
+
+
+def iter_planning_matrices(
+    students: Iterable[Student],
+    time_slots: List[TimeSlot],
+    chunk_size: int = EXPORT_CHUNK_SIZE,
+) -> Iterator[PlanningMatrix]:
+    """
+    Planning par élève en blocs de chunk_size élèves (table des libellés
+    commune) : une liste d'élèves comme un flux (mode flux) en mémoire bornée.
+    """
+    labels = CellLabels()
+    known = labels.known
+    code_for = labels.code_for
+    positions = {ts.index: col for col, ts in enumerate(time_slots)}
+    width = len(time_slots)
+
+    students = iter(students)
+    while True:
+        chunk = list(islice(students, chunk_size))
+        if not chunk:
+            return
+        matrix = PlanningMatrix(labels, width)
+        matrix.names = [st.name for st in chunk]
+        matrix.classes = [st.classe for st in chunk]
+        codes = [0] * (len(chunk) * width)
+        base = 0
+        for st in chunk:
+            for slot_idx, a in st.assignments.items():
+                col = positions.get(slot_idx)
+                if col is not None:
+                    key = (a.specialty, a.group_index)
+                    codes[base + col] = known.get(key) or code_for(key)
+            base += width
+        matrix.codes = codes
+        yield matrix
+
+
+def iter_coded_planning_matrices(
+    coded_students: Iterable[Tuple[Student, Iterable[int]]],
+    cells: List[Tuple[str, int]],
+    num_slots: int,
+    chunk_size: int = EXPORT_CHUNK_SIZE,
+) -> Iterator[PlanningMatrix]:
+    """
+    Comme iter_planning_matrices, à partir de codes de case déjà calculés
+    (voir StreamingPlanner.iter_coded_students : indice dans cells, -1 pour
+    une case vide) : les affectations ne sont pas recréées.
+    """
+    labels = CellLabels()
+    for spe, group_idx in cells:
+        labels.code(spe, group_idx)     # code = indice dans cells + 1
+
+    matrix = PlanningMatrix(labels, num_slots)
+    for st, row in coded_students:
+        matrix.names.append(st.name)
+        matrix.classes.append(st.classe)
+        matrix.codes.extend([code + 1 for code in row])
+        if len(matrix) >= chunk_size:
+            yield matrix
+            matrix = PlanningMatrix(labels, num_slots)
+    if len(matrix):
+        yield matrix
+
+
+def iter_student_planning_rows(
+    students: Iterable[Student],
+    time_slots: List[TimeSlot],
+) -> Iterator[List[str]]:
+    """Une ligne par élève, dans l'ordre de student_planning_header."""
+    for matrix in iter_planning_matrices(students, time_slots):
+        yield from matrix.rows()
+
+
+def save_planning_matrices(
+    path: str,
+    matrices: Iterable[PlanningMatrix],
+    time_slots: List[TimeSlot],
+    delimiter: str = ";",
+) -> None:
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f, delimiter=delimiter)
+        writer.writerow(student_planning_header(time_slots))
+        for matrix in matrices:
+            writer.writerows(matrix.rows())
 
 
 def save_planning_per_student(
     path: str,
-    students: List[Student],
+    students: Iterable[Student],
     time_slots: List[TimeSlot],
     delimiter: str = ";",
 ) -> None:
-    # Les en-têtes = Nom, Classe, puis les heures des créneaux
-    fieldnames = ["Nom", "Classe"] + [ts.label for ts in time_slots]
+    save_planning_matrices(path, iter_planning_matrices(students, time_slots), time_slots, delimiter)
 
-    with open(path, "w", encoding="utf-8", newline="") as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames, delimiter=delimiter)
-        writer.writeheader()
 
-        for st in students:
-            row = {"Nom": st.name, "Classe": st.classe}
+def group_records_by_specialty(
+    group_records: Iterable[GroupRecord],
+) -> Iterator[Tuple[str, List[GroupRecord]]]:
+    """(spé, enregistrements) par ordre alphabétique de spé, ordre d'origine conservé."""
+    by_spe: Dict[str, List[GroupRecord]] = defaultdict(list)
+    for r in group_records:
+        by_spe[r.specialty].append(r)
+    for spe in sorted(by_spe):
+        yield spe, by_spe[spe]
+
+
+def iter_specialty_block_rows(
+    spe: str,
+    records: Iterable[GroupRecord],
+    time_slots: List[TimeSlot],
+) -> Iterator[List[str]]:
+    """Lignes du format bloc (voir iter_group_block_rows) pour une seule spé."""
+
+    # group_index -> slot_index -> [ noms ]
+    groups_dict = defaultdict(lambda: defaultdict(list))
+    for r in records:
+        groups_dict[r.group_index][r.timeslot.index].append(r.student_name)
+
+    if not groups_dict:
+        return
+
+    max_group_idx = max(groups_dict.keys())
+
+    for g in range(max_group_idx + 1):
+        slots_dict = groups_dict.get(g, {})
+
+        # 1) ligne titre
+        yield [f"{spe} g{g+1}"] + [ts.label for ts in time_slots]
+
+        # 2) 1ere / Term / Salle : vides
+        yield ["1ere"] + [""] * len(time_slots)
+        yield ["Term"] + [""] * len(time_slots)
+        yield ["Salle"] + [""] * len(time_slots)
+
+        # 3) lignes élèves (une par ligne, sous les horaires)
+        max_len = max((len(v) for v in slots_dict.values()), default=0)
+
+        for i in range(max_len):
+            row = [""]
             for ts in time_slots:
-                assignment = st.assignments.get(ts.index)
-                value = ""
-                if assignment is not None:
-                    value = f"{assignment.specialty} (g{assignment.group_index + 1})"
-                # on utilise directement le label d'heure comme clé
-                row[ts.label] = value
-            writer.writerow(row)
+                names_here = slots_dict.get(ts.index, [])
+                cell = names_here[i] if i < len(names_here) else ""
+                row.append(cell)
+            yield row
 
+        yield []  # espace entre groupes
 
-def save_planning_per_group_formatted(
-    path: str,
+    yield []      # espace entre spé
+
+
+def iter_group_block_rows(
     group_records: List[GroupRecord],
     time_slots: List[TimeSlot],
-    delimiter: str = ";",
-) -> None:
+) -> Iterator[List[str]]:
     """
     Format bloc :
 
@@ -90,47 +331,32 @@ def save_planning_per_group_formatted(
             |           |           | ...
             |  Eleve    |           | ...
     """
+    for spe, records in group_records_by_specialty(group_records):
+        yield from iter_specialty_block_rows(spe, records, time_slots)
 
-    from collections import defaultdict
 
-    # spe -> group_index -> slot_index -> [ noms ]
-    by_spe = defaultdict(lambda: defaultdict(lambda: defaultdict(list)))
+def save_planning_per_group_formatted(
+    path: str,
+    group_records: List[GroupRecord],
+    time_slots: List[TimeSlot],
+    delimiter: str = ";",
+) -> None:
+    """Planning par groupe au format bloc (voir iter_group_block_rows)."""
+    write_csv_rows(path, iter_group_block_rows(group_records, time_slots), delimiter)
 
-    for r in group_records:
-        by_spe[r.specialty][r.group_index][r.timeslot.index].append(r.student_name)
 
+def write_csv_rows(path: str, rows: Iterable[List[object]], delimiter: str = ";") -> None:
     with open(path, "w", encoding="utf-8", newline="") as f:
         writer = csv.writer(f, delimiter=delimiter)
+        writer.writerows(rows)
 
-        for spe, groups_dict in sorted(by_spe.items()):
-            max_group_idx = max(groups_dict.keys())
-
-            for g in range(max_group_idx + 1):
-                slots_dict = groups_dict.get(g, {})
-
-                # 1) ligne titre
-                header_row = [f"{spe} g{g+1}"] + [ts.label for ts in time_slots]
-                writer.writerow(header_row)
-
-                # 2) 1ere / Term / Salle : vides
-                writer.writerow(["1ere"] + [""] * len(time_slots))
-                writer.writerow(["Term"] + [""] * len(time_slots))
-                writer.writerow(["Salle"] + [""] * len(time_slots))
-
-                # 3) lignes élèves (une par ligne, sous les horaires)
-                max_len = max((len(v) for v in slots_dict.values()), default=0)
-
-                for i in range(max_len):
-                    row = [""]
-                    for ts in time_slots:
-                        names_here = slots_dict.get(ts.index, [])
-                        cell = names_here[i] if i < len(names_here) else ""
-                        row.append(cell)
-                    writer.writerow(row)
-
-                writer.writerow([])  # espace entre groupes
+def required_groups(n: int, slot_count: int, max_per_slot_group: int) -> int:
+    """
+    Groupes nécessaires pour n élèves sans dépasser max_per_slot_group
+    élèves par groupe et par créneau, sans plafond par spé.
+    """
+    return math.ceil(n / (slot_count * max_per_slot_group))
 
-            writer.writerow([])      # espace entre spé
 
 def compute_groups_per_specialty(
     students: List[Student],
@@ -138,11 +364,15 @@ def compute_groups_per_specialty(
     min_per_slot_group: int,
     max_per_slot_group: int,
     max_groups_per_spe: int = 5,
+    on_warning: Optional[Callable[[str], None]] = print,
 ) -> Dict[str, int]:
     """
     Calcule le nombre de groupes par spécialité pour respecter
     ~ min_per_slot_group et max_per_slot_group élèves PAR GROUPE ET PAR CRÉNEAU,
     autant que possible.
+
+    on_warning reçoit les avertissements (contraintes impossibles) ; None
+    pour les ignorer (simulations de utils.forecast).
     """
 
     counts = Counter()
@@ -159,7 +389,7 @@ def compute_groups_per_specialty(
 
         # Au moins autant de groupes pour ne pas dépasser max_per_slot_group
         # N / (slot_count * G) <= max_per_slot_group
-        min_groups = math.ceil(n / (slot_count * max_per_slot_group))
+        min_groups = required_groups(n, slot_count, max_per_slot_group)
 
         # Au plus autant de groupes pour essayer d'avoir au moins min_per_slot_group
         if n >= min_per_slot_group:
@@ -172,11 +402,12 @@ def compute_groups_per_specialty(
         if min_groups > max_groups:
             # Contraintes impossibles à satisfaire parfaitement
             g = min(min_groups, max_groups_per_spe)
-            print(
-                f"[WARN] Pour la spé {spe}, impossible d'avoir entre "
-                f"{min_per_slot_group} et {max_per_slot_group} élèves par groupe/créneau "
-                f"(n={n}). On ouvre {g} groupe(s)."
-            )
+            if on_warning is not None:
+                on_warning(
+                    f"[WARN] Pour la spé {spe}, impossible d'avoir entre "
+                    f"{min_per_slot_group} et {max_per_slot_group} élèves par groupe/créneau "
+                    f"(n={n}). On ouvre {g} groupe(s)."
+                )
         else:
             g = min_groups
 
@@ -186,6 +417,22 @@ def compute_groups_per_specialty(
     return groups
 
 
+UNPLACED_HEADER = ["Nom", "Classe", "Spécialités demandées", "Spécialité problématique", "Raison"]
+
+
+def iter_unplaced_rows(unplaced_students: List[UnplacedStudent]) -> Iterator[List[str]]:
+    """Une ligne par élève non placé, dans l'ordre de UNPLACED_HEADER."""
+    for unplaced in unplaced_students:
+        choices_str = ", ".join(unplaced.student.choices) if unplaced.student.choices else "Aucune"
+        yield [
+            unplaced.student.name,
+            unplaced.student.classe,
+            choices_str,
+            unplaced.failed_specialty,
+            unplaced.reason,
+        ]
+
+
 def save_unplaced_students(
     path: str,
     unplaced_students: List[UnplacedStudent],
@@ -196,18 +443,7 @@ def save_unplaced_students(
     
     Format: Nom, Classe, Spécialités demandées, Spécialité problématique, Raison
     """
-    fieldnames = ["Nom", "Classe", "Spécialités demandées", "Spécialité problématique", "Raison"]
-    
     with open(path, "w", encoding="utf-8", newline="") as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames, delimiter=delimiter)
-        writer.writeheader()
-        
-        for unplaced in unplaced_students:
-            choices_str = ", ".join(unplaced.student.choices) if unplaced.student.choices else "Aucune"
-            writer.writerow({
-                "Nom": unplaced.student.name,
-                "Classe": unplaced.student.classe,
-                "Spécialités demandées": choices_str,
-                "Spécialité problématique": unplaced.failed_specialty,
-                "Raison": unplaced.reason
-            })
+        writer = csv.writer(f, delimiter=delimiter)
+        writer.writerow(UNPLACED_HEADER)
+        writer.writerows(iter_unplaced_rows(unplaced_students))
@@ -0,0 +1,314 @@
+# utils/validation.py
+"""
+Contrôle du fichier d'élèves avant la répartition : doublons, vœux
+répétés et noms de spécialités mal orthographiés (« Math », « maths »,
+« Mathématique »), qui sinon créent des spécialités fantômes avec leurs
+propres groupes.
+
+Le contrôle se fait en une seule lecture en flux : les élèves déjà vus
+sont indexés par une empreinte courte de (nom, classe) normalisés, sans
+garder les élèves en mémoire. Le rapport (ValidationReport) liste les
+anomalies et les corrections proposées ; ces corrections (voir
+ValidationReport.corrections) sont ensuite appliquées au chargement par
+apply_corrections et enregistrées dans le manifeste.
+
+Les spécialités sont rapprochées d'un registre connu (celui d'un profil,
+voir utils.profiles) ou, à défaut, des orthographes les plus fréquentes
+du fichier.
+"""
+from __future__ import annotations
+import difflib
+import hashlib
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import List, Dict, Optional, Iterable, Iterator, Tuple
+from classes.models import Student
+from utils.csv_format import ColumnMapping, normalize_header
+from utils.formats import iter_students
+
+# Ressemblance minimale (0..1) entre les parties qui diffèrent de deux noms
+# de spécialité normalisés (début et fin communs retirés)
+FUZZY_CUTOFF = 0.8
+# Écart d'au plus ce nombre de caractères : faute de frappe (« math » /
+# « maths »), sauf s'il porte sur un chiffre (« LV1 » / « LV2 »)
+MAX_TYPO_LENGTH = 2
+# En dessous de cette longueur, pas de rapprochement approché : les sigles
+# courts se ressemblent trop (« SI » / « NSI », « PC » / « PCS »)
+MIN_FUZZY_LENGTH = 4
+# Sans registre : une orthographe n'est rapprochée d'une autre que si
+# celle-ci est au moins RARE_FACTOR fois plus fréquente
+RARE_FACTOR = 5
+# Nombre max d'anomalies gardées dans le rapport, tous élèves confondus
+# (les totaux restent exacts)
+MAX_LISTED_ISSUES = 1000
+
+ISSUE_DUPLICATE = "doublon"
+ISSUE_CONFLICT = "doublon (vœux différents)"
+ISSUE_REPEATED_CHOICE = "vœu répété"
+
+ISSUE_HEADER = ["Élève n°", "Anomalie", "Nom", "Classe", "Détail"]
+
+
+@dataclass
+class IngestionIssue:
+    row: int            # n° de l'élève dans le fichier (1 = premier élève lu)
+    kind: str
+    name: str
+    classe: str
+    detail: str
+
+
+@dataclass
+class ValidationReport:
+    num_students: int = 0
+    issues: List[IngestionIssue] = field(default_factory=list)   # au plus MAX_LISTED_ISSUES
+    issue_counts: Dict[str, int] = field(default_factory=dict)   # anomalie -> nombre total
+    skipped_rows: List[int] = field(default_factory=list)        # doublons écartés
+    specialty_counts: Dict[str, int] = field(default_factory=dict)   # orthographe -> élèves
+    aliases: Dict[str, str] = field(default_factory=dict)        # orthographe -> spé retenue
+    unknown_specialties: List[str] = field(default_factory=list)     # hors registre, sans rapprochement
+
+    @property
+    def has_issues(self) -> bool:
+        return bool(self.issue_counts or self.aliases or self.unknown_specialties)
+
+    def _add(self, issue: IngestionIssue) -> None:
+        self.issue_counts[issue.kind] = self.issue_counts.get(issue.kind, 0) + 1
+        if len(self.issues) < MAX_LISTED_ISSUES:
+            self.issues.append(issue)
+
+    def corrections(
+        self,
+        aliases: Optional[Iterable[str]] = None,
+        skip_duplicates: bool = True,
+    ) -> Dict[str, object]:
+        """
+        Corrections à appliquer au chargement (JSON, voir apply_corrections).
+        aliases : orthographes dont le rapprochement est accepté (par défaut
+        toutes) ; skip_duplicates=False garde les doublons.
+        """
+        accepted = self.aliases if aliases is None else {
+            spelling: self.aliases[spelling] for spelling in aliases
+        }
+        return {
+            "aliases": dict(accepted),
+            "skipped_rows": list(self.skipped_rows) if skip_duplicates else [],
+        }
+
+    def alias_label(self, spelling: str) -> str:
+        """« variante » (n élève(s)) lu comme « spé retenue »."""
+        return (
+            f"« {spelling} » ({self.specialty_counts.get(spelling, 0)} élève(s)) "
+            f"lu comme « {self.aliases[spelling]} »"
+        )
+
+    def summary(self, with_aliases: bool = True) -> str:
+        """Rapport lisible ; with_aliases=False omet les rapprochements (listés à part)."""
+        lines = [f"{self.num_students} élève(s) lu(s)."]
+        for kind in (ISSUE_DUPLICATE, ISSUE_CONFLICT, ISSUE_REPEATED_CHOICE):
+            if self.issue_counts.get(kind):
+                lines.append(f"- {kind} : {self.issue_counts[kind]}")
+        if self.skipped_rows:
+            lines.append(f"  {len(self.skipped_rows)} doublon(s) à écarter (la première ligne est gardée)")
+        if with_aliases:
+            for variant in sorted(self.aliases):
+                lines.append("- " + self.alias_label(variant))
+        for spe in self.unknown_specialties:
+            lines.append(
+                f"- spécialité inconnue : « {spe} » ({self.specialty_counts.get(spe, 0)} élève(s))"
+            )
+        if not self.has_issues:
+            lines.append("Aucune anomalie.")
+        return "\n".join(lines)
+
+    def rows(self) -> Iterator[List[object]]:
+        """Lignes du détail des anomalies (en-tête : ISSUE_HEADER)."""
+        for issue in self.issues:
+            yield [issue.row, issue.kind, issue.name, issue.classe, issue.detail]
+
+
+def _student_digest(name: str, classe: str) -> bytes:
+    """Empreinte de 8 octets de (nom, classe) normalisés : index compact des élèves vus."""
+    key = f"{name}\t{classe}"
+    return hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest()
+
+
+def _differing_parts(a: str, b: str) -> Tuple[str, str]:
+    """a et b sans leur début ni leur fin communs."""
+    shortest = min(len(a), len(b))
+    start = 0
+    while start < shortest and a[start] == b[start]:
+        start += 1
+    end = 0     # longueur de la fin commune, sans recouvrir le début commun
+    while end < shortest - start and a[-1 - end] == b[-1 - end]:
+        end += 1
+    return a[start:len(a) - end], b[start:len(b) - end]
+
+
+def _is_close(a: str, b: str) -> bool:
+    """
+    Deux noms normalisés désignent-ils la même spé (faute de frappe) ?
+
+    Seules les parties qui diffèrent sont comparées : « ... etrangeres
+    anglais » et « ... etrangeres espagnol » restent distincts malgré leur
+    long début commun, et « arts » n'est pas « arts plastiques ».
+    """
+    if min(len(a), len(b)) < MIN_FUZZY_LENGTH:
+        return False
+    diff_a, diff_b = _differing_parts(a, b)
+    if any(c.isdigit() for c in diff_a + diff_b):
+        return False    # « lv1 » / « lv2 »
+    if max(len(diff_a), len(diff_b)) <= MAX_TYPO_LENGTH:
+        return True     # « math » / « maths », lettres inversées
+    if not diff_a or not diff_b:
+        return False    # mot ou fin de mot en plus
+    return difflib.SequenceMatcher(None, diff_a, diff_b).ratio() >= FUZZY_CUTOFF
+
+
+def _resolve_specialties(
+    report: ValidationReport,
+    known_specialties: Optional[List[str]],
+) -> None:
+    """Choisit, pour chaque orthographe, la spécialité retenue."""
+    # orthographes de même forme normalisée (casse, accents) : la plus fréquente l'emporte
+    by_norm: Dict[str, Counter] = {}
+    for spelling, count in report.specialty_counts.items():
+        by_norm.setdefault(normalize_header(spelling), Counter())[spelling] = count
+    canonical = {norm: spellings.most_common(1)[0][0] for norm, spellings in by_norm.items()}
+    totals = {norm: sum(spellings.values()) for norm, spellings in by_norm.items()}
+
+    target: Dict[str, str] = {}     # forme normalisée -> spé retenue
+    if known_specialties:
+        known = {normalize_header(spe): spe for spe in known_specialties}
+        for norm in by_norm:
+            if norm in known:
+                target[norm] = known[norm]
+                continue
+            close = [other for other in known if _is_close(norm, other)]
+            if close:
+                # le plus ressemblant
+                best = max(close, key=lambda other: difflib.SequenceMatcher(None, norm, other).ratio())
+                target[norm] = known[best]
+            else:
+                target[norm] = canonical[norm]
+                report.unknown_specialties.append(canonical[norm])
+    else:
+        # des plus demandées aux plus rares : une forme rare proche d'une forme
+        # bien plus fréquente est une faute de frappe
+        ordered = sorted(by_norm, key=lambda norm: (-totals[norm], norm))
+        for position, norm in enumerate(ordered):
+            target[norm] = canonical[norm]
+            for other in ordered[:position]:
+                if totals[other] >= RARE_FACTOR * totals[norm] and _is_close(norm, other):
+                    target[norm] = target[other]
+                    break
+
+    for norm, spellings in by_norm.items():
+        for spelling in spellings:
+            if spelling != target[norm]:
+                report.aliases[spelling] = target[norm]
+
+
+def validate_students(
+    students: Iterable[Student],
+    known_specialties: Optional[List[str]] = None,
+) -> ValidationReport:
+    """
+    Parcourt les élèves une fois (itérateur accepté) et retourne le rapport.
+
+    Un élève déjà vu (même nom et même classe, à la casse et aux accents
+    près) est un doublon : seule la première ligne est gardée. Les vœux
+    répétés (même forme normalisée) sont signalés ; les orthographes de
+    spécialités sont rapprochées à la fin du parcours.
+    """
+    report = ValidationReport()
+    # empreinte -> (n° de la première ligne, empreinte de ses vœux)
+    seen: Dict[bytes, Tuple[int, int]] = {}
+    spellings: Counter = Counter()
+    # peu de valeurs distinctes : normalisées une seule fois
+    norm_of: Dict[str, str] = {}
+
+    def norm(text: str) -> str:
+        value = norm_of.get(text)
+        if value is None:
+            value = norm_of[text] = normalize_header(text)
+        return value
+
+    for row, student in enumerate(students, start=1):
+        report.num_students = row
+        norm_choices = [norm(spe) for spe in student.choices]
+        unique_choices = frozenset(norm_choices)
+        spellings.update(set(student.choices))
+
+        if len(unique_choices) < len(norm_choices):
+            repeated = sorted({
+                spe for spe, n in zip(student.choices, norm_choices)
+                if norm_choices.count(n) > 1
+            })
+            report._add(IngestionIssue(
+                row, ISSUE_REPEATED_CHOICE, student.name, student.classe,
+                "vœu(x) demandé(s) plusieurs fois : " + ", ".join(repeated),
+            ))
+
+        digest = _student_digest(normalize_header(student.name), norm(student.classe))
+        first = seen.get(digest)
+        if first is None:
+            seen[digest] = (row, hash(unique_choices))
+            continue
+
+        first_row, first_choices = first
+        report.skipped_rows.append(row)
+        if first_choices == hash(unique_choices):
+            report._add(IngestionIssue(
+                row, ISSUE_DUPLICATE, student.name, student.classe,
+                f"déjà présent (élève n°{first_row})",
+            ))
+        else:
+            report._add(IngestionIssue(
+                row, ISSUE_CONFLICT, student.name, student.classe,
+                f"déjà présent (élève n°{first_row}) avec d'autres vœux ; "
+                f"vœux ignorés : {', '.join(student.choices)}",
+            ))
+
+    report.specialty_counts = dict(spellings)
+    _resolve_specialties(report, known_specialties)
+    return report
+
+
+def validate_file(
+    path: str,
+    mapping: Optional[ColumnMapping] = None,
+    known_specialties: Optional[List[str]] = None,
+) -> ValidationReport:
+    """validate_students sur un fichier d'élèves, lu en flux."""
+    return validate_students(iter_students(path, mapping), known_specialties)
+
+
+def apply_corrections(
+    students: Iterable[Student],
+    corrections: Optional[Dict[str, object]],
+) -> Iterator[Student]:
+    """
+    Applique ValidationReport.corrections aux élèves relus dans le même
+    ordre : doublons écartés, orthographes remplacées, vœux répétés retirés
+    (le premier est gardé).
+    """
+    if not corrections:
+        yield from students
+        return
+
+    aliases: Dict[str, str] = corrections.get("aliases", {})
+    skipped = set(corrections.get("skipped_rows", []))
+    for row, student in enumerate(students, start=1):
+        if row in skipped:
+            continue
+        choices: List[str] = []
+        seen_norms = set()
+        for spe in student.choices:
+            spe = aliases.get(spe, spe)
+            norm = normalize_header(spe)
+            if norm not in seen_norms:
+                seen_norms.add(norm)
+                choices.append(spe)
+        student.choices = choices
+        yield student